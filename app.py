@@ -2,20 +2,91 @@ import os
 import io
 import base64
 import tempfile
+import threading
 import cv2
 import numpy as np
-from flask import Flask, request, render_template, jsonify
+from flask import Flask, Response, request, render_template, jsonify, stream_with_context
 from PIL import Image
 
 # Import our DETR vision package
 from src.detr_vision.model import DetrObjectDetector
+from src.detr_vision.batching import BatchScheduler, QueueFullError
+from src.detr_vision.cache import DetectionCache
+from src.detr_vision.camera import Camera
+from src.detr_vision.encoding import BINARY_MIMETYPE, IMAGE_FORMATS, encode_image, pack_detections
+from src.detr_vision.http_stream import (
+    EVENT_FORMATS,
+    MJPEG_MIMETYPE,
+    NDJSON_MIMETYPE,
+    SSE_MIMETYPE,
+    JpegStreamReader,
+    PacedSource,
+    detection_events,
+    mjpeg_frames,
+)
+from src.detr_vision.streaming import DetectionPipeline
 from src.detr_vision.visualization import draw_detections
 
 # Initialize Flask app
 app = Flask(__name__)
 
-# Initialize the object detector (will be loaded when first needed)
+# Response formats of /detect
+DETECT_FORMATS = ('full', 'json', 'image', 'binary')
+
+# Request batching settings (can be overridden with environment variables)
+app.config['MAX_BATCH_SIZE'] = int(os.environ.get('DETR_MAX_BATCH_SIZE', 8))
+app.config['MAX_WAIT_MS'] = float(os.environ.get('DETR_MAX_WAIT_MS', 10))
+app.config['MAX_QUEUE_SIZE'] = int(os.environ.get('DETR_MAX_QUEUE_SIZE', 32))
+
+# Inference precision: fp32, bf16 or int8-dynamic
+app.config['PRECISION'] = os.environ.get('DETR_PRECISION', 'fp32')
+
+# What runs the network: eager, compile, torchscript or onnxruntime. DETR_BACKEND_PATH
+# points to a graph written by scripts/export_model.py; without it the model is traced
+# or exported at startup.
+app.config['BACKEND'] = os.environ.get('DETR_BACKEND', 'eager')
+app.config['BACKEND_PATH'] = os.environ.get('DETR_BACKEND_PATH')
+
+# Size the shorter image side is resized to for the model; smaller is faster but finds
+# fewer small objects. Unset uses the model's setting (800).
+app.config['INPUT_SIZE'] = int(os.environ.get('DETR_INPUT_SIZE', 0)) or None
+
+# Preprocess decoded images without PIL and the DETR image processor
+app.config['FAST_PREPROCESS'] = os.environ.get('DETR_FAST_PREPROCESS', '0') == '1'
+
+# Result cache settings; set DETR_CACHE_PATH to also keep results on disk
+app.config['CACHE_ENTRIES'] = int(os.environ.get('DETR_CACHE_ENTRIES', 1024))
+app.config['CACHE_MAX_MB'] = float(os.environ.get('DETR_CACHE_MAX_MB', 64))
+app.config['CACHE_PATH'] = os.environ.get('DETR_CACHE_PATH')
+
+# Startup settings: keep a local copy of the model in DETR_MODEL_CACHE_DIR, load the
+# model when the app starts (DETR_PRELOAD=1) instead of on the first request, and
+# warm it up with a few forward passes at DETR_WARMUP_SIZE (height x width)
+app.config['MODEL_CACHE_DIR'] = os.environ.get('DETR_MODEL_CACHE_DIR')
+
+# Memory-map the weights from the model cache so that all server worker processes
+# share one copy of them in the page cache
+app.config['MMAP_WEIGHTS'] = os.environ.get('DETR_MMAP_WEIGHTS', '0') == '1'
+app.config['PRELOAD'] = os.environ.get('DETR_PRELOAD', '0') == '1'
+app.config['WARMUP_RUNS'] = int(os.environ.get('DETR_WARMUP_RUNS', 1))
+app.config['WARMUP_SIZE'] = tuple(
+    int(v) for v in os.environ.get('DETR_WARMUP_SIZE', '480x640').split('x')
+)
+
+# Live video sources that /stream/<name> can serve, as "name=source" pairs separated by
+# commas, e.g. "door=0,yard=rtsp://camera/stream". A source is a camera id, a video file
+# (played at its own frame rate) or a stream URL. Annotated MJPEG streams are sent at
+# up to DETR_STREAM_MAX_FPS frames per second.
+app.config['STREAM_SOURCES'] = dict(
+    entry.split('=', 1) for entry in os.environ.get('DETR_STREAM_SOURCES', '').split(',')
+    if '=' in entry
+)
+app.config['STREAM_MAX_FPS'] = float(os.environ.get('DETR_STREAM_MAX_FPS', 15))
+
+# Initialize the object detector and scheduler (will be loaded when first needed)
 detector = None
+scheduler = None
+scheduler_lock = threading.Lock()
 
 
 def get_detector():
@@ -23,10 +94,50 @@ def get_detector():
     global detector
     if detector is None:
         # Use CPU by default for deployment (unless you configure GPU on Render)
-        detector = DetrObjectDetector(device="cpu")
+        cache = DetectionCache(
+            max_entries=app.config['CACHE_ENTRIES'],
+            max_bytes=int(app.config['CACHE_MAX_MB'] * 1024 * 1024),
+            disk_path=app.config['CACHE_PATH']
+        )
+        detector = DetrObjectDetector(
+            device="cpu", cache=cache, precision=app.config['PRECISION'],
+            fast_preprocess=app.config['FAST_PREPROCESS'],
+            model_cache_dir=app.config['MODEL_CACHE_DIR'],
+            mmap_weights=app.config['MMAP_WEIGHTS'],
+            backend=app.config['BACKEND'],
+            backend_path=app.config['BACKEND_PATH'],
+            input_size=app.config['INPUT_SIZE']
+        )
+        if app.config['WARMUP_RUNS'] > 0:
+            detector.warmup(app.config['WARMUP_SIZE'], runs=app.config['WARMUP_RUNS'])
     return detector
 
 
+def get_scheduler():
+    """Lazy-create the scheduler that batches concurrent requests"""
+    global scheduler
+    with scheduler_lock:
+        if scheduler is None:
+            scheduler = BatchScheduler(
+                get_detector(),
+                max_batch_size=app.config['MAX_BATCH_SIZE'],
+                max_wait_ms=app.config['MAX_WAIT_MS'],
+                max_queue_size=app.config['MAX_QUEUE_SIZE']
+            )
+    return scheduler
+
+
+def preload():
+    """Load and warm up the model in the background while the server starts"""
+    thread = threading.Thread(target=get_scheduler, name="detr-preload", daemon=True)
+    thread.start()
+    return thread
+
+
+if app.config['PRELOAD']:
+    preload()
+
+
 @app.route('/')
 def index():
     """Render the main page"""
@@ -35,7 +146,19 @@ def index():
 
 @app.route('/detect', methods=['POST'])
 def detect():
-    """API endpoint for object detection"""
+    """
+    API endpoint for object detection.
+
+    The ``format`` parameter selects the response:
+    - 'full' (default): JSON with the annotated image as a base64 data URL
+      and the detections
+    - 'json': JSON with only the detections; nothing is drawn or encoded
+    - 'image': The annotated image itself
+    - 'binary': The detections packed by ``pack_detections``
+
+    ``image_format`` ('jpeg', 'png' or 'webp') and ``quality`` (1 to 100)
+    set how the annotated image is encoded.
+    """
     # Check if the post request has the file part
     if 'image' not in request.files:
         return jsonify({'error': 'No image provided'}), 400
@@ -49,37 +172,130 @@ def detect():
     # Get detection threshold from form, default to 0.5
     threshold = float(request.form.get('threshold', 0.5))
 
+    # Response format, from the form or the query string
+    fmt = request.values.get('format', 'full')
+    if fmt not in DETECT_FORMATS:
+        return jsonify({'error': f'Unknown format: {fmt}'}), 400
+    image_format = request.values.get('image_format', 'jpeg')
+    if image_format not in IMAGE_FORMATS:
+        return jsonify({'error': f'Unknown image format: {image_format}'}), 400
+    quality = request.values.get('quality', type=int)
+    if quality is not None and not 1 <= quality <= 100:
+        return jsonify({'error': 'quality must be between 1 and 100'}), 400
+
     # Read and process the image
     img_bytes = file.read()
     img = Image.open(io.BytesIO(img_bytes))
     img_cv = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
 
-    # Perform detection
-    detector = get_detector()
-    detections = detector.detect(img, threshold=threshold)
+    # Perform detection, batched together with other concurrent requests. The
+    # BGR array is already decoded, so the fast preprocessing path can use it.
+    try:
+        detections = get_scheduler().detect(img_cv, threshold=threshold)
+    except QueueFullError:
+        response = jsonify({'error': 'Server is busy, please retry shortly'})
+        response.headers['Retry-After'] = '1'
+        return response, 503
+
+    if fmt == 'json':
+        # Only the detections: no drawing or image encoding
+        return jsonify({'detections': detections.to_records()})
+    if fmt == 'binary':
+        return Response(pack_detections(detections), mimetype=BINARY_MIMETYPE)
 
     # Draw detections on the image
-    result_img = draw_detections(img_cv, detections, confidence_threshold=0.0)
+    result_img = draw_detections(img_cv, detections, confidence_threshold=0.0, inplace=True)
+    encoded, mimetype = encode_image(result_img, image_format, quality)
+
+    if fmt == 'image':
+        response = Response(encoded, mimetype=mimetype)
+        response.headers['X-Detection-Count'] = str(len(detections))
+        return response
 
-    # Convert back to base64 for display
-    _, buffer = cv2.imencode('.jpg', result_img)
-    img_str = base64.b64encode(buffer).decode('utf-8')
+    # Convert to base64 for display
+    img_str = base64.b64encode(encoded).decode('utf-8')
 
     # Prepare detection results for JSON response
-    results = []
-    for label, score, box in zip(detections['labels'], detections['scores'], detections['boxes']):
-        results.append({
-            'label': label,
-            'confidence': float(score),
-            'box': box.tolist()
-        })
+    results = detections.to_records()
 
     return jsonify({
-        'image': f'data:image/jpeg;base64,{img_str}',
+        'image': f'data:{mimetype};base64,{img_str}',
         'detections': results
     })
 
 
+def stream_response(source, on_close=None):
+    """
+    Run detection on a frame source and stream the results as the client asked.
+
+    The ``format`` query parameter selects NDJSON ('ndjson'), Server-Sent
+    Events ('sse', the default for clients accepting text/event-stream) or an
+    annotated MJPEG stream ('mjpeg'). Stale frames are dropped whenever the
+    model or the client falls behind, so the results stay current.
+    """
+    threshold = float(request.args.get('threshold', 0.5))
+    fmt = request.args.get('format')
+    if fmt is None:
+        fmt = 'sse' if SSE_MIMETYPE in request.headers.get('Accept', '') else 'ndjson'
+    if fmt not in EVENT_FORMATS + ('mjpeg',):
+        if on_close is not None:
+            on_close()
+        return jsonify({'error': f'Unknown format: {fmt}'}), 400
+
+    # Frames go through the shared scheduler, batched with other requests
+    pipeline = DetectionPipeline(source, get_scheduler(), threshold=threshold).start()
+
+    def generate():
+        try:
+            if fmt == 'mjpeg':
+                yield from mjpeg_frames(pipeline, max_fps=app.config['STREAM_MAX_FPS'])
+            else:
+                yield from detection_events(pipeline, fmt)
+        finally:
+            pipeline.stop()
+            if on_close is not None:
+                on_close()
+
+    mimetype = {'ndjson': NDJSON_MIMETYPE, 'sse': SSE_MIMETYPE, 'mjpeg': MJPEG_MIMETYPE}[fmt]
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    # Ask proxies not to buffer the stream
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@app.route('/stream', methods=['POST'])
+def stream_upload():
+    """Detect objects in a continuous upload of JPEG frames (e.g. an MJPEG stream)"""
+    return stream_response(JpegStreamReader(request.stream))
+
+
+@app.route('/stream', methods=['GET'])
+def stream_sources():
+    """List the configured live video sources"""
+    return jsonify({'sources': sorted(app.config['STREAM_SOURCES'])})
+
+
+@app.route('/stream/<name>')
+def stream_source(name):
+    """Detect objects in a configured live video source"""
+    if name not in app.config['STREAM_SOURCES']:
+        return jsonify({'error': f'Unknown stream source: {name}'}), 404
+
+    source = app.config['STREAM_SOURCES'][name]
+    camera = Camera(int(source) if source.isdigit() else source)
+    try:
+        camera.open()
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 503
+
+    frames = camera
+    if os.path.isfile(source):
+        # Play files at their own frame rate, like a live camera
+        frames = PacedSource(camera, camera.cap.get(cv2.CAP_PROP_FPS) or 25.0)
+    return stream_response(frames, on_close=camera.close)
+
+
 if __name__ == '__main__':
     # Get port from environment variable for deployment
     port = int(os.environ.get('PORT', 5000))
@@ -0,0 +1,121 @@
+"""
+Shared helpers for the benchmark suite: timing and result files.
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+# Add the parent directory to the Python path to import our package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def measure(
+    fn: Callable[[], Any], repeat: int = 20, warmup: int = 2, items: int = 1
+) -> Dict[str, float]:
+    """
+    Time a function and summarise the latency distribution.
+
+    Args:
+        fn: Function to time
+        repeat: Number of timed calls
+        warmup: Number of untimed calls made first
+        items: Number of items (e.g. images) processed per call, used for
+            the throughput
+
+    Returns:
+        Dictionary with mean and percentile latencies in milliseconds and
+        the throughput in items per second
+    """
+    for _ in range(warmup):
+        fn()
+
+    timings = np.empty(repeat)
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings[i] = time.perf_counter() - start
+
+    timings_ms = timings * 1000
+    return {
+        "mean_ms": float(timings_ms.mean()),
+        "p50_ms": float(np.percentile(timings_ms, 50)),
+        "p90_ms": float(np.percentile(timings_ms, 90)),
+        "p99_ms": float(np.percentile(timings_ms, 99)),
+        "min_ms": float(timings_ms.min()),
+        "throughput": items / float(timings.mean()),
+        "repeat": repeat,
+    }
+
+
+def result_key(result: Dict) -> str:
+    """
+    Identify a benchmark result by its name and parameters.
+    """
+    params = ",".join(f"{k}={v}" for k, v in sorted(result["params"].items()))
+    return f"{result['name']}[{params}]"
+
+
+def get_metadata(config: Dict) -> Dict:
+    """
+    Describe the environment a benchmark run was made in.
+    """
+    import torch
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "torch": torch.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": config,
+    }
+
+
+def write_results(path: str, metadata: Dict, results: List[Dict]):
+    """
+    Write benchmark results to a JSON file.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"metadata": metadata, "results": results}, f, indent=2)
+
+
+def load_results(path: str) -> Dict[str, Dict]:
+    """
+    Load a results file as a mapping from result key to result.
+    """
+    with open(path) as f:
+        data = json.load(f)
+    return {result_key(r): r for r in data["results"]}
+
+
+def format_result(result: Dict, unit: str = "items/s") -> str:
+    """
+    Format one result as a line of the console report.
+    """
+    return (
+        f"{result_key(result):<60} p50 {result['p50_ms']:9.2f} ms  "
+        f"p90 {result['p90_ms']:9.2f} ms  {result['throughput']:9.1f} {unit}"
+    )
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""
+Compare two benchmark result files, e.g. from two commits.
+
+Prints the change in median latency and throughput for every measurement
+present in both files and flags changes larger than --tolerance.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add the parent directory to the Python path to import our package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.common import load_results
+
+
+def main():
+    """
+    Main function for comparing benchmark results.
+    """
+    parser = argparse.ArgumentParser(
+        description="Compare two benchmark result files.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("baseline", type=str, help="Results file to compare against")
+    parser.add_argument("candidate", type=str, help="Results file to compare")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.05,
+        help=(
+            "Relative change in median latency reported as a regression or "
+            "improvement"
+        ),
+    )
+    args = parser.parse_args()
+
+    baseline = load_results(args.baseline)
+    candidate = load_results(args.candidate)
+
+    regressions = 0
+    print(f"{'benchmark':<60}{'base p50 ms':>12}{'new p50 ms':>12}{'change':>9}")
+    for key in sorted(baseline.keys() & candidate.keys()):
+        old = baseline[key]["p50_ms"]
+        new = candidate[key]["p50_ms"]
+        change = (new - old) / old if old > 0 else 0.0
+
+        flag = ""
+        if change > args.tolerance:
+            flag = "  slower"
+            regressions += 1
+        elif change < -args.tolerance:
+            flag = "  faster"
+        print(f"{key:<60}{old:>12.2f}{new:>12.2f}{change:>+9.1%}{flag}")
+
+    for key in sorted(baseline.keys() - candidate.keys()):
+        print(f"{key:<60} only in baseline")
+    for key in sorted(candidate.keys() - baseline.keys()):
+        print(f"{key:<60} only in candidate")
+
+    print(f"{regressions} measurement(s) slower by more than {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,582 @@
+#!/usr/bin/env python
+"""
+Benchmark the detection pipeline stage by stage.
+
+Runs offline against a small randomly initialised DETR model (or any model
+given with --model) and writes the latency percentiles and throughput of
+every measurement to a JSON file that can be compared between commits with
+benchmarks/compare.py.
+
+Suites:
+    stages         BGR->PIL conversion, processor, forward pass,
+                   post-processing and the copy to numpy, plus detect() as
+                   a whole, per image size and thread count
+    batch          detect_batch throughput per batch size, and for a batch of
+                   landscape and portrait images with and without grouping
+                   them by aspect ratio
+    visualization  draw_detections (copying or in place) and save_image per
+                   image size
+    endpoint       the Flask /detect route end to end
+    formats        the /detect route per response format, with the payload size
+    pool           DetectorPool throughput against a single detector using
+                   the same number of cores
+    backends       the forward pass and detect() on each inference backend,
+                   with the largest score difference from eager PyTorch
+"""
+
+import argparse
+import importlib.util
+import io
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import cv2
+import numpy as np
+import torch
+
+# Add the parent directory to the Python path to import our package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.common import (
+    format_result,
+    get_metadata,
+    measure,
+    write_results,
+)
+from src.detr_vision.backends import BACKENDS
+from src.detr_vision.model import DetrObjectDetector
+from src.detr_vision.pool import DetectorPool
+from src.detr_vision.preprocessing import (
+    MAX_BATCH_PADDING,
+    FastPreprocessor,
+    aspect_buckets,
+    get_resize_size,
+    padding_fraction,
+)
+from src.detr_vision.testing import build_tiny_detr
+from src.detr_vision.visualization import draw_detections, save_image
+
+SUITES = ("stages", "batch", "visualization", "endpoint", "formats", "pool", "backends")
+
+
+def parse_size(text):
+    """
+    Parse a HEIGHTxWIDTH image size.
+    """
+    height, width = text.lower().split("x")
+    return int(height), int(width)
+
+
+def create_parser():
+    """
+    Create the benchmark command-line parser.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark the DETR detection pipeline.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--suites",
+        nargs="+",
+        choices=SUITES,
+        default=list(SUITES),
+        help="Benchmark suites to run",
+    )
+    parser.add_argument(
+        "--model",
+        type=str,
+        default=None,
+        help="Name or path of the DETR model. If not specified, a small random-weight "
+        "model is built so the benchmarks run offline.",
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=parse_size,
+        default=[(480, 640), (720, 1280)],
+        help="Image sizes as HEIGHTxWIDTH",
+    )
+    parser.add_argument(
+        "--threads",
+        nargs="+",
+        type=int,
+        default=sorted({1, torch.get_num_threads()}),
+        help="Numbers of PyTorch intra-op threads",
+    )
+    parser.add_argument(
+        "--batch-sizes",
+        nargs="+",
+        type=int,
+        default=[1, 2, 4, 8],
+        help="Batch sizes for the batch suite",
+    )
+    parser.add_argument(
+        "--num-detections",
+        nargs="+",
+        type=int,
+        default=[10, 50],
+        help="Numbers of boxes drawn in the visualization suite",
+    )
+    parser.add_argument(
+        "--pool-workers",
+        nargs="+",
+        type=int,
+        default=[2, 4],
+        help="Numbers of worker processes for the pool suite; the cores (the largest "
+        "--threads value) are divided between them",
+    )
+    parser.add_argument(
+        "--pool-images",
+        type=int,
+        default=16,
+        help="Number of images per measurement in the pool suite",
+    )
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=BACKENDS,
+        default=[
+            name
+            for name in BACKENDS
+            if name != "compile"
+            and (name != "onnxruntime" or importlib.util.find_spec("onnxruntime"))
+        ],
+        help="Inference backends for the backends suite. 'compile' is left out by "
+        "default because compiling takes minutes on the CPU.",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=20, help="Timed runs per measurement"
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=2, help="Untimed runs per measurement"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Path of the JSON results file. If not specified, will use "
+        "'benchmarks/results/<commit>.json'",
+    )
+    return parser
+
+
+def random_image(size, seed=0):
+    """
+    Create a random BGR image of the given (height, width).
+    """
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, size=(*size, 3), dtype=np.uint8)
+
+
+def random_detections(size, count, seed=0):
+    """
+    Create random detections inside an image of the given (height, width).
+    """
+    rng = np.random.default_rng(seed)
+    height, width = size
+    x1 = rng.uniform(0, width * 0.8, count)
+    y1 = rng.uniform(20, height * 0.8, count)
+    x2 = x1 + rng.uniform(10, width * 0.2, count)
+    y2 = y1 + rng.uniform(10, height * 0.2, count)
+    labels = ["person", "car", "dog", "bicycle", "traffic light"]
+    return {
+        "boxes": np.stack([x1, y1, x2, y2], axis=1).astype(np.float32),
+        "scores": rng.uniform(0.5, 1.0, count).astype(np.float32),
+        "labels": [labels[i % len(labels)] for i in range(count)],
+    }
+
+
+def bench_stages(detector, args):
+    """
+    Time each stage of DetrObjectDetector.detect.
+    """
+    results = []
+    fast_preprocessor = FastPreprocessor.from_processor(
+        detector.processor, detector.device
+    )
+    for threads in args.threads:
+        torch.set_num_threads(threads)
+        for size in args.sizes:
+            image = random_image(size)
+            image_pil = detector._to_pil(image)
+            inputs = detector._preprocess([image_pil])
+            outputs = detector._forward(inputs)
+            predictions = detector._postprocess(outputs, [size])
+
+            stages = {
+                "to_pil": lambda: detector._to_pil(image),
+                "processor": lambda: detector._preprocess([image_pil]),
+                "fast_preprocess": lambda: fast_preprocessor([image]),
+                "forward": lambda: detector._forward(inputs),
+                "postprocess": lambda: detector._postprocess(outputs, [size]),
+                "to_numpy": lambda: detector._to_raw_detections(predictions),
+                "detect": lambda: detector.detect(image, threshold=0.7),
+            }
+            for stage, fn in stages.items():
+                result = measure(fn, repeat=args.repeat, warmup=args.warmup)
+                result.update(
+                    name=f"stages/{stage}",
+                    params={"size": f"{size[0]}x{size[1]}", "threads": threads},
+                )
+                results.append(result)
+                print(format_result(result, "images/s"))
+    return results
+
+
+def bench_batch(detector, args):
+    """
+    Time detect_batch for different batch sizes.
+    """
+    results = []
+    threads = max(args.threads)
+    torch.set_num_threads(threads)
+    for size in args.sizes:
+        for batch_size in args.batch_sizes:
+            images = [random_image(size, seed=i) for i in range(batch_size)]
+            result = measure(
+                lambda: detector.detect_batch(
+                    images, threshold=0.7, batch_size=batch_size
+                ),
+                repeat=max(args.repeat // batch_size, 3),
+                warmup=1,
+                items=batch_size,
+            )
+            result.update(
+                name="batch/detect_batch",
+                params={
+                    "size": f"{size[0]}x{size[1]}",
+                    "threads": threads,
+                    "batch_size": batch_size,
+                },
+            )
+            results.append(result)
+            print(format_result(result, "images/s"))
+
+    # Landscape and portrait images in one batch, in their given order and
+    # grouped into batches of similar aspect ratio
+    batch_size = max(args.batch_sizes)
+    images = [
+        random_image(size if i % 2 == 0 else size[::-1], seed=i)
+        for i in range(batch_size)
+        for size in args.sizes[:1]
+    ]
+    image_sizes = [
+        get_resize_size(*image.shape[:2], *detector.input_size) for image in images
+    ]
+    for bucketing, max_padding in (
+        ("in_order", None),
+        ("aspect_buckets", MAX_BATCH_PADDING),
+    ):
+        if max_padding is None:
+            chunks = [list(range(len(images)))]
+        else:
+            chunks = aspect_buckets(image_sizes, batch_size, max_padding)
+        padding = float(
+            np.mean(
+                [padding_fraction([image_sizes[i] for i in chunk]) for chunk in chunks]
+            )
+        )
+        result = measure(
+            lambda: detector.detect_batch(
+                images, threshold=0.7, batch_size=batch_size, max_padding=max_padding
+            ),
+            repeat=max(args.repeat // batch_size, 3),
+            warmup=1,
+            items=batch_size,
+        )
+        result.update(
+            name=f"batch/mixed_aspect_{bucketing}",
+            params={
+                "size": f"{args.sizes[0][0]}x{args.sizes[0][1]}",
+                "threads": threads,
+                "batch_size": batch_size,
+            },
+            padding=padding,
+        )
+        results.append(result)
+        print(format_result(result, "images/s") + f"  padding {100 * padding:.0f}%")
+    return results
+
+
+def bench_visualization(args):
+    """
+    Time drawing detections and saving annotated images.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            image = random_image(size)
+            for count in args.num_detections:
+                detections = random_detections(size, count)
+                result = measure(
+                    lambda: draw_detections(image, detections),
+                    repeat=args.repeat,
+                    warmup=args.warmup,
+                )
+                result.update(
+                    name="visualization/draw_detections",
+                    params={"size": f"{size[0]}x{size[1]}", "detections": count},
+                )
+                results.append(result)
+                print(format_result(result, "images/s"))
+
+                canvas = image.copy()
+                result = measure(
+                    lambda: draw_detections(canvas, detections, inplace=True),
+                    repeat=args.repeat,
+                    warmup=args.warmup,
+                )
+                result.update(
+                    name="visualization/draw_detections_inplace",
+                    params={"size": f"{size[0]}x{size[1]}", "detections": count},
+                )
+                results.append(result)
+                print(format_result(result, "images/s"))
+
+            output_path = os.path.join(tmp, "result.jpg")
+            result = measure(
+                lambda: save_image(image, output_path),
+                repeat=args.repeat,
+                warmup=args.warmup,
+            )
+            result.update(
+                name="visualization/save_image", params={"size": f"{size[0]}x{size[1]}"}
+            )
+            results.append(result)
+            print(format_result(result, "images/s"))
+    return results
+
+
+def bench_endpoint(detector, args):
+    """
+    Time the Flask /detect route end to end, from upload to JSON response.
+    """
+    import app as app_module
+
+    # Serve requests with the benchmark detector (and no result cache)
+    app_module.detector = detector
+    app_module.scheduler = None
+    client = app_module.app.test_client()
+
+    results = []
+    threads = max(args.threads)
+    torch.set_num_threads(threads)
+    for size in args.sizes:
+        _, encoded = cv2.imencode(".jpg", random_image(size))
+        image_bytes = encoded.tobytes()
+
+        def post():
+            response = client.post(
+                "/detect",
+                data={
+                    "image": (io.BytesIO(image_bytes), "image.jpg"),
+                    "threshold": "0.5",
+                },
+            )
+            assert response.status_code == 200, response.status_code
+
+        result = measure(post, repeat=args.repeat, warmup=args.warmup)
+        result.update(
+            name="endpoint/detect",
+            params={"size": f"{size[0]}x{size[1]}", "threads": threads},
+        )
+        results.append(result)
+        print(format_result(result, "requests/s"))
+
+    if app_module.scheduler is not None:
+        app_module.scheduler.close()
+    return results
+
+
+def bench_formats(detector, args):
+    """
+    Time the /detect route for each response format and record the payload size.
+    """
+    import app as app_module
+
+    app_module.detector = detector
+    app_module.scheduler = None
+    client = app_module.app.test_client()
+
+    # (name, query parameters) of each response mode
+    modes = [
+        ("full", {}),
+        ("json", {"format": "json"}),
+        ("binary", {"format": "binary"}),
+        ("image_jpeg", {"format": "image", "image_format": "jpeg", "quality": "80"}),
+        ("image_png", {"format": "image", "image_format": "png"}),
+        ("image_webp", {"format": "image", "image_format": "webp", "quality": "80"}),
+    ]
+
+    results = []
+    threads = max(args.threads)
+    torch.set_num_threads(threads)
+    for size in args.sizes:
+        _, encoded = cv2.imencode(".jpg", random_image(size))
+        image_bytes = encoded.tobytes()
+
+        for mode, query in modes:
+            payload_sizes = []
+
+            def post():
+                response = client.post(
+                    "/detect",
+                    query_string=query,
+                    data={
+                        "image": (io.BytesIO(image_bytes), "image.jpg"),
+                        "threshold": "0.0",
+                    },
+                )
+                assert response.status_code == 200, response.status_code
+                payload_sizes.append(len(response.data))
+
+            result = measure(post, repeat=args.repeat, warmup=args.warmup)
+            result.update(
+                name="formats/detect",
+                params={"size": f"{size[0]}x{size[1]}", "format": mode},
+                payload_bytes=int(np.median(payload_sizes)),
+            )
+            results.append(result)
+            print(
+                f"{format_result(result, 'requests/s')}  "
+                f"{result['payload_bytes']:9d} bytes"
+            )
+
+    if app_module.scheduler is not None:
+        app_module.scheduler.close()
+    return results
+
+
+def bench_pool(detector, model_name, args):
+    """
+    Compare DetectorPool with a single detector given the same cores.
+    """
+    results = []
+    cores = max(args.threads)
+    repeat = max(args.repeat // args.pool_images, 3)
+    for size in args.sizes:
+        images = [random_image(size, seed=i) for i in range(args.pool_images)]
+        params = {"size": f"{size[0]}x{size[1]}", "cores": cores}
+
+        torch.set_num_threads(cores)
+        result = measure(
+            lambda: [detector.detect(image) for image in images],
+            repeat=repeat,
+            warmup=1,
+            items=len(images),
+        )
+        result.update(name="pool/single_detector", params=dict(params, workers=1))
+        results.append(result)
+        print(format_result(result, "images/s"))
+
+        for workers in args.pool_workers:
+            threads = max(cores // workers, 1)
+            with DetectorPool(
+                model_name, num_workers=workers, threads_per_worker=threads
+            ) as pool:
+                result = measure(
+                    lambda: list(pool.map(images)),
+                    repeat=repeat,
+                    warmup=1,
+                    items=len(images),
+                )
+            result.update(
+                name="pool/detector_pool", params=dict(params, workers=workers)
+            )
+            results.append(result)
+            print(format_result(result, "images/s"))
+    return results
+
+
+def bench_backends(detector, model_name, args):
+    """
+    Time the forward pass and detect() on each inference backend.
+    """
+    results = []
+    threads = max(args.threads)
+    torch.set_num_threads(threads)
+    images = {size: random_image(size) for size in args.sizes}
+    expected = {size: detector.detect_raw(image) for size, image in images.items()}
+
+    for backend in args.backends:
+        if backend == "eager":
+            backend_detector = detector
+        else:
+            backend_detector = DetrObjectDetector(
+                model_name=model_name, device="cpu", backend=backend
+            )
+        for size, image in images.items():
+            # The first call also compiles the 'compile' backend for this shape
+            raw = backend_detector.detect_raw(image)
+            score_diff = float(np.abs(raw.scores - expected[size].scores).max())
+            inputs = backend_detector._preprocess([image])
+
+            stages = {
+                "forward": lambda: backend_detector._forward(inputs),
+                "detect": lambda: backend_detector.detect(image, threshold=0.7),
+            }
+            for stage, fn in stages.items():
+                result = measure(fn, repeat=args.repeat, warmup=args.warmup)
+                result.update(
+                    name=f"backends/{stage}",
+                    params={
+                        "backend": backend,
+                        "size": f"{size[0]}x{size[1]}",
+                        "threads": threads,
+                    },
+                    max_score_diff=score_diff,
+                )
+                results.append(result)
+                print(
+                    format_result(result, "images/s")
+                    + f"  max score diff {score_diff:.1e}"
+                )
+    return results
+
+
+def main():
+    """
+    Main function for the benchmark suite.
+    """
+    args = create_parser().parse_args()
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        model_name = args.model or build_tiny_detr(model_dir, size="small")
+        detector = DetrObjectDetector(model_name=model_name, device="cpu")
+
+        default_threads = torch.get_num_threads()
+        results = []
+        if "stages" in args.suites:
+            results += bench_stages(detector, args)
+        if "batch" in args.suites:
+            results += bench_batch(detector, args)
+        if "visualization" in args.suites:
+            results += bench_visualization(args)
+        if "endpoint" in args.suites:
+            results += bench_endpoint(detector, args)
+        if "formats" in args.suites:
+            results += bench_formats(detector, args)
+        if "pool" in args.suites:
+            results += bench_pool(detector, model_name, args)
+        if "backends" in args.suites:
+            results += bench_backends(detector, model_name, args)
+        torch.set_num_threads(default_threads)
+
+    config = {k: v for k, v in vars(args).items() if k != "output"}
+    config["model"] = args.model or "random-benchmark-model"
+    metadata = get_metadata(config)
+
+    output_path = args.output
+    if output_path is None:
+        name = metadata["commit"] or metadata["timestamp"].replace(":", "")
+        output_path = os.path.join(Path(__file__).parent, "results", f"{name}.json")
+    write_results(output_path, metadata, results)
+    print(f"Saved results to: {output_path}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
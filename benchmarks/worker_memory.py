@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+"""
+Measure the memory used by several detector worker processes.
+
+Starts 1, 2, 4 and 8 independent processes (as a multi-worker server does),
+each loading a detector and running one detection, then reads every
+worker's memory from /proc/<pid>/smaps_rollup:
+
+    unique  memory only this worker uses (private pages)
+    shared  memory this worker shares with other processes, such as
+            memory-mapped weights in the page cache
+    pss     proportional set size: unique plus this worker's share of the
+            shared pages; the sum over workers is the real total
+
+Runs with the weights loaded normally and memory-mapped (--mmap-weights),
+so the saving from sharing the weights can be read off directly. Linux only.
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the parent directory to the Python path to import our package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.common import get_metadata, write_results
+
+MODES = ("default", "mmap")
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """
+    Create the command-line parser.
+    """
+    parser = argparse.ArgumentParser(
+        description=(
+            "Measure per-worker unique and shared memory of detector processes."
+        ),
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--model",
+        type=str,
+        default=None,
+        help="DETR model to load, e.g. facebook/detr-resnet-50. If not specified, "
+        "a small random model is used, whose weights are too small to show much.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4, 8],
+        help="Numbers of worker processes to measure",
+    )
+    parser.add_argument(
+        "--modes",
+        type=str,
+        nargs="+",
+        choices=MODES,
+        default=list(MODES),
+        help="Weight loading modes to measure",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Model cache directory. If not specified, a temporary directory is used.",
+    )
+    parser.add_argument(
+        "--output", type=str, default=None, help="Path to save the measurements as JSON"
+    )
+    return parser
+
+
+def read_memory(pid: int) -> dict:
+    """
+    Read the memory usage of a process.
+
+    Args:
+        pid: Process id
+
+    Returns:
+        Dictionary with rss, pss, unique and shared memory in bytes
+    """
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) * 1024
+
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "unique": fields["Private_Clean"] + fields["Private_Dirty"],
+        "shared": fields["Shared_Clean"] + fields["Shared_Dirty"],
+    }
+
+
+def worker(model_name: str, cache_dir: str, mmap_weights: bool, ready, stop):
+    """
+    Load a detector, run one detection and wait until told to exit.
+    """
+    import numpy as np
+    import torch
+
+    from src.detr_vision.model import DetrObjectDetector
+
+    torch.set_num_threads(1)
+    detector = DetrObjectDetector(
+        model_name=model_name,
+        device="cpu",
+        model_cache_dir=cache_dir,
+        mmap_weights=mmap_weights,
+    )
+    detector.detect(np.zeros((480, 640, 3), dtype=np.uint8))
+    ready.put(os.getpid())
+    stop.wait()
+
+
+def measure_workers(
+    model_name: str, cache_dir: str, mode: str, num_workers: int
+) -> dict:
+    """
+    Start worker processes and measure their memory once all are ready.
+    """
+    # Spawned workers are independent processes, like the workers of a server
+    # started without --preload; forked ones would share the parent's memory
+    context = multiprocessing.get_context("spawn")
+    ready = context.Queue()
+    stop = context.Event()
+    processes = [
+        context.Process(
+            target=worker, args=(model_name, cache_dir, mode == "mmap", ready, stop)
+        )
+        for _ in range(num_workers)
+    ]
+    for process in processes:
+        process.start()
+
+    try:
+        for _ in processes:
+            ready.get(timeout=600)
+        usage = [read_memory(process.pid) for process in processes]
+    finally:
+        stop.set()
+        for process in processes:
+            process.join()
+
+    mb = 1024 * 1024
+    return {
+        "name": "worker_memory",
+        "params": {"mode": mode, "workers": num_workers},
+        "unique_mb": sum(u["unique"] for u in usage) / num_workers / mb,
+        "shared_mb": sum(u["shared"] for u in usage) / num_workers / mb,
+        "rss_mb": sum(u["rss"] for u in usage) / num_workers / mb,
+        "total_pss_mb": sum(u["pss"] for u in usage) / mb,
+    }
+
+
+def main():
+    """
+    Main function for the worker memory measurement.
+    """
+    args = create_parser().parse_args()
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        print(
+            "Error: Measuring worker memory requires Linux (/proc/<pid>/smaps_rollup)"
+        )
+        return 1
+
+    from src.detr_vision.startup import load_pretrained
+    from src.detr_vision.testing import build_tiny_detr
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_name = args.model or build_tiny_detr(
+            os.path.join(tmp_dir, "model"), size="small"
+        )
+        cache_dir = args.cache_dir or os.path.join(tmp_dir, "cache")
+
+        # Fill the cache once so workers don't all write it at the same time
+        load_pretrained(model_name, cache_dir, mmap=True)
+
+        results = []
+        print(
+            f"{'mode':<9}{'workers':>8}{'unique MB':>12}{'shared MB':>12}"
+            f"{'RSS MB':>10}{'total PSS MB':>15}"
+        )
+        for mode in args.modes:
+            for num_workers in args.workers:
+                result = measure_workers(model_name, cache_dir, mode, num_workers)
+                results.append(result)
+                print(
+                    f"{mode:<9}{num_workers:>8}{result['unique_mb']:>12.1f}"
+                    f"{result['shared_mb']:>12.1f}{result['rss_mb']:>10.1f}"
+                    f"{result['total_pss_mb']:>15.1f}"
+                )
+
+    if args.output:
+        config = {k: v for k, v in vars(args).items() if k != "output"}
+        write_results(args.output, get_metadata(config), results)
+        print(f"Saved results to: {args.output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+"""
+Script to compare DETR inference at several input sizes.
+
+For each size of the shorter image side it reports the median latency per
+image and how the detections change from the model's own input size: the
+number of detections above the threshold, its difference from the
+reference, and how many of the reference's detections are still found (a
+detection of the same class overlapping it by at least the IoU threshold).
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add the parent directory to the Python path to import our package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.detr_vision.cli import create_input_size_comparison_parser, parse_args
+from src.detr_vision.model import DetrObjectDetector
+from src.detr_vision.tiling import box_iou
+
+
+def run_detector(detector, images, threshold, runs):
+    """
+    Run a detector on every image and time it.
+
+    Returns:
+        Tuple of (detections per image, median latency in milliseconds)
+    """
+    # The first forward pass includes one-off setup costs
+    results = [detector.detect(image, threshold=threshold) for image in images]
+
+    timings = []
+    for image in images:
+        for _ in range(runs):
+            start = time.perf_counter()
+            detector.detect(image, threshold=threshold)
+            timings.append(time.perf_counter() - start)
+
+    return results, 1000 * float(np.median(timings))
+
+
+def compare(reference, results, iou_threshold):
+    """
+    Count the detections and the reference detections found again.
+    """
+    count = 0
+    ref_count = 0
+    matched = 0
+
+    for ref, detections in zip(reference, results):
+        count += len(detections)
+        ref_count += len(ref)
+        if len(ref) and len(detections):
+            iou = box_iou(ref.boxes, detections.boxes)
+            iou[ref.class_ids[:, None] != detections.class_ids[None, :]] = 0
+            matched += int((iou.max(axis=1) >= iou_threshold).sum())
+
+    return {"detections": count, "reference_detections": ref_count, "matched": matched}
+
+
+def main():
+    """
+    Main function for the input size comparison.
+    """
+    parser = create_input_size_comparison_parser()
+    args = parse_args(parser)
+
+    images = []
+    for path in args["images"]:
+        image = cv2.imread(path)
+        if image is None:
+            print(f"Error: Couldn't read image at {path}")
+            return 1
+        images.append(image)
+
+    reference_detector = DetrObjectDetector(model_name=args["model"], device="cpu")
+    reference_size = reference_detector.input_size
+    reference, reference_latency = run_detector(
+        reference_detector, images, args["threshold"], args["runs"]
+    )
+    del reference_detector
+
+    rows = [
+        (
+            reference_size,
+            reference_latency,
+            compare(reference, reference, args["iou_threshold"]),
+        )
+    ]
+    for input_size in args["input_sizes"]:
+        detector = DetrObjectDetector(
+            model_name=args["model"], device="cpu", input_size=input_size
+        )
+        results, latency = run_detector(
+            detector, images, args["threshold"], args["runs"]
+        )
+        rows.append(
+            (
+                detector.input_size,
+                latency,
+                compare(reference, results, args["iou_threshold"]),
+            )
+        )
+        del detector
+
+    print()
+    print(
+        f"{len(images)} image(s), threshold {args['threshold']}, "
+        f"IoU threshold {args['iou_threshold']}, {args['runs']} timed runs each"
+    )
+    print(
+        f"{'input size':<14}{'latency ms':>12}{'speedup':>9}{'detections':>12}"
+        f"{'change':>8}{'found':>13}"
+    )
+    for (shortest_edge, longest_edge), latency, diff in rows:
+        found = f"{diff['matched']} / {diff['reference_detections']}"
+        print(
+            f"{f'{shortest_edge} / {longest_edge}':<14}{latency:>12.1f}"
+            f"{reference_latency / latency:>8.2f}x{diff['detections']:>12}"
+            f"{diff['detections'] - diff['reference_detections']:>+8}{found:>13}"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
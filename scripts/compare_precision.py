@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+"""
+Script to compare reduced-precision DETR inference against fp32.
+
+For each precision it reports the median latency per image and the largest
+deviation from the fp32 results: score differences over all object queries,
+and box differences (in pixels) and class changes over the queries that
+fp32 detects above the threshold.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add the parent directory to the Python path to import our package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.detr_vision.cli import create_precision_comparison_parser, parse_args
+from src.detr_vision.model import DetrObjectDetector
+
+
+def run_detector(detector, images, runs):
+    """
+    Run a detector on every image and time it.
+
+    Returns:
+        Tuple of (raw detections per image, median latency in milliseconds)
+    """
+    # The first forward pass includes one-off setup costs
+    raw_results = [detector.detect_raw(image) for image in images]
+
+    timings = []
+    for image in images:
+        for _ in range(runs):
+            start = time.perf_counter()
+            detector.detect_raw(image)
+            timings.append(time.perf_counter() - start)
+
+    return raw_results, 1000 * float(np.median(timings))
+
+
+def compare(reference, results, threshold):
+    """
+    Compute the largest deviations of a set of results from the fp32 reference.
+    """
+    max_score_diff = 0.0
+    max_box_diff = 0.0
+    class_changes = 0
+    ref_count = 0
+    count = 0
+
+    for ref, raw in zip(reference, results):
+        max_score_diff = max(
+            max_score_diff, float(np.abs(raw.scores - ref.scores).max())
+        )
+
+        confident = ref.scores > threshold
+        if confident.any():
+            box_diff = np.abs(raw.boxes[confident] - ref.boxes[confident]).max()
+            max_box_diff = max(max_box_diff, float(box_diff))
+            class_changes += int(
+                (raw.class_ids[confident] != ref.class_ids[confident]).sum()
+            )
+
+        ref_count += int(confident.sum())
+        count += int((raw.scores > threshold).sum())
+
+    return {
+        "max_score_diff": max_score_diff,
+        "max_box_diff": max_box_diff,
+        "class_changes": class_changes,
+        "detections": count,
+        "reference_detections": ref_count,
+    }
+
+
+def main():
+    """
+    Main function for the precision comparison.
+    """
+    parser = create_precision_comparison_parser()
+    args = parse_args(parser)
+
+    images = []
+    for path in args["images"]:
+        image = cv2.imread(path)
+        if image is None:
+            print(f"Error: Couldn't read image at {path}")
+            return 1
+        images.append(image)
+
+    reference_detector = DetrObjectDetector(
+        model_name=args["model"], device="cpu", precision="fp32"
+    )
+    reference, reference_latency = run_detector(
+        reference_detector, images, args["runs"]
+    )
+    del reference_detector
+
+    rows = [
+        ("fp32", reference_latency, compare(reference, reference, args["threshold"]))
+    ]
+    for precision in args["precisions"]:
+        detector = DetrObjectDetector(
+            model_name=args["model"], device="cpu", precision=precision
+        )
+        results, latency = run_detector(detector, images, args["runs"])
+        rows.append(
+            (precision, latency, compare(reference, results, args["threshold"]))
+        )
+        del detector
+
+    print()
+    print(
+        f"{len(images)} image(s), threshold {args['threshold']}, "
+        f"{args['runs']} timed runs each"
+    )
+    print(
+        f"{'precision':<14}{'latency ms':>12}{'speedup':>9}{'max score diff':>16}"
+        f"{'max box diff px':>17}{'class changes':>15}{'detections':>12}"
+    )
+    for precision, latency, diff in rows:
+        print(
+            f"{precision:<14}{latency:>12.1f}{reference_latency / latency:>8.2f}x"
+            f"{diff['max_score_diff']:>16.4f}{diff['max_box_diff']:>17.2f}"
+            f"{diff['class_changes']:>15}"
+            f"{diff['detections']:>6} / {diff['reference_detections']:<3}"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
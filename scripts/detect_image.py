@@ -2,17 +2,79 @@
 """
 Script to detect objects in an image using DETR.
 """
+
 import os
-import cv2
 import sys
 from pathlib import Path
 
+import cv2
+
 # Add the parent directory to the Python path to import our package
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from src.detr_vision.cli import create_image_detection_parser, parse_args
 from src.detr_vision.model import DetrObjectDetector
+from src.detr_vision.pipeline import (
+    collect_image_paths,
+    is_batch_source,
+    run_batch_detection,
+)
 from src.detr_vision.visualization import draw_detections, save_image, show_image
-from src.detr_vision.cli import create_image_detection_parser, parse_args
+
+
+def run_batch(args):
+    """
+    Detect objects in every image of a directory, glob pattern or list file.
+    """
+    image_paths = collect_image_paths(args["image_path"])
+    if not image_paths:
+        print(f"Error: No images found for {args['image_path']}")
+        return 1
+
+    print(f"Found {len(image_paths)} images")
+
+    # Load the model once for all images
+    detector = DetrObjectDetector(
+        model_name=args["model"],
+        device=args["device"],
+        precision=args["precision"],
+        fast_preprocess=args["fast_preprocess"],
+        model_cache_dir=args["model_cache_dir"],
+        backend=args["backend"],
+        backend_path=args["backend_path"],
+        input_size=args["input_size"],
+        max_input_size=args["max_input_size"],
+    )
+
+    print("Detecting objects...")
+    stats = run_batch_detection(
+        detector,
+        image_paths,
+        output_dir=args["output_dir"],
+        threshold=args["threshold"],
+        batch_size=args["batch_size"],
+        num_readers=args["readers"],
+        num_writers=args["writers"],
+        queue_size=args["queue_size"],
+    )
+
+    print(
+        f"Processed {stats['images']} images ({stats['failed']} failed), "
+        f"found {stats['detections']} objects"
+    )
+    print(f"Saved results to: {args['output_dir']}")
+    print(
+        f"Total time: {stats['elapsed']:.2f}s "
+        f"({stats['images_per_second']:.2f} images/s)"
+    )
+    if stats["images"]:
+        print(
+            f"Inference: {stats['inference_time']:.2f}s "
+            f"({1000 * stats['inference_time'] / stats['images']:.1f} ms/image), "
+            f"waiting on decode: {stats['decode_wait_time']:.2f}s"
+        )
+
+    return 0 if stats["failed"] == 0 else 1
 
 
 def main():
@@ -23,6 +85,10 @@ def main():
     parser = create_image_detection_parser()
     args = parse_args(parser)
 
+    # Directories, glob patterns and list files are processed in batch mode
+    if is_batch_source(args["image_path"]):
+        return run_batch(args)
+
     # Load the image
     image_path = args["image_path"]
     if not os.path.exists(image_path):
@@ -38,15 +104,35 @@ def main():
     # Create the object detector
     detector = DetrObjectDetector(
         model_name=args["model"],
-        device=args["device"]
+        device=args["device"],
+        precision=args["precision"],
+        fast_preprocess=args["fast_preprocess"],
+        model_cache_dir=args["model_cache_dir"],
+        backend=args["backend"],
+        backend_path=args["backend_path"],
+        input_size=args["input_size"],
+        max_input_size=args["max_input_size"],
     )
 
     # Run object detection
-    print("Detecting objects...")
-    detections = detector.detect(image, threshold=args["threshold"])
+    if args["tile_size"] is not None:
+        print(f"Detecting objects on {args['tile_size']}px tiles...")
+        detections = detector.detect_tiled(
+            image,
+            threshold=args["threshold"],
+            tile_size=args["tile_size"],
+            overlap=args["tile_overlap"],
+            tile_batch_size=args["tile_batch_size"],
+            merge=args["tile_merge"],
+        )
+    else:
+        print("Detecting objects...")
+        detections = detector.detect(image, threshold=args["threshold"])
 
     # Draw detections on the image
-    result_image = draw_detections(image, detections, confidence_threshold=0.0)
+    result_image = draw_detections(
+        image, detections, confidence_threshold=0.0, inplace=True
+    )
 
     # Print detection results
     print(f"Found {len(detections['boxes'])} objects:")
@@ -74,4 +160,4 @@ def main():
 
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""
+Script to detect objects in a video file using DETR.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Add the parent directory to the Python path to import our package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.detr_vision.cli import create_video_detection_parser, parse_args
+from src.detr_vision.model import DetrObjectDetector
+from src.detr_vision.pipeline import run_video_detection
+
+
+def print_progress(stats):
+    """
+    Print a progress line for a running video job.
+    """
+    total = stats["total_frames"]
+    if total > 0:
+        position = f"{stats['frames_decoded']}/{total} frames decoded"
+    else:
+        position = f"{stats['frames_decoded']} frames decoded"
+    print(
+        f"  {position}, {stats['frames_processed']} processed "
+        f"({stats['frames_per_second']:.1f} frames/s)"
+    )
+
+
+def main():
+    """
+    Main function for video object detection.
+    """
+    # Parse command-line arguments
+    parser = create_video_detection_parser()
+    args = parse_args(parser)
+
+    video_path = args["video_path"]
+    if not os.path.exists(video_path):
+        print(f"Error: Video not found at {video_path}")
+        return 1
+
+    # Work out where to save the annotated video
+    if args["no_video"]:
+        output_path = None
+    elif args["output"] is not None:
+        output_path = args["output"]
+    else:
+        filename = os.path.basename(video_path)
+        output_path = os.path.join("data/outputs", f"result_{filename}")
+
+    # Create the object detector
+    detector = DetrObjectDetector(
+        model_name=args["model"],
+        device=args["device"],
+        precision=args["precision"],
+        fast_preprocess=args["fast_preprocess"],
+        model_cache_dir=args["model_cache_dir"],
+        backend=args["backend"],
+        backend_path=args["backend_path"],
+        input_size=args["input_size"],
+        max_input_size=args["max_input_size"],
+    )
+
+    print(f"Processing video: {video_path}")
+    stats = run_video_detection(
+        detector,
+        video_path,
+        output_path=output_path,
+        jsonl_path=args["jsonl"],
+        threshold=args["threshold"],
+        batch_size=args["batch_size"],
+        stride=args["stride"],
+        queue_size=args["queue_size"],
+        on_progress=print_progress,
+    )
+
+    print(
+        f"Processed {stats['frames_processed']} frames, "
+        f"found {stats['detections']} objects"
+    )
+    print(
+        f"Total time: {stats['elapsed']:.2f}s "
+        f"({stats['frames_per_second']:.2f} frames/s)"
+    )
+    if stats["frames_processed"]:
+        print(
+            f"Inference: {stats['inference_time']:.2f}s "
+            f"({1000 * stats['inference_time'] / stats['frames_processed']:.1f} "
+            "ms/frame)"
+        )
+    if output_path is not None:
+        print(f"Saved annotated video to: {output_path}")
+    if args["jsonl"] is not None:
+        print(f"Saved detections to: {args['jsonl']}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
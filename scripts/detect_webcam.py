@@ -2,20 +2,242 @@
 """
 Script to detect objects in webcam feed using DETR.
 """
-import os
-import cv2
+
 import sys
 import time
 from pathlib import Path
-from datetime import datetime
+
+import cv2
+import numpy as np
 
 # Add the parent directory to the Python path to import our package
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.detr_vision.model import DetrObjectDetector
 from src.detr_vision.camera import Camera
-from src.detr_vision.visualization import draw_detections, save_image
 from src.detr_vision.cli import create_webcam_detection_parser, parse_args
+from src.detr_vision.model import DetrObjectDetector
+from src.detr_vision.motion import MotionGate, MotionGatedDetector
+from src.detr_vision.streaming import DetectionPipeline
+from src.detr_vision.tracking import TrackingDetector
+from src.detr_vision.visualization import draw_detections
+from src.detr_vision.writer import OutputWriter
+
+# Shown until the first detections of the pipelined mode are available
+NO_DETECTIONS = {
+    "boxes": np.zeros((0, 4), dtype=np.float32),
+    "scores": np.zeros(0, dtype=np.float32),
+    "labels": [],
+}
+
+
+def draw_overlay(frame, lines):
+    """
+    Draw status text lines in the top-left corner of a frame.
+    """
+    for i, text in enumerate(lines):
+        cv2.putText(
+            frame,
+            text,
+            (10, 30 + 30 * i),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            1.0,
+            (0, 255, 0),
+            2,
+        )
+
+
+def save_frame(writer, result_frame, detections, key, save_all):
+    """
+    Queue an annotated frame to be saved when 's' is pressed or all frames are
+    saved, and log its detections.
+    """
+    save = key == ord("s") or save_all
+    path = writer.write(result_frame if save else None, detections)
+    if key == ord("s"):
+        if path is None:
+            print("Couldn't save frame: the writer is falling behind")
+        else:
+            print(f"Saving frame to: {path}")
+
+
+def print_writer_stats(writer):
+    """
+    Print how many frames were saved and dropped, and the log statistics.
+    """
+    stats = writer.stats()
+    if stats["frames_queued"] or stats["frames_dropped"]:
+        print(
+            f"Saved {stats['frames_written']} frames to {writer.output_dir} "
+            f"({1000 * stats['mean_write_time']:.1f} ms/frame on the writer threads), "
+            f"dropped {stats['frames_dropped']} (writer queue full, peak depth "
+            f"{stats['max_queue_depth']}), write errors: {stats['write_errors']}"
+        )
+    if writer.last_error:
+        print(f"Last write error: {writer.last_error}")
+    if writer.log_path is not None:
+        print(
+            f"Logged {stats['records_logged']} frames to {writer.log_path} "
+            f"in {stats['log_flushes']} writes"
+        )
+
+
+def run_pipelined(camera, detector, threshold, writer, save_all):
+    """
+    Display loop for pipelined detection.
+
+    Capture and inference run on background threads; this loop shows every
+    new frame with the latest available detections drawn on it.
+    """
+    last_seq = 0
+    with DetectionPipeline(camera, detector, threshold=threshold) as pipeline:
+        while pipeline.running:
+            frame_item = pipeline.latest_frame()
+            if frame_item is None or frame_item[0] == last_seq:
+                # No new frame yet; keep the window responsive
+                if cv2.waitKey(1) & 0xFF == ord("q"):
+                    break
+                continue
+
+            last_seq, _, frame = frame_item
+            detection_item = pipeline.latest_detections()
+            detections = detection_item[2] if detection_item else NO_DETECTIONS
+
+            # Re-draw the latest detections on the newest frame
+            result_frame = draw_detections(
+                frame, detections, confidence_threshold=threshold
+            )
+
+            stats = pipeline.stats()
+            draw_overlay(
+                result_frame,
+                [
+                    f"Capture FPS: {stats['capture_fps']:.1f}",
+                    f"Inference FPS: {stats['inference_fps']:.1f}",
+                    f"Latency: {1000 * stats['latency']:.0f} ms",
+                ],
+            )
+
+            cv2.imshow("DETR Object Detection", result_frame)
+
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord("q"):
+                break
+            save_frame(writer, result_frame, detections, key, save_all)
+
+        stats = pipeline.stats()
+        print(
+            f"Capture FPS: {stats['capture_fps']:.1f}, "
+            f"inference FPS: {stats['inference_fps']:.1f}, "
+            f"latency: {1000 * stats['latency']:.0f} ms, "
+            f"frames skipped by inference: {stats['dropped_frames']}"
+        )
+
+
+def run_tracked(camera, tracking_detector, writer, save_all):
+    """
+    Display loop that tracks objects on every frame and runs the model only when needed.
+    """
+    for frame in camera.stream():
+        tracks = tracking_detector.process(frame)
+
+        # Show the track id next to each class name
+        result_frame = draw_detections(
+            frame,
+            {
+                "boxes": tracks.boxes,
+                "scores": tracks.scores,
+                "labels": [
+                    f"{label} #{track_id}"
+                    for label, track_id in zip(tracks.labels, tracks.track_ids.tolist())
+                ],
+            },
+            inplace=True,
+        )
+
+        stats = tracking_detector.stats()
+        draw_overlay(
+            result_frame,
+            [
+                f"Display FPS: {stats['display_fps']:.1f}",
+                f"Inference FPS: {stats['inference_fps']:.1f}",
+            ],
+        )
+
+        cv2.imshow("DETR Object Detection", result_frame)
+
+        key = cv2.waitKey(1) & 0xFF
+        if key == ord("q"):
+            break
+        save_frame(writer, result_frame, tracks, key, save_all)
+
+    stats = tracking_detector.stats()
+    print(
+        f"Display FPS: {stats['display_fps']:.1f}, "
+        f"inference FPS: {stats['inference_fps']:.1f}, "
+        f"model run on {stats['inferences']}/{stats['frames']} frames "
+        f"({100 * stats['inference_fraction']:.0f}%), triggers: {stats['triggers']}"
+    )
+
+
+def run_serial(camera, detector, threshold, writer, save_all, gated_detector=None):
+    """
+    Display loop that captures, detects and displays one frame at a time.
+
+    With a motion-gated detector, frames without motion reuse the previous
+    detections instead of running the model.
+    """
+    # Initialize FPS calculation
+    fps_start_time = time.time()
+    fps_frame_count = 0
+    fps = 0
+
+    for frame in camera.stream():
+        # Update FPS calculation
+        fps_frame_count += 1
+        elapsed_time = time.time() - fps_start_time
+        if elapsed_time > 1.0:  # Update FPS every second
+            fps = fps_frame_count / elapsed_time
+            fps_frame_count = 0
+            fps_start_time = time.time()
+
+        # Detect objects in the frame
+        if gated_detector is not None:
+            detections = gated_detector.process(frame)
+        else:
+            detections = detector.detect(frame, threshold=threshold)
+
+        # Draw detections on the frame
+        result_frame = draw_detections(
+            frame, detections, confidence_threshold=threshold, inplace=True
+        )
+
+        # Add FPS display
+        overlay = [f"FPS: {fps:.1f}"]
+        if gated_detector is not None:
+            stats = gated_detector.stats()
+            overlay.append(f"Skipped: {100 * stats['skipped_fraction']:.0f}%")
+        draw_overlay(result_frame, overlay)
+
+        # Display the result
+        cv2.imshow("DETR Object Detection", result_frame)
+
+        # Handle key presses
+        key = cv2.waitKey(1) & 0xFF
+
+        # Quit if 'q' is pressed
+        if key == ord("q"):
+            break
+
+        # Save the current frame if 's' is pressed, or every frame with --save-path
+        save_frame(writer, result_frame, detections, key, save_all)
+
+    if gated_detector is not None:
+        stats = gated_detector.stats()
+        print(
+            f"Motion gate skipped {stats['skipped']}/{stats['frames']} frames "
+            f"({100 * stats['skipped_fraction']:.0f}%), "
+            f"cropped inferences: {stats['cropped']}"
+        )
 
 
 def main():
@@ -29,89 +251,75 @@ def main():
     # Create the object detector
     detector = DetrObjectDetector(
         model_name=args["model"],
-        device=args["device"]
+        device=args["device"],
+        precision=args["precision"],
+        fast_preprocess=args["fast_preprocess"],
+        model_cache_dir=args["model_cache_dir"],
+        backend=args["backend"],
+        backend_path=args["backend_path"],
+        input_size=args["input_size"],
+        max_input_size=args["max_input_size"],
     )
 
-    # Create save directory if specified
+    # Frames are saved and logged on background threads. With --save-path every frame
+    # is saved there; otherwise frames saved with 's' go to the default output
+    # directory.
     save_path = args["save_path"]
-    if save_path:
-        os.makedirs(save_path, exist_ok=True)
+    save_all = save_path is not None
+    writer = OutputWriter(
+        save_path or "data/outputs",
+        prefix="detection" if save_all else "webcam",
+        image_format=args["save_format"],
+        quality=args["save_quality"],
+        num_workers=args["save_workers"],
+        queue_size=args["save_queue_size"],
+        log_path=args["save_log"],
+    )
+    if save_all:
         print(f"Saving frames to: {save_path}")
+    if args["save_log"]:
+        print(f"Logging detections to: {args['save_log']}")
 
-    # Initialize FPS calculation
-    fps_start_time = time.time()
-    fps_frame_count = 0
-    fps = 0
-
-    print(f"Starting webcam detection (press 'q' to quit, 's' to save current frame)...")
+    print(
+        f"Starting webcam detection (press 'q' to quit, 's' to save current frame)..."
+    )
 
     # Open the camera and start detection
-    with Camera(
-            camera_id=args["camera_id"],
-            width=args["width"],
-            height=args["height"]
+    with writer, Camera(
+        camera_id=args["camera_id"], width=args["width"], height=args["height"]
     ) as camera:
-        for frame in camera.stream():
-            # Update FPS calculation
-            fps_frame_count += 1
-            elapsed_time = time.time() - fps_start_time
-            if elapsed_time > 1.0:  # Update FPS every second
-                fps = fps_frame_count / elapsed_time
-                fps_frame_count = 0
-                fps_start_time = time.time()
-
-            # Detect objects in the frame
-            detections = detector.detect(frame, threshold=args["threshold"])
-
-            # Draw detections on the frame
-            result_frame = draw_detections(
-                frame,
-                detections,
-                confidence_threshold=args["threshold"]
+        if args["track"]:
+            tracking_detector = TrackingDetector(
+                detector,
+                threshold=args["threshold"],
+                detect_every=args["detect_every"],
+                motion_threshold=args["motion_threshold"],
+                uncertainty_threshold=args["uncertainty_threshold"],
             )
-
-            # Add FPS display
-            cv2.putText(
-                result_frame,
-                f"FPS: {fps:.1f}",
-                (10, 30),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                1.0,
-                (0, 255, 0),
-                2
+            run_tracked(camera, tracking_detector, writer, save_all)
+        elif args["pipelined"]:
+            run_pipelined(camera, detector, args["threshold"], writer, save_all)
+        else:
+            gated_detector = None
+            if args["motion_gate"] is not None:
+                gated_detector = MotionGatedDetector(
+                    detector,
+                    gate=MotionGate(
+                        threshold=args["motion_gate"], method=args["motion_method"]
+                    ),
+                    threshold=args["threshold"],
+                    crop=args["motion_crop"],
+                )
+            run_serial(
+                camera, detector, args["threshold"], writer, save_all, gated_detector
             )
 
-            # Display the result
-            cv2.imshow("DETR Object Detection", result_frame)
-
-            # Handle key presses
-            key = cv2.waitKey(1) & 0xFF
-
-            # Quit if 'q' is pressed
-            if key == ord('q'):
-                break
-
-            # Save the current frame if 's' is pressed
-            if key == ord('s') or save_path:
-                # Generate timestamp for filename
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
-                if save_path:
-                    # If save_path is specified, use it as the directory
-                    filename = f"detection_{timestamp}.jpg"
-                    output_path = os.path.join(save_path, filename)
-                else:
-                    # Otherwise, save to the default output directory
-                    output_path = f"data/outputs/webcam_{timestamp}.jpg"
-
-                save_image(result_frame, output_path)
-                print(f"Saved frame to: {output_path}")
-
     # Clean up
     cv2.destroyAllWindows()
+    print_writer_stats(writer)
     print("Webcam detection stopped.")
     return 0
 
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""
+Script to export the DETR network to a TorchScript or ONNX file.
+
+The exported graph takes ``pixel_values`` and ``pixel_mask`` of any batch
+and image size and returns ``logits`` and ``pred_boxes``. Load it with
+``--backend torchscript`` or ``--backend onnxruntime`` and ``--backend-path``
+in the detection scripts.
+"""
+
+import sys
+from pathlib import Path
+
+import torch
+
+# Add the parent directory to the Python path to import our package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.detr_vision.backends import (
+    EagerBackend,
+    create_backend,
+    example_inputs,
+    export_model,
+)
+from src.detr_vision.cli import create_export_parser, parse_args
+from src.detr_vision.model import DetrObjectDetector
+
+
+def verify(model, path, export_format, image_size):
+    """
+    Compare the exported graph's outputs with the model's on a padded batch of
+    a different size than it was traced with.
+
+    Returns:
+        Largest absolute differences of the logits and the boxes
+    """
+    height, width = image_size
+    pixel_values, pixel_mask = example_inputs(
+        (height * 3 // 4, width // 2), batch_size=2
+    )
+    # Padding on the right of the second image, as in a batch of mixed sizes
+    pixel_mask[1, :, width // 4 :] = 0
+
+    backend = create_backend(
+        "onnxruntime" if export_format == "onnx" else "torchscript", model, path
+    )
+    expected = EagerBackend(model)(pixel_values, pixel_mask)
+    outputs = backend(pixel_values, pixel_mask)
+    return (
+        float((outputs.logits - expected.logits).abs().max()),
+        float((outputs.pred_boxes - expected.pred_boxes).abs().max()),
+    )
+
+
+def main():
+    """
+    Main function for model export.
+    """
+    # Parse command-line arguments
+    parser = create_export_parser()
+    args = parse_args(parser)
+
+    export_format = args["format"]
+    if export_format is None:
+        export_format = (
+            "onnx" if args["output"].lower().endswith(".onnx") else "torchscript"
+        )
+    image_size = (args["height"], args["width"])
+
+    # Export on the CPU in fp32, which every backend can run
+    detector = DetrObjectDetector(
+        model_name=args["model"], device="cpu", model_cache_dir=args["model_cache_dir"]
+    )
+
+    print(
+        f"Exporting to {export_format} (traced at {image_size[1]}x{image_size[0]})..."
+    )
+    with torch.no_grad():
+        path = export_model(
+            detector.model,
+            args["output"],
+            export_format,
+            image_size,
+            opset=args["opset"],
+        )
+    print(f"Saved {export_format} graph to: {path}")
+
+    if not args["no_verify"]:
+        logits_diff, boxes_diff = verify(
+            detector.model, path, export_format, image_size
+        )
+        print(
+            f"Largest difference from the PyTorch model: logits {logits_diff:.2e}, "
+            f"boxes {boxes_diff:.2e}"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
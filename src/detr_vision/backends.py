@@ -0,0 +1,365 @@
+"""
+Inference backends for the DETR network and export to TorchScript and ONNX.
+
+A backend runs the network on preprocessed ``pixel_values`` and
+``pixel_mask`` tensors and returns its ``logits`` and ``pred_boxes``;
+preprocessing and post-processing stay in ``DetrObjectDetector``, so all
+backends give the same detections up to float rounding.
+"""
+
+import os
+import tempfile
+import warnings
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+import torch
+
+# Backends DetrObjectDetector can run the network on
+BACKENDS = ("eager", "compile", "torchscript", "onnxruntime")
+
+# File formats the network can be exported to
+EXPORT_FORMATS = ("torchscript", "onnx")
+
+# Names of the inputs and outputs of exported graphs
+INPUT_NAMES = ("pixel_values", "pixel_mask")
+OUTPUT_NAMES = ("logits", "pred_boxes")
+
+# Inputs are (batch, 3, height, width) and (batch, height, width); all three are dynamic
+DYNAMIC_AXES = {
+    "pixel_values": {0: "batch", 2: "height", 3: "width"},
+    "pixel_mask": {0: "batch", 1: "height", 2: "width"},
+    "logits": {0: "batch"},
+    "pred_boxes": {0: "batch"},
+}
+
+# Default ONNX operator set
+ONNX_OPSET = 17
+
+
+class DetrOutputs(NamedTuple):
+    """
+    Network outputs, with the attribute names of the transformers outputs.
+    """
+
+    logits: torch.Tensor
+    pred_boxes: torch.Tensor
+
+
+class DetrExportWrapper(torch.nn.Module):
+    """
+    Wraps a ``DetrForObjectDetection`` model to take and return plain tensors,
+    as tracing and the ONNX exporter require.
+    """
+
+    def __init__(self, model: torch.nn.Module):
+        super().__init__()
+        self.model = model
+
+    def forward(
+        self, pixel_values: torch.Tensor, pixel_mask: torch.Tensor
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        outputs = self.model(pixel_values=pixel_values, pixel_mask=pixel_mask)
+        return outputs.logits, outputs.pred_boxes
+
+
+class InferenceBackend:
+    """
+    Runs the DETR network on a batch of preprocessed images.
+    """
+
+    name = None
+
+    def __call__(
+        self, pixel_values: torch.Tensor, pixel_mask: torch.Tensor
+    ) -> DetrOutputs:
+        """
+        Run the network.
+
+        Args:
+            pixel_values: Normalized images of shape (batch, 3, height, width)
+            pixel_mask: Mask of shape (batch, height, width), 1 on image
+                pixels and 0 on padding
+
+        Returns:
+            Class logits of shape (batch, queries, classes + 1) and relative
+            (center_x, center_y, width, height) boxes of shape (batch, queries, 4)
+        """
+        raise NotImplementedError
+
+
+class EagerBackend(InferenceBackend):
+    """
+    Runs the PyTorch model as it is.
+    """
+
+    name = "eager"
+
+    def __init__(self, model: torch.nn.Module):
+        self.model = model
+
+    def __call__(
+        self, pixel_values: torch.Tensor, pixel_mask: torch.Tensor
+    ) -> DetrOutputs:
+        with torch.no_grad():
+            outputs = self.model(pixel_values=pixel_values, pixel_mask=pixel_mask)
+        return DetrOutputs(outputs.logits, outputs.pred_boxes)
+
+
+class CompiledBackend(EagerBackend):
+    """
+    Runs the model compiled with ``torch.compile``.
+
+    Compilation happens on the first call of each new input shape, which
+    takes long (tens of seconds on the CPU), so warm the detector up with
+    the sizes it will see. Shapes are compiled dynamically by default, so
+    the image sizes don't each trigger a recompilation.
+    """
+
+    name = "compile"
+
+    def __init__(self, model: torch.nn.Module, **options):
+        """
+        Initialize the backend.
+
+        Args:
+            model: DETR model
+            **options: Keyword arguments for ``torch.compile``, such as
+                ``mode`` or ``backend``
+        """
+        options.setdefault("dynamic", True)
+        super().__init__(torch.compile(model, **options))
+
+
+class TorchScriptBackend(InferenceBackend):
+    """
+    Runs a traced TorchScript graph of the network.
+    """
+
+    name = "torchscript"
+
+    def __init__(self, module: torch.jit.ScriptModule):
+        self.module = module
+
+    @classmethod
+    def load(cls, path: str, device: str = "cpu") -> "TorchScriptBackend":
+        """
+        Load a graph saved by ``export_model``.
+
+        Args:
+            path: Path of the TorchScript file
+            device: Device to load the graph onto
+
+        Returns:
+            The backend
+        """
+        return cls(torch.jit.load(path, map_location=device).eval())
+
+    def __call__(
+        self, pixel_values: torch.Tensor, pixel_mask: torch.Tensor
+    ) -> DetrOutputs:
+        with torch.no_grad():
+            return DetrOutputs(*self.module(pixel_values, pixel_mask))
+
+
+class OnnxRuntimeBackend(InferenceBackend):
+    """
+    Runs an exported ONNX graph of the network with ONNX Runtime on the CPU.
+
+    Needs the optional ``onnxruntime`` package.
+    """
+
+    name = "onnxruntime"
+
+    def __init__(self, path: str, num_threads: Optional[int] = None):
+        """
+        Initialize the backend.
+
+        Args:
+            path: Path of an ONNX file written by ``export_model``
+            num_threads: Number of intra-op threads. If not specified, uses
+                as many as PyTorch does.
+        """
+        try:
+            import onnxruntime
+        except ImportError as e:
+            raise ImportError(
+                "The onnxruntime backend needs the onnxruntime package "
+                "(pip install onnxruntime)"
+            ) from e
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = num_threads or torch.get_num_threads()
+        self.session = onnxruntime.InferenceSession(
+            path, options, providers=["CPUExecutionProvider"]
+        )
+
+    def __call__(
+        self, pixel_values: torch.Tensor, pixel_mask: torch.Tensor
+    ) -> DetrOutputs:
+        logits, pred_boxes = self.session.run(
+            list(OUTPUT_NAMES),
+            {
+                "pixel_values": pixel_values.detach().cpu().numpy(),
+                "pixel_mask": pixel_mask.detach()
+                .cpu()
+                .numpy()
+                .astype(np.int64, copy=False),
+            },
+        )
+        return DetrOutputs(torch.from_numpy(logits), torch.from_numpy(pred_boxes))
+
+
+def example_inputs(
+    image_size: Tuple[int, int] = (320, 320), batch_size: int = 1, device: str = "cpu"
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    Create inputs to trace the network with.
+
+    The traced graph works for any batch and image size, so the example
+    size only needs to be one the model accepts.
+
+    Args:
+        image_size: (height, width) of the example images
+        batch_size: Number of example images
+        device: Device to create the inputs on
+
+    Returns:
+        Tuple of pixel_values and pixel_mask
+    """
+    height, width = image_size
+    generator = torch.Generator().manual_seed(0)
+    pixel_values = torch.randn((batch_size, 3, height, width), generator=generator)
+    pixel_mask = torch.ones((batch_size, height, width), dtype=torch.int64)
+    return pixel_values.to(device), pixel_mask.to(device)
+
+
+def trace_model(
+    model: torch.nn.Module,
+    image_size: Tuple[int, int] = (320, 320),
+    batch_size: int = 1,
+) -> torch.jit.ScriptModule:
+    """
+    Trace the network into a TorchScript graph.
+
+    Args:
+        model: DETR model in evaluation mode
+        image_size: (height, width) of the example images
+        batch_size: Number of example images
+
+    Returns:
+        Traced graph taking pixel_values and pixel_mask and returning
+        logits and pred_boxes
+    """
+    device = next(model.parameters()).device
+    inputs = example_inputs(image_size, batch_size, device)
+    with torch.no_grad(), warnings.catch_warnings():
+        # The tracer warns about Python values computed from shapes, which
+        # are only ever checked against limits the inputs stay within
+        warnings.simplefilter("ignore", torch.jit.TracerWarning)
+        traced = torch.jit.trace(
+            DetrExportWrapper(model).eval(), inputs, check_trace=False
+        )
+    return torch.jit.freeze(traced.eval()) if device.type == "cpu" else traced
+
+
+def export_model(
+    model: torch.nn.Module,
+    path: str,
+    export_format: str = "onnx",
+    image_size: Tuple[int, int] = (320, 320),
+    batch_size: int = 1,
+    opset: int = ONNX_OPSET,
+) -> str:
+    """
+    Export the network to a TorchScript or ONNX file.
+
+    The batch size, height and width of the inputs are dynamic in the
+    exported graph.
+
+    Args:
+        model: DETR model in evaluation mode
+        path: Path of the file to write
+        export_format: 'torchscript' or 'onnx'
+        image_size: (height, width) of the example images to trace with
+        batch_size: Number of example images
+        opset: ONNX operator set version
+
+    Returns:
+        The path written to
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(
+            f"Unknown export format {export_format!r}, "
+            f"expected one of {', '.join(EXPORT_FORMATS)}"
+        )
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    if export_format == "torchscript":
+        torch.jit.save(trace_model(model, image_size, batch_size), path)
+        return path
+
+    device = next(model.parameters()).device
+    inputs = example_inputs(image_size, batch_size, device)
+    with torch.no_grad(), warnings.catch_warnings():
+        warnings.simplefilter("ignore", torch.jit.TracerWarning)
+        warnings.simplefilter("ignore", DeprecationWarning)
+        # The TorchScript-based exporter handles DETR's data-dependent
+        # padding without the extra onnxscript dependency
+        torch.onnx.export(
+            DetrExportWrapper(model).eval(),
+            inputs,
+            path,
+            input_names=list(INPUT_NAMES),
+            output_names=list(OUTPUT_NAMES),
+            dynamic_axes=DYNAMIC_AXES,
+            opset_version=opset,
+            dynamo=False,
+        )
+    return path
+
+
+def create_backend(
+    name: str,
+    model: torch.nn.Module,
+    path: Optional[str] = None,
+    device: str = "cpu",
+    **options,
+) -> InferenceBackend:
+    """
+    Create an inference backend for a model.
+
+    Args:
+        name: One of ``BACKENDS``
+        model: DETR model in evaluation mode
+        path: For 'torchscript' and 'onnxruntime', a file written by
+            ``export_model`` to load instead of tracing or exporting the
+            model now. Without it, 'onnxruntime' exports the model to a
+            temporary file first.
+        device: Device the model is on
+        **options: Backend options: keyword arguments for ``torch.compile``
+            ('compile') or ``num_threads`` ('onnxruntime')
+
+    Returns:
+        The backend
+    """
+    if name == "eager":
+        return EagerBackend(model)
+    if name == "compile":
+        return CompiledBackend(model, **options)
+    if name == "torchscript":
+        if path is not None:
+            return TorchScriptBackend.load(path, device)
+        return TorchScriptBackend(trace_model(model))
+    if name == "onnxruntime":
+        if device != "cpu":
+            raise ValueError("The onnxruntime backend only runs on the CPU")
+        if path is not None:
+            return OnnxRuntimeBackend(path, **options)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = export_model(model, os.path.join(directory, "model.onnx"), "onnx")
+            return OnnxRuntimeBackend(path, **options)
+    raise ValueError(f"Unknown backend {name!r}, expected one of {', '.join(BACKENDS)}")
@@ -0,0 +1,212 @@
+"""
+Request batching for serving detections to many concurrent callers.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+from .model import DetrObjectDetector, filter_detections
+from .results import Detections
+
+# Tells the worker thread to exit
+_STOP = object()
+
+
+class QueueFullError(RuntimeError):
+    """
+    Raised when a request is submitted while the scheduler queue is full.
+    """
+
+
+class BatchScheduler:
+    """
+    Coalesces concurrent detection requests into batched forward passes.
+
+    Callers submit single images and get a future back. A background worker
+    collects requests until ``max_batch_size`` images are waiting or the oldest
+    one has waited ``max_wait_ms``, runs them through
+    ``DetrObjectDetector.detect_batch`` in one go and resolves every caller's
+    future with its own results.
+    """
+
+    def __init__(
+        self,
+        detector: DetrObjectDetector,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+        max_queue_size: int = 64,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            detector: Loaded object detector shared by all requests
+            max_batch_size: Maximum number of images per forward pass
+            max_wait_ms: Maximum time to wait for a batch to fill up
+            max_queue_size: Maximum number of waiting requests before new
+                ones are rejected with ``QueueFullError``
+        """
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be at least 1, got {max_batch_size}")
+        if max_queue_size < 1:
+            raise ValueError(f"max_queue_size must be at least 1, got {max_queue_size}")
+
+        self.detector = detector
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_queue_size = max_queue_size
+
+        self.num_requests = 0
+        self.num_batches = 0
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def start(self):
+        """
+        Start the background worker thread if it isn't running yet.
+
+        Returns:
+            self for method chaining
+        """
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="detr-batch-scheduler", daemon=True
+                )
+                self._thread.start()
+        return self
+
+    def close(self):
+        """
+        Finish the queued requests and stop the worker thread.
+        """
+        with self._lock:
+            if self._thread is not None:
+                self._queue.put(_STOP)
+                self._thread.join()
+                self._thread = None
+
+    def submit(
+        self, image: Union[np.ndarray, Image.Image], threshold: float = 0.7
+    ) -> Future:
+        """
+        Queue an image for detection.
+
+        Args:
+            image: Input image (can be numpy array from OpenCV or PIL Image)
+            threshold: Confidence threshold for detections
+
+        Returns:
+            Future resolving to the same results as
+            ``DetrObjectDetector.detect``
+
+        Raises:
+            QueueFullError: If ``max_queue_size`` requests are already waiting
+        """
+        self.start()
+
+        future = Future()
+        try:
+            self._queue.put_nowait((image, threshold, future))
+        except queue.Full:
+            raise QueueFullError(
+                f"Detection queue is full ({self.max_queue_size} requests waiting)"
+            ) from None
+        return future
+
+    def detect(
+        self,
+        image: Union[np.ndarray, Image.Image],
+        threshold: float = 0.7,
+        timeout: Optional[float] = None,
+    ) -> Detections:
+        """
+        Submit an image and wait for its detection results.
+
+        Args:
+            image: Input image (can be numpy array from OpenCV or PIL Image)
+            threshold: Confidence threshold for detections
+            timeout: Maximum number of seconds to wait for the result
+
+        Returns:
+            Detection results
+        """
+        return self.submit(image, threshold).result(timeout=timeout)
+
+    def _run(self):
+        """
+        Worker loop: collect requests into batches and process them.
+        """
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._process(batch)
+
+        # Drain anything submitted after close() was called
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                self._process([item])
+
+    def _process(self, batch: List[Tuple]):
+        """
+        Run one batch through the detector and resolve its futures.
+        """
+        batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        images = [image for image, _, _ in batch]
+        thresholds = [threshold for _, threshold, _ in batch]
+
+        try:
+            # Detect at the lowest requested threshold, then filter per request
+            results = self.detector.detect_batch(
+                images, threshold=min(thresholds), batch_size=len(images)
+            )
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        self.num_requests += len(batch)
+        self.num_batches += 1
+
+        for (_, threshold, future), result in zip(batch, results):
+            future.set_result(filter_detections(result, threshold))
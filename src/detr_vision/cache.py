@@ -0,0 +1,244 @@
+"""
+Content-addressed caching of detection results.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Union
+
+import numpy as np
+from PIL import Image
+
+# Rough per-label overhead of a Python string in a list, used for size limits
+_LABEL_OVERHEAD_BYTES = 64
+
+
+def content_key(image: Union[np.ndarray, Image.Image, bytes], model_name: str) -> str:
+    """
+    Compute a cache key from an image's content and the model name.
+
+    Identical pixels give the same key no matter where the image came from.
+    Numpy arrays and PIL images are hashed separately (a BGR array and the
+    equivalent RGB PIL image don't share a key).
+
+    Args:
+        image: Input image (numpy array from OpenCV, PIL Image or raw bytes)
+        model_name: Name or path of the model producing the results
+
+    Returns:
+        Hex digest identifying the image and model
+    """
+    h = hashlib.blake2b(digest_size=20)
+    h.update(model_name.encode("utf-8"))
+
+    if isinstance(image, np.ndarray):
+        h.update(f"ndarray:{image.shape}:{image.dtype}".encode("utf-8"))
+        h.update(np.ascontiguousarray(image).data)
+    elif isinstance(image, Image.Image):
+        h.update(f"pil:{image.mode}:{image.size}".encode("utf-8"))
+        h.update(image.tobytes())
+    else:
+        h.update(b"bytes:")
+        h.update(image)
+
+    return h.hexdigest()
+
+
+class DetectionCache:
+    """
+    LRU cache of unfiltered detection results keyed by image content.
+
+    Entries hold every post-processed detection before threshold filtering, so
+    a cached image can be served at any threshold without a forward pass. The
+    in-memory tier is bounded by both entry count and approximate size in
+    bytes. An optional sqlite file adds a persistent second tier that survives
+    restarts and is shared by processes pointing at the same file.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        disk_path: Optional[str] = None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of results held in memory
+            max_bytes: Maximum approximate size of the results held in memory
+            disk_path: Path of an sqlite file to use as a second cache tier.
+                If not specified, results are only cached in memory.
+        """
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be at least 1, got {max_entries}")
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_path = disk_path
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        self._db = None
+        if disk_path is not None:
+            directory = os.path.dirname(disk_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS detections ("
+                "key TEXT PRIMARY KEY, boxes BLOB, scores BLOB, labels TEXT)"
+            )
+            self._db.commit()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Look up the detection results for a key.
+
+        Args:
+            key: Cache key from ``content_key``
+
+        Returns:
+            Unfiltered detection results, or None if the key isn't cached
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+            entry = self._read_disk(key)
+            if entry is not None:
+                self.disk_hits += 1
+                self._store(key, entry)
+                return entry
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, detections: Dict):
+        """
+        Store unfiltered detection results for a key.
+
+        Args:
+            key: Cache key from ``content_key``
+            detections: Detection results in the format of
+                ``DetrObjectDetector.detect``, before threshold filtering
+        """
+        boxes = np.array(detections["boxes"], dtype=np.float32).reshape(-1, 4)
+        scores = np.array(detections["scores"], dtype=np.float32).reshape(-1)
+        # Cached arrays are shared between callers, so keep them read-only
+        boxes.flags.writeable = False
+        scores.flags.writeable = False
+        entry = {"boxes": boxes, "scores": scores, "labels": list(detections["labels"])}
+
+        with self._lock:
+            self._store(key, entry)
+            self._write_disk(key, entry)
+
+    def clear(self):
+        """
+        Remove all in-memory entries. The disk tier is left untouched.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._total_bytes = 0
+
+    def close(self):
+        """
+        Close the disk tier, if any.
+        """
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> Dict:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hit/miss counters and current memory usage
+        """
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+            }
+
+    def _store(self, key: str, entry: Dict):
+        """
+        Insert an entry into the memory tier and evict to stay within limits.
+        """
+        if key in self._entries:
+            self._total_bytes -= self._sizes[key]
+
+        size = (
+            entry["boxes"].nbytes
+            + entry["scores"].nbytes
+            + sum(len(label) + _LABEL_OVERHEAD_BYTES for label in entry["labels"])
+        )
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        self._sizes[key] = size
+        self._total_bytes += size
+
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+        ):
+            evicted_key, _ = self._entries.popitem(last=False)
+            self._total_bytes -= self._sizes.pop(evicted_key)
+            self.evictions += 1
+
+    def _read_disk(self, key: str) -> Optional[Dict]:
+        if self._db is None:
+            return None
+
+        row = self._db.execute(
+            "SELECT boxes, scores, labels FROM detections WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        boxes = np.frombuffer(row[0], dtype=np.float32).reshape(-1, 4)
+        scores = np.frombuffer(row[1], dtype=np.float32)
+        return {"boxes": boxes, "scores": scores, "labels": json.loads(row[2])}
+
+    def _write_disk(self, key: str, entry: Dict):
+        if self._db is None:
+            return
+
+        self._db.execute(
+            "INSERT OR REPLACE INTO detections (key, boxes, scores, labels) "
+            "VALUES (?, ?, ?, ?)",
+            (
+                key,
+                entry["boxes"].tobytes(),
+                entry["scores"].tobytes(),
+                json.dumps(entry["labels"]),
+            ),
+        )
+        self._db.commit()
@@ -1,9 +1,14 @@
 """
 Camera handling module for webcam access and image processing.
 """
-import cv2
+
+import threading
 import time
-from typing import Tuple, Generator, Optional
+from collections import deque
+from typing import Any, Dict, Generator, NamedTuple, Optional, Tuple, Union
+
+import cv2
+import numpy as np
 
 
 class Camera:
@@ -11,12 +16,16 @@ class Camera:
     A class to handle webcam operations.
     """
 
-    def __init__(self, camera_id: int = 0, width: int = 640, height: int = 480):
+    def __init__(
+        self, camera_id: Union[int, str, Any] = 0, width: int = 640, height: int = 480
+    ):
         """
         Initialize the camera.
 
         Args:
-            camera_id: ID of the camera to use (usually 0 for built-in webcam)
+            camera_id: ID of the camera to use (usually 0 for built-in webcam),
+                path of a video file, or an object with the same interface as
+                ``cv2.VideoCapture`` such as a ``SyntheticFrameSource``
             width: Desired width of the camera feed
             height: Desired height of the camera feed
         """
@@ -46,7 +55,22 @@ class Camera:
         Returns:
             self for method chaining
         """
-        self.cap = cv2.VideoCapture(self.camera_id)
+        self._open_capture()
+
+        # Give the camera time to warm up (files and synthetic sources don't need it)
+        if isinstance(self.camera_id, int):
+            time.sleep(0.5)
+
+        return self
+
+    def _open_capture(self):
+        """
+        Create the capture object and apply the desired frame size.
+        """
+        if isinstance(self.camera_id, (int, str)):
+            self.cap = cv2.VideoCapture(self.camera_id)
+        else:
+            self.cap = self.camera_id
 
         if not self.cap.isOpened():
             raise RuntimeError(f"Failed to open camera with ID {self.camera_id}")
@@ -55,11 +79,6 @@ class Camera:
         self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
         self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
 
-        # Give the camera time to warm up
-        time.sleep(0.5)
-
-        return self
-
     def close(self):
         """
         Close the camera connection.
@@ -91,8 +110,295 @@ class Camera:
             self.open()
 
         while True:
-            success, frame = self.cap.read()
+            success, frame = self.read()
             if not success:
                 break
 
-            yield frame
\ No newline at end of file
+            yield frame
+
+
+class TimestampedFrame(NamedTuple):
+    """
+    A frame grabbed by a ``ThreadedCamera``.
+    """
+
+    seq: int  # Sequence number, starting at 1
+    timestamp: float  # time.monotonic() when the frame was grabbed
+    image: np.ndarray
+
+
+class ThreadedCamera(Camera):
+    """
+    A camera that grabs frames continuously on a background thread.
+
+    The device is drained into a small ring buffer as fast as it delivers
+    frames, so the driver's own buffer never fills up and ``latest`` always
+    returns a fresh frame without blocking. Frames that are never returned,
+    because they were pushed out of the buffer or skipped by ``latest``, are
+    counted as dropped. Video files are read as fast as they decode.
+    """
+
+    def __init__(
+        self,
+        camera_id: Union[int, str, Any] = 0,
+        width: int = 640,
+        height: int = 480,
+        buffer_size: int = 1,
+        warmup_timeout: float = 5.0,
+    ):
+        """
+        Initialize the camera.
+
+        Args:
+            camera_id: ID of the camera to use, path of a video file, or an
+                object with the same interface as ``cv2.VideoCapture``
+            width: Desired width of the camera feed
+            height: Desired height of the camera feed
+            buffer_size: Number of most recent frames to keep
+            warmup_timeout: Maximum number of seconds ``open`` waits for the
+                first frame
+        """
+        super().__init__(camera_id=camera_id, width=width, height=height)
+
+        if buffer_size < 1:
+            raise ValueError(f"buffer_size must be at least 1, got {buffer_size}")
+
+        self.buffer_size = buffer_size
+        self.warmup_timeout = warmup_timeout
+
+        self.frames_grabbed = 0
+        self.frames_dropped = 0
+
+        self._buffer = deque(maxlen=buffer_size)
+        self._condition = threading.Condition()
+        self._last_read_seq = 0
+        self._finished = False
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def open(self):
+        """
+        Open the camera, start grabbing and wait for the first frame.
+
+        Returns:
+            self for method chaining
+        """
+        self._open_capture()
+
+        self._buffer.clear()
+        self._finished = False
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._grab_loop, name="camera-grab", daemon=True
+        )
+        self._thread.start()
+
+        # Poll until the device delivers a frame instead of sleeping a fixed time
+        with self._condition:
+            ready = self._condition.wait_for(
+                lambda: self._buffer or self._finished, self.warmup_timeout
+            )
+        if not ready or not self._buffer:
+            self.close()
+            raise RuntimeError(
+                f"No frames received from camera with ID {self.camera_id}"
+            )
+
+        return self
+
+    def close(self):
+        """
+        Stop grabbing and close the camera connection.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        super().close()
+
+    def latest(self) -> Optional[TimestampedFrame]:
+        """
+        Get the most recent frame without waiting.
+
+        Returns:
+            The newest grabbed frame, or None if no frame has been grabbed yet
+        """
+        with self._condition:
+            if not self._buffer:
+                return None
+            frame = self._buffer[-1]
+            # Older unread frames are skipped
+            self.frames_dropped += sum(
+                1 for f in self._buffer if self._last_read_seq < f.seq < frame.seq
+            )
+            self._last_read_seq = max(self._last_read_seq, frame.seq)
+            return frame
+
+    def read(
+        self, timeout: Optional[float] = None
+    ) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Wait for a frame newer than the last one returned and read it.
+
+        Args:
+            timeout: Maximum number of seconds to wait for a new frame
+
+        Returns:
+            Tuple of (success, frame); success is False once the source has
+            ended (or the wait timed out)
+        """
+        if self._thread is None:
+            raise RuntimeError("Camera is not opened. Call open() first.")
+
+        frame = self.read_frame(timeout)
+        if frame is None:
+            return False, None
+        return True, frame.image
+
+    def read_frame(self, timeout: Optional[float] = None) -> Optional[TimestampedFrame]:
+        """
+        Wait for the oldest buffered frame newer than the last one returned.
+
+        With the default ``buffer_size`` of 1 this is always the newest frame.
+
+        Args:
+            timeout: Maximum number of seconds to wait for a new frame
+
+        Returns:
+            The frame, or None once the source has ended (or the wait timed out)
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._has_unread() or self._finished, timeout
+            )
+            for frame in self._buffer:
+                if frame.seq > self._last_read_seq:
+                    self._last_read_seq = frame.seq
+                    return frame
+            return None
+
+    def stats(self) -> Dict:
+        """
+        Get frame counters.
+
+        Returns:
+            Dictionary with the number of grabbed and dropped frames
+        """
+        with self._condition:
+            return {
+                "frames_grabbed": self.frames_grabbed,
+                "frames_dropped": self.frames_dropped,
+            }
+
+    def _has_unread(self) -> bool:
+        return bool(self._buffer) and self._buffer[-1].seq > self._last_read_seq
+
+    def _grab_loop(self):
+        seq = 0
+        try:
+            while not self._stop_event.is_set():
+                success, image = self.cap.read()
+                if not success:
+                    break
+
+                seq += 1
+                frame = TimestampedFrame(seq, time.monotonic(), image)
+                with self._condition:
+                    if len(self._buffer) == self.buffer_size:
+                        evicted = self._buffer[0]
+                        if evicted.seq > self._last_read_seq:
+                            self.frames_dropped += 1
+                    self._buffer.append(frame)
+                    self.frames_grabbed += 1
+                    self._condition.notify_all()
+        finally:
+            with self._condition:
+                self._finished = True
+                self._condition.notify_all()
+
+
+class SyntheticFrameSource:
+    """
+    A fake video device that generates frames, for testing without hardware.
+
+    It implements the parts of the ``cv2.VideoCapture`` interface used by
+    ``Camera``. Each frame shows a white square moving across a dark
+    background, and the frame index is encoded in the top-left pixel.
+    """
+
+    def __init__(
+        self,
+        width: int = 640,
+        height: int = 480,
+        num_frames: Optional[int] = None,
+        fps: Optional[float] = None,
+    ):
+        """
+        Initialize the source.
+
+        Args:
+            width: Frame width
+            height: Frame height
+            num_frames: Number of frames before the source ends; unlimited if
+                not specified
+            fps: Rate at which frames are delivered; as fast as possible if
+                not specified
+        """
+        self.width = width
+        self.height = height
+        self.num_frames = num_frames
+        self.fps = fps
+        self.frame_index = 0
+        self._opened = True
+        self._next_time = None
+
+    def isOpened(self) -> bool:
+        return self._opened
+
+    def set(self, prop_id: int, value: float) -> bool:
+        if prop_id == cv2.CAP_PROP_FRAME_WIDTH:
+            self.width = int(value)
+        elif prop_id == cv2.CAP_PROP_FRAME_HEIGHT:
+            self.height = int(value)
+        elif prop_id == cv2.CAP_PROP_FPS:
+            self.fps = value
+        else:
+            return False
+        return True
+
+    def get(self, prop_id: int) -> float:
+        if prop_id == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop_id == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        if prop_id == cv2.CAP_PROP_FPS:
+            return float(self.fps or 0)
+        if prop_id == cv2.CAP_PROP_FRAME_COUNT:
+            return float(self.num_frames or -1)
+        return 0.0
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if not self._opened:
+            return False, None
+        if self.num_frames is not None and self.frame_index >= self.num_frames:
+            return False, None
+
+        if self.fps:
+            # Pace frames like a real device
+            now = time.monotonic()
+            if self._next_time is not None and now < self._next_time:
+                time.sleep(self._next_time - now)
+            self._next_time = max(now, self._next_time or now) + 1.0 / self.fps
+
+        frame = np.full((self.height, self.width, 3), 32, dtype=np.uint8)
+        size = max(min(self.width, self.height) // 4, 1)
+        x = (self.frame_index * 8) % max(self.width - size, 1)
+        y = (self.height - size) // 2
+        frame[y : y + size, x : x + size] = 255
+        frame[0, 0] = self.frame_index % 256
+
+        self.frame_index += 1
+        return True, frame
+
+    def release(self):
+        self._opened = False
@@ -1,9 +1,82 @@
 """
 Command-line interface module for the DETR Vision project.
 """
+
 import argparse
 import os
-from typing import Dict, Any
+from typing import Any, Dict
+
+from .backends import BACKENDS, EXPORT_FORMATS
+from .model import PRECISIONS
+from .tiling import MERGE_METHODS
+
+
+def add_model_arguments(parser: argparse.ArgumentParser):
+    """
+    Add the arguments controlling how the detector is loaded and run.
+
+    Args:
+        parser: Argument parser to add the arguments to
+    """
+    parser.add_argument(
+        "--precision",
+        type=str,
+        choices=PRECISIONS,
+        default="fp32",
+        help="Numeric precision for inference. 'int8-dynamic' quantizes the "
+        "transformer layers and is CPU only.",
+    )
+
+    parser.add_argument(
+        "--fast-preprocess",
+        action="store_true",
+        help="Resize and normalize frames directly from the OpenCV array instead of "
+        "going through PIL and the DETR image processor",
+    )
+
+    parser.add_argument(
+        "--model-cache-dir",
+        type=str,
+        default=None,
+        help="Directory to keep a local copy of the model in. The first run saves it "
+        "there; later runs load it from there without contacting the Hub.",
+    )
+
+    parser.add_argument(
+        "--backend",
+        type=str,
+        choices=BACKENDS,
+        default="eager",
+        help="What runs the network: the PyTorch model, torch.compile, a traced "
+        "TorchScript graph or ONNX Runtime (CPU only). 'torchscript' and "
+        "'onnxruntime' need fp32 precision.",
+    )
+
+    parser.add_argument(
+        "--backend-path",
+        type=str,
+        default=None,
+        help="File written by scripts/export_model.py to load for the torchscript and "
+        "onnxruntime backends. If not specified, the model is traced or exported "
+        "at startup.",
+    )
+
+    parser.add_argument(
+        "--input-size",
+        type=int,
+        default=None,
+        help="Size the shorter image side is resized to for the model (e.g. 512). "
+        "Smaller is faster but finds fewer small objects. If not specified, the "
+        "model's setting (800) is used.",
+    )
+
+    parser.add_argument(
+        "--max-input-size",
+        type=int,
+        default=None,
+        help="Maximum size of the longer image side after resizing. If not specified, "
+        "it keeps the model's ratio to --input-size (1333 / 800).",
+    )
 
 
 def create_image_detection_parser() -> argparse.ArgumentParser:
@@ -15,36 +88,37 @@ def create_image_detection_parser() -> argparse.ArgumentParser:
     """
     parser = argparse.ArgumentParser(
         description="Detect objects in an image using DETR.",
-        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
     )
 
     # Required arguments
     parser.add_argument(
         "image_path",
         type=str,
-        help="Path to the input image"
+        help="Path to the input image, or a directory, glob pattern (quoted) or "
+        ".txt/.lst file listing images to process in batch mode",
     )
 
     # Optional arguments
     parser.add_argument(
-        "--model",
-        type=str,
-        default="facebook/detr-resnet-50",
-        help="DETR model to use"
+        "--model", type=str, default="facebook/detr-resnet-50", help="DETR model to use"
     )
 
     parser.add_argument(
         "--threshold",
         type=float,
         default=0.7,
-        help="Confidence threshold for detections"
+        help="Confidence threshold for detections",
     )
 
     parser.add_argument(
         "--output",
         type=str,
         default=None,
-        help="Path to save the output image. If not specified, will use 'data/outputs/result_<filename>'"
+        help=(
+            "Path to save the output image. If not specified, will use "
+            "'data/outputs/result_<filename>'"
+        ),
     )
 
     parser.add_argument(
@@ -52,13 +126,87 @@ def create_image_detection_parser() -> argparse.ArgumentParser:
         type=str,
         choices=["cpu", "cuda"],
         default=None,
-        help="Device to run the model on (cpu or cuda). If not specified, will use CUDA if available."
+        help=(
+            "Device to run the model on (cpu or cuda). If not specified, will use "
+            "CUDA if available."
+        ),
     )
 
+    add_model_arguments(parser)
+
     parser.add_argument(
-        "--display",
-        action="store_true",
-        help="Display the detection results"
+        "--display", action="store_true", help="Display the detection results"
+    )
+
+    # Tiled detection arguments
+    parser.add_argument(
+        "--tile-size",
+        type=int,
+        default=None,
+        help="Detect on overlapping square tiles of this many pixels, to find small "
+        "objects in large images. If not specified, the whole image is used.",
+    )
+
+    parser.add_argument(
+        "--tile-overlap",
+        type=float,
+        default=0.2,
+        help="Fraction of the tile size shared by neighbouring tiles",
+    )
+
+    parser.add_argument(
+        "--tile-batch-size",
+        type=int,
+        default=4,
+        help="Maximum number of tiles per forward pass",
+    )
+
+    parser.add_argument(
+        "--tile-merge",
+        type=str,
+        choices=MERGE_METHODS,
+        default="nms",
+        help="How to merge duplicate detections from overlapping tiles: non-maximum "
+        "suppression or weighted box fusion",
+    )
+
+    # Batch mode arguments
+    parser.add_argument(
+        "--output-dir",
+        type=str,
+        default="data/outputs",
+        help="Directory to save annotated images to in batch mode",
+    )
+
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=8,
+        help="Number of images per forward pass in batch mode",
+    )
+
+    parser.add_argument(
+        "--readers",
+        type=int,
+        default=4,
+        help="Number of image decoding threads in batch mode",
+    )
+
+    parser.add_argument(
+        "--writers",
+        type=int,
+        default=4,
+        help="Number of drawing/saving threads in batch mode",
+    )
+
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=32,
+        help=(
+            "Maximum number of decoded images buffered ahead of the model in "
+            "batch mode"
+        ),
     )
 
     return parser
@@ -73,43 +221,216 @@ def create_webcam_detection_parser() -> argparse.ArgumentParser:
     """
     parser = argparse.ArgumentParser(
         description="Detect objects in webcam feed using DETR.",
-        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
     )
 
     # Optional arguments
     parser.add_argument(
-        "--model",
-        type=str,
-        default="facebook/detr-resnet-50",
-        help="DETR model to use"
+        "--model", type=str, default="facebook/detr-resnet-50", help="DETR model to use"
     )
 
     parser.add_argument(
         "--threshold",
         type=float,
         default=0.5,
-        help="Confidence threshold for detections"
+        help="Confidence threshold for detections",
+    )
+
+    parser.add_argument("--camera-id", type=int, default=0, help="Camera ID to use")
+
+    parser.add_argument("--width", type=int, default=640, help="Camera width")
+
+    parser.add_argument("--height", type=int, default=480, help="Camera height")
+
+    parser.add_argument(
+        "--device",
+        type=str,
+        choices=["cpu", "cuda"],
+        default=None,
+        help=(
+            "Device to run the model on (cpu or cuda). If not specified, will use "
+            "CUDA if available."
+        ),
     )
 
+    add_model_arguments(parser)
+
     parser.add_argument(
-        "--camera-id",
+        "--save-path",
+        type=str,
+        default=None,
+        help="Directory to save every frame with its detections to, numbered in order. "
+        "Frames are written on background threads and dropped when they fall behind.",
+    )
+
+    parser.add_argument(
+        "--save-format",
+        type=str,
+        choices=["jpeg", "png", "webp"],
+        default="jpeg",
+        help="Image format of saved frames",
+    )
+
+    parser.add_argument(
+        "--save-quality",
         type=int,
-        default=0,
-        help="Camera ID to use"
+        default=None,
+        help="Quality (1 to 100) of saved JPEG and WebP frames. OpenCV's default "
+        "if not specified.",
     )
 
     parser.add_argument(
-        "--width",
+        "--save-workers",
         type=int,
-        default=640,
-        help="Camera width"
+        default=2,
+        help="Number of threads encoding and writing saved frames",
     )
 
     parser.add_argument(
-        "--height",
+        "--save-queue-size",
         type=int,
-        default=480,
-        help="Camera height"
+        default=32,
+        help=(
+            "Maximum number of frames waiting to be written before new ones are "
+            "dropped"
+        ),
+    )
+
+    parser.add_argument(
+        "--save-log",
+        type=str,
+        default=None,
+        help="JSONL file to append the detections of every frame to, written in "
+        "batches on a background thread",
+    )
+
+    parser.add_argument(
+        "--pipelined",
+        action="store_true",
+        help="Capture and run detection on background threads, always detecting on "
+        "the newest frame and re-drawing the last detections in between",
+    )
+
+    # Tracking arguments
+    parser.add_argument(
+        "--track",
+        action="store_true",
+        help="Track objects with persistent ids and run the model only on some frames, "
+        "moving the tracked boxes in between. Takes precedence over --pipelined.",
+    )
+
+    parser.add_argument(
+        "--detect-every",
+        type=int,
+        default=5,
+        help="With --track, run the model at least every this many frames",
+    )
+
+    parser.add_argument(
+        "--motion-threshold",
+        type=float,
+        default=None,
+        help="With --track, also run the model when more than this fraction of the "
+        "downscaled frame changed since the last detected frame (e.g. 0.02), "
+        "measured like --motion-gate",
+    )
+
+    parser.add_argument(
+        "--uncertainty-threshold",
+        type=float,
+        default=None,
+        help="With --track, also run the model when the tracker's position "
+        "uncertainty, relative to the box size, exceeds this value (e.g. 0.3)",
+    )
+
+    # Motion gate arguments
+    parser.add_argument(
+        "--motion-gate",
+        type=float,
+        default=None,
+        help="Skip the model on frames where at most this fraction of the downscaled "
+        "frame changed (e.g. 0.005), reusing the previous detections. For fixed "
+        "cameras; not combined with --track or --pipelined.",
+    )
+
+    parser.add_argument(
+        "--motion-method",
+        type=str,
+        choices=["difference", "background"],
+        default="difference",
+        help="With --motion-gate, compare frames with the last detected frame or with "
+        "a running background average",
+    )
+
+    parser.add_argument(
+        "--motion-crop",
+        action="store_true",
+        help="With --motion-gate, run the model only on the region that changed when "
+        "it is small, keeping the earlier detections elsewhere",
+    )
+
+    return parser
+
+
+def create_video_detection_parser() -> argparse.ArgumentParser:
+    """
+    Create a parser for video file detection command-line arguments.
+
+    Returns:
+        Configured argument parser
+    """
+    parser = argparse.ArgumentParser(
+        description="Detect objects in a video file using DETR.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+
+    # Required arguments
+    parser.add_argument("video_path", type=str, help="Path to the input video")
+
+    # Optional arguments
+    parser.add_argument(
+        "--model", type=str, default="facebook/detr-resnet-50", help="DETR model to use"
+    )
+
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.7,
+        help="Confidence threshold for detections",
+    )
+
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Path to save the annotated video. If not specified, will use "
+        "'data/outputs/result_<filename>'",
+    )
+
+    parser.add_argument(
+        "--no-video",
+        action="store_true",
+        help="Don't write an annotated video (e.g. when only --jsonl is needed)",
+    )
+
+    parser.add_argument(
+        "--jsonl",
+        type=str,
+        default=None,
+        help="Path to save per-frame detections as JSON Lines",
+    )
+
+    parser.add_argument("--stride", type=int, default=1, help="Process every Nth frame")
+
+    parser.add_argument(
+        "--batch-size", type=int, default=4, help="Number of frames per forward pass"
+    )
+
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=16,
+        help="Maximum number of frames buffered between pipeline stages",
     )
 
     parser.add_argument(
@@ -117,14 +438,184 @@ def create_webcam_detection_parser() -> argparse.ArgumentParser:
         type=str,
         choices=["cpu", "cuda"],
         default=None,
-        help="Device to run the model on (cpu or cuda). If not specified, will use CUDA if available."
+        help=(
+            "Device to run the model on (cpu or cuda). If not specified, will use "
+            "CUDA if available."
+        ),
     )
 
+    add_model_arguments(parser)
+
+    return parser
+
+
+def create_precision_comparison_parser() -> argparse.ArgumentParser:
+    """
+    Create a parser for the precision comparison command-line arguments.
+
+    Returns:
+        Configured argument parser
+    """
+    parser = argparse.ArgumentParser(
+        description=(
+            "Compare accuracy and latency of reduced-precision inference against "
+            "fp32."
+        ),
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    reduced_precisions = [precision for precision in PRECISIONS if precision != "fp32"]
+
     parser.add_argument(
-        "--save-path",
+        "images",
+        type=str,
+        nargs="*",
+        default=["data/images/car.jpg"],
+        help="Paths of the sample images",
+    )
+
+    parser.add_argument(
+        "--model", type=str, default="facebook/detr-resnet-50", help="DETR model to use"
+    )
+
+    parser.add_argument(
+        "--precisions",
+        type=str,
+        nargs="+",
+        choices=reduced_precisions,
+        default=reduced_precisions,
+        help="Precisions to compare against fp32",
+    )
+
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.7,
+        help="Confidence threshold used to count detections and compare boxes",
+    )
+
+    parser.add_argument(
+        "--runs", type=int, default=5, help="Number of timed runs per image"
+    )
+
+    return parser
+
+
+def create_input_size_comparison_parser() -> argparse.ArgumentParser:
+    """
+    Create a parser for the input size comparison command-line arguments.
+
+    Returns:
+        Configured argument parser
+    """
+    parser = argparse.ArgumentParser(
+        description="Compare latency and detections at several model input sizes.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+
+    parser.add_argument(
+        "images",
+        type=str,
+        nargs="*",
+        default=["data/images/car.jpg"],
+        help="Paths of the sample images",
+    )
+
+    parser.add_argument(
+        "--model", type=str, default="facebook/detr-resnet-50", help="DETR model to use"
+    )
+
+    parser.add_argument(
+        "--input-sizes",
+        type=int,
+        nargs="+",
+        default=[640, 512, 384],
+        help="Sizes of the shorter image side to compare against the model's setting",
+    )
+
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.7,
+        help="Confidence threshold used to count and match detections",
+    )
+
+    parser.add_argument(
+        "--iou-threshold",
+        type=float,
+        default=0.5,
+        help="Overlap above which a detection matches one of the same class at the "
+        "model's input size",
+    )
+
+    parser.add_argument(
+        "--runs", type=int, default=5, help="Number of timed runs per image"
+    )
+
+    return parser
+
+
+def create_export_parser() -> argparse.ArgumentParser:
+    """
+    Create a parser for the model export command-line arguments.
+
+    Returns:
+        Configured argument parser
+    """
+    parser = argparse.ArgumentParser(
+        description="Export the DETR network to a TorchScript or ONNX file with "
+        "dynamic batch and image size.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+
+    parser.add_argument("output", type=str, help="Path of the file to write")
+
+    parser.add_argument(
+        "--model",
+        type=str,
+        default="facebook/detr-resnet-50",
+        help="DETR model to export",
+    )
+
+    parser.add_argument(
+        "--format",
+        type=str,
+        choices=EXPORT_FORMATS,
+        default=None,
+        help="Export format. If not specified, it is 'onnx' for .onnx files and "
+        "'torchscript' otherwise.",
+    )
+
+    parser.add_argument(
+        "--height",
+        type=int,
+        default=800,
+        help="Height of the example images the network is traced with",
+    )
+
+    parser.add_argument(
+        "--width",
+        type=int,
+        default=1066,
+        help="Width of the example images the network is traced with",
+    )
+
+    parser.add_argument(
+        "--opset", type=int, default=17, help="ONNX operator set version"
+    )
+
+    parser.add_argument(
+        "--model-cache-dir",
         type=str,
         default=None,
-        help="Directory to save captured frames with detections"
+        help="Directory to keep a local copy of the model in. The first run saves it "
+        "there; later runs load it from there without contacting the Hub.",
+    )
+
+    parser.add_argument(
+        "--no-verify",
+        action="store_true",
+        help="Don't compare the exported graph's outputs with the PyTorch model's "
+        "on a batch of a different size",
     )
 
     return parser
@@ -145,6 +636,45 @@ def parse_args(parser: argparse.ArgumentParser) -> Dict[str, Any]:
     # Convert arguments to a dictionary
     args_dict = vars(args)
 
-    # Additional validation could be added here
+    # Counts and sizes must be positive
+    for name in (
+        "batch_size",
+        "readers",
+        "writers",
+        "queue_size",
+        "stride",
+        "runs",
+        "save_workers",
+        "save_queue_size",
+        "height",
+        "width",
+        "tile_batch_size",
+        "detect_every",
+    ):
+        if name in args_dict and args_dict[name] < 1:
+            parser.error(f"--{name.replace('_', '-')} must be at least 1")
+
+    for name in ("input_size", "max_input_size", "tile_size"):
+        if args_dict.get(name) is not None and args_dict[name] < 1:
+            parser.error(f"--{name.replace('_', '-')} must be at least 1")
+    if any(size < 1 for size in args_dict.get("input_sizes", [])):
+        parser.error("--input-sizes must be at least 1")
+
+    quality = args_dict.get("save_quality")
+    if quality is not None and not 1 <= quality <= 100:
+        parser.error("--save-quality must be between 1 and 100")
+
+    # Fractions of the downscaled frame that changed
+    for name in ("motion_threshold", "motion_gate"):
+        if args_dict.get(name) is not None and not 0 <= args_dict[name] <= 1:
+            parser.error(f"--{name.replace('_', '-')} must be between 0 and 1")
+    if (
+        args_dict.get("uncertainty_threshold") is not None
+        and args_dict["uncertainty_threshold"] < 0
+    ):
+        parser.error("--uncertainty-threshold must be at least 0")
+
+    if "tile_overlap" in args_dict and not 0 <= args_dict["tile_overlap"] < 1:
+        parser.error("--tile-overlap must be at least 0 and less than 1")
 
-    return args_dict
\ No newline at end of file
+    return args_dict
@@ -0,0 +1,126 @@
+"""
+Compact encodings of detection results and annotated images for responses.
+"""
+
+import json
+import struct
+from typing import Dict, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+from .results import Detections
+
+# Image formats: (file extension, media type, OpenCV quality flag or None if lossless)
+IMAGE_FORMATS = {
+    "jpeg": (".jpg", "image/jpeg", cv2.IMWRITE_JPEG_QUALITY),
+    "png": (".png", "image/png", None),
+    "webp": (".webp", "image/webp", cv2.IMWRITE_WEBP_QUALITY),
+}
+
+# Media type of the binary detection format
+BINARY_MIMETYPE = "application/octet-stream"
+
+# Header of the binary format: magic bytes and number of detections
+_BINARY_MAGIC = b"DET1"
+_BINARY_HEADER = struct.Struct("<4sI")
+
+
+def encode_image(
+    image: np.ndarray, image_format: str = "jpeg", quality: Optional[int] = None
+) -> Tuple[bytes, str]:
+    """
+    Encode an image for a response.
+
+    Args:
+        image: Image as numpy array (OpenCV format)
+        image_format: 'jpeg', 'png' or 'webp'
+        quality: Quality from 1 to 100 for JPEG and WebP; ignored for the
+            lossless PNG. OpenCV's default is used if not specified.
+
+    Returns:
+        Tuple of (encoded bytes, media type)
+    """
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(f"Unknown image format: {image_format!r}")
+    extension, mimetype, quality_flag = IMAGE_FORMATS[image_format]
+
+    params = []
+    if quality is not None and quality_flag is not None:
+        if not 1 <= quality <= 100:
+            raise ValueError(f"quality must be between 1 and 100, got {quality}")
+        params = [quality_flag, int(quality)]
+
+    success, buffer = cv2.imencode(extension, image, params)
+    if not success:
+        raise RuntimeError(f"Could not encode image as {image_format}")
+    return buffer.tobytes(), mimetype
+
+
+def pack_detections(detections: Union[Detections, Dict]) -> bytes:
+    """
+    Pack detection results into a compact little-endian binary form.
+
+    Layout, with N the number of detections:
+
+    - 8-byte header: the magic bytes ``DET1`` and N as uint32
+    - boxes: N x 4 float32 (x1, y1, x2, y2) in image pixel coordinates
+    - scores: N float32
+    - class ids: N int16
+    - labels: UTF-8 JSON object mapping the class ids present to their names
+
+    The arrays can be read with ``numpy.frombuffer`` (see
+    ``unpack_detections``). A detection takes 22 bytes instead of roughly 80
+    in the JSON records.
+
+    Args:
+        detections: Detection results in the format of ``DetrObjectDetector.detect``
+
+    Returns:
+        Packed detections
+    """
+    if not isinstance(detections, Detections):
+        labels = list(detections["labels"])
+        id2label = dict(enumerate(dict.fromkeys(labels)))
+        detections = Detections.from_dict(detections, id2label)
+
+    present = np.unique(detections.class_ids).tolist()
+    labels = json.dumps(
+        {str(i): detections.id2label[i] for i in present}, separators=(",", ":")
+    )
+    return b"".join(
+        [
+            _BINARY_HEADER.pack(_BINARY_MAGIC, len(detections)),
+            detections.boxes.astype("<f4", copy=False).tobytes(),
+            detections.scores.astype("<f4", copy=False).tobytes(),
+            detections.class_ids.astype("<i2", copy=False).tobytes(),
+            labels.encode("utf-8"),
+        ]
+    )
+
+
+def unpack_detections(data: bytes) -> Detections:
+    """
+    Unpack detection results packed by ``pack_detections``.
+
+    Args:
+        data: Packed detections
+
+    Returns:
+        The detections, with ``id2label`` holding the classes present
+    """
+    magic, count = _BINARY_HEADER.unpack_from(data)
+    if magic != _BINARY_MAGIC:
+        raise ValueError("Not packed detections")
+
+    offset = _BINARY_HEADER.size
+    boxes = np.frombuffer(data, dtype="<f4", count=4 * count, offset=offset)
+    offset += boxes.nbytes
+    scores = np.frombuffer(data, dtype="<f4", count=count, offset=offset)
+    offset += scores.nbytes
+    class_ids = np.frombuffer(data, dtype="<i2", count=count, offset=offset)
+    offset += class_ids.nbytes
+    id2label = {
+        int(i): label for i, label in json.loads(data[offset:].decode("utf-8")).items()
+    }
+    return Detections(boxes, scores, class_ids, id2label)
@@ -0,0 +1,303 @@
+"""
+Helpers for serving live detections over HTTP: frame sources and response streams.
+"""
+
+import json
+import time
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .results import detections_to_records
+from .streaming import DetectionPipeline
+from .visualization import draw_detections
+
+# Output formats of detection event streams
+EVENT_FORMATS = ("ndjson", "sse")
+
+# Media types of the response formats
+NDJSON_MIMETYPE = "application/x-ndjson"
+SSE_MIMETYPE = "text/event-stream"
+MJPEG_BOUNDARY = "frame"
+MJPEG_MIMETYPE = f"multipart/x-mixed-replace; boundary={MJPEG_BOUNDARY}"
+
+# JPEG markers that stand alone, without a length field
+_STANDALONE_MARKERS = {0x01} | set(range(0xD0, 0xD8))
+
+
+def find_jpeg(buffer: bytearray) -> Tuple[int, Optional[int]]:
+    """
+    Locate the first complete JPEG image in a buffer.
+
+    The segments are walked by their lengths and the entropy-coded data is
+    scanned for the next real marker, so embedded thumbnails or stray
+    ``FFD9`` bytes inside metadata don't end the image early.
+
+    Args:
+        buffer: Bytes that may hold JPEG images, possibly with other data
+            (such as multipart headers) between them
+
+    Returns:
+        Tuple of (start, end) offsets of the image. The start is -1 if no
+        image starts in the buffer; the end is None if the image isn't
+        complete yet and -1 if it is corrupt.
+    """
+    start = buffer.find(b"\xff\xd8")
+    if start < 0:
+        return -1, None
+
+    size = len(buffer)
+    pos = start + 2
+    while True:
+        if pos + 2 > size:
+            return start, None
+        if buffer[pos] != 0xFF:
+            return start, -1
+        marker = buffer[pos + 1]
+        if marker == 0xFF:
+            # Fill byte before a marker
+            pos += 1
+            continue
+        if marker == 0xD9:
+            return start, pos + 2
+        if marker in _STANDALONE_MARKERS:
+            pos += 2
+            continue
+
+        if pos + 4 > size:
+            return start, None
+        pos += 2 + ((buffer[pos + 2] << 8) | buffer[pos + 3])
+
+        if marker == 0xDA:
+            # Entropy-coded data runs until a marker other than a stuffed
+            # zero byte or a restart marker
+            while True:
+                ff = buffer.find(b"\xff", pos)
+                if ff < 0 or ff + 1 >= size:
+                    return start, None
+                following = buffer[ff + 1]
+                if following == 0x00 or 0xD0 <= following <= 0xD7:
+                    pos = ff + 2
+                elif following == 0xFF:
+                    pos = ff + 1
+                else:
+                    pos = ff
+                    break
+
+
+class JpegStreamReader:
+    """
+    Reads frames from a continuous stream of JPEG images, such as an upload.
+
+    Accepts JPEG images written back to back (``ffmpeg -f mjpeg``) as well as
+    a multipart MJPEG stream, whose part headers are skipped. Has the
+    ``read()`` interface of ``Camera``, so it can feed a ``DetectionPipeline``.
+    """
+
+    def __init__(
+        self,
+        stream: BinaryIO,
+        chunk_size: int = 16384,
+        max_frame_bytes: int = 16 * 1024 * 1024,
+    ):
+        """
+        Initialize the reader.
+
+        Args:
+            stream: Binary stream to read from
+            chunk_size: Maximum number of bytes per read. Smaller reads hand
+                over each frame sooner when the stream blocks until a read is full.
+            max_frame_bytes: Largest accepted image; bigger ones are skipped
+        """
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.max_frame_bytes = max_frame_bytes
+        self.frames = 0
+        self.corrupt_frames = 0
+
+        # read1 returns whatever is available instead of waiting for a full chunk
+        self._read = getattr(stream, "read1", stream.read)
+        self._buffer = bytearray()
+        self._ended = False
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Read the next frame.
+
+        Returns:
+            Tuple of (success, BGR frame); success is False at the end of the stream
+        """
+        while True:
+            start, end = find_jpeg(self._buffer)
+            if end is not None and end >= 0:
+                data = np.frombuffer(bytes(self._buffer[start:end]), dtype=np.uint8)
+                del self._buffer[:end]
+                frame = cv2.imdecode(data, cv2.IMREAD_COLOR)
+                if frame is None:
+                    self.corrupt_frames += 1
+                    continue
+                self.frames += 1
+                return True, frame
+
+            if end == -1 or (
+                start >= 0 and len(self._buffer) - start > self.max_frame_bytes
+            ):
+                # Skip past this start of image and look for the next one
+                self.corrupt_frames += 1
+                del self._buffer[: start + 2]
+                continue
+
+            # Drop data before the image; keep a last byte that may begin a marker
+            del self._buffer[: start if start >= 0 else max(len(self._buffer) - 1, 0)]
+
+            if self._ended:
+                return False, None
+            chunk = self._read(self.chunk_size)
+            if not chunk:
+                self._ended = True
+                continue
+            self._buffer += chunk
+
+
+class PacedSource:
+    """
+    Delivers the frames of a video file no faster than its frame rate.
+
+    A pipeline reads its source as fast as it can, which for a file would
+    skip through it at decoding speed. This wrapper makes a file behave like
+    a live camera.
+    """
+
+    def __init__(self, source: Any, fps: float):
+        """
+        Initialize the paced source.
+
+        Args:
+            source: Opened source with a ``read()`` method, such as a ``Camera``
+            fps: Frame rate to deliver frames at
+        """
+        self.source = source
+        self.interval = 1.0 / fps
+        self._next_time = None
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        now = time.monotonic()
+        if self._next_time is not None and now < self._next_time:
+            time.sleep(self._next_time - now)
+        self._next_time = max(now, self._next_time or now) + self.interval
+        return self.source.read()
+
+
+def encode_event(event: Dict, fmt: str = "ndjson") -> bytes:
+    """
+    Encode an event as an NDJSON line or a Server-Sent Events message.
+
+    Args:
+        event: JSON-serializable event
+        fmt: 'ndjson' or 'sse'
+
+    Returns:
+        Encoded event
+    """
+    data = json.dumps(event, separators=(",", ":"))
+    if fmt == "sse":
+        kind = "error" if "error" in event else "detections"
+        return f"event: {kind}\ndata: {data}\n\n".encode()
+    return f"{data}\n".encode()
+
+
+def detection_events(
+    pipeline: DetectionPipeline, fmt: str = "ndjson", keepalive: float = 15.0
+) -> Iterator[bytes]:
+    """
+    Stream the detection results of a running pipeline.
+
+    One event is sent per processed frame. A client that reads slower than
+    results are produced gets the newest results when it catches up; the
+    ones in between are dropped, so it never falls further behind.
+
+    Args:
+        pipeline: Started detection pipeline
+        fmt: 'ndjson' or 'sse'
+        keepalive: Seconds without results after which a Server-Sent Events
+            comment is sent to keep the connection open
+
+    Yields:
+        Encoded events with the frame number, its end-to-end latency, the
+        number of frames dropped so far and the detections
+    """
+    seq = 0
+    last_sent = time.monotonic()
+    while True:
+        try:
+            seq, item = pipeline.wait_detections(seq, timeout=1.0)
+        except RuntimeError as e:
+            yield encode_event({"error": str(e.__cause__ or e)}, fmt)
+            return
+
+        if item is None:
+            if pipeline.finished:
+                return
+            if fmt == "sse" and time.monotonic() - last_sent > keepalive:
+                last_sent = time.monotonic()
+                yield b": keepalive\n\n"
+            continue
+
+        frame_seq, captured_at, detections = item
+        stats = pipeline.stats()
+        last_sent = time.monotonic()
+        yield encode_event(
+            {
+                "frame": frame_seq,
+                "latency_ms": round(1000 * (last_sent - captured_at), 1),
+                "dropped_frames": stats["dropped_frames"],
+                "detections": detections_to_records(detections),
+            },
+            fmt,
+        )
+
+
+def mjpeg_frames(
+    pipeline: DetectionPipeline, max_fps: float = 15.0, quality: int = 80
+) -> Iterator[bytes]:
+    """
+    Stream the newest frames of a running pipeline, annotated with the
+    latest detections, as multipart MJPEG.
+
+    Frames are sampled at most ``max_fps`` times per second, so neither the
+    source's frame rate nor a slow client lets frames pile up.
+
+    Args:
+        pipeline: Started detection pipeline
+        max_fps: Maximum number of frames per second to send
+        quality: JPEG quality from 0 to 100
+
+    Yields:
+        Multipart parts, one JPEG image each
+    """
+    interval = 1.0 / max_fps
+    last_seq = 0
+    while True:
+        started = time.monotonic()
+        finished = pipeline.finished
+        try:
+            frame_item = pipeline.latest_frame()
+            detection_item = pipeline.latest_detections()
+        except RuntimeError:
+            # The pipeline failed; there is no way to report it inside an image stream
+            return
+
+        if frame_item is not None and frame_item[0] != last_seq:
+            last_seq, _, frame = frame_item
+            if detection_item is not None:
+                frame = draw_detections(frame, detection_item[2])
+            _, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            yield (
+                f"--{MJPEG_BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                f"Content-Length: {len(jpeg)}\r\n\r\n"
+            ).encode() + jpeg.tobytes() + b"\r\n"
+        elif finished:
+            return
+
+        time.sleep(max(interval - (time.monotonic() - started), 0.0))
@@ -1,52 +1,279 @@
 """
 Model handling module for DETR object detection.
 """
-import torch
-from transformers import DetrForObjectDetection, DetrImageProcessor
-from typing import Dict, List, Tuple, Union
+
+import contextlib
+import warnings
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple, Union
+
 import numpy as np
+import torch
 from PIL import Image
 
+from .backends import BACKENDS, create_backend
+from .cache import DetectionCache, content_key
+from .preprocessing import (
+    MAX_BATCH_PADDING,
+    FastPreprocessor,
+    aspect_buckets,
+    get_resize_size,
+)
+from .results import Detections, RawDetections
+from .startup import StartupTimer, load_pretrained, model_cache_path
+from .tiling import MERGE_METHODS, nms, tile_grid, weighted_box_fusion
+
+if TYPE_CHECKING:
+    from transformers import DetrForObjectDetection
+
+# Supported numeric precisions for inference
+PRECISIONS = ("fp32", "bf16", "int8-dynamic")
+
+
+def filter_detections(
+    detections: Union[Detections, Dict], threshold: float
+) -> Union[Detections, Dict]:
+    """
+    Keep only the detections scoring above a confidence threshold.
+
+    Args:
+        detections: Detection results in the format of ``DetrObjectDetector.detect``
+            or a dictionary with boxes, scores and labels
+        threshold: Confidence threshold for detections
+
+    Returns:
+        Filtered detection results of the same type
+    """
+    if isinstance(detections, Detections):
+        return detections.filter(threshold)
+
+    keep = np.asarray(detections["scores"]) > threshold
+    return {
+        "boxes": detections["boxes"][keep],
+        "scores": detections["scores"][keep],
+        "labels": [label for label, k in zip(detections["labels"], keep) if k],
+    }
+
 
 class DetrObjectDetector:
     """
     A class to handle DETR object detection model operations.
     """
 
-    def __init__(self, model_name: str = "facebook/detr-resnet-50", device: str = None):
+    def __init__(
+        self,
+        model_name: str = "facebook/detr-resnet-50",
+        device: str = None,
+        cache: Optional[DetectionCache] = None,
+        precision: str = "fp32",
+        fast_preprocess: bool = False,
+        model_cache_dir: Optional[str] = None,
+        mmap_weights: bool = False,
+        backend: str = "eager",
+        backend_path: Optional[str] = None,
+        backend_options: Optional[Dict] = None,
+        input_size: Optional[int] = None,
+        max_input_size: Optional[int] = None,
+    ):
         """
         Initialize the DETR object detector.
 
         Args:
             model_name: Name or path of the DETR model to use
             device: Device to run the model on ('cpu' or 'cuda')
+            cache: Optional cache of results keyed by image content. Cached
+                images are served at any threshold without a forward pass.
+            precision: Numeric precision for inference:
+                - 'fp32': full precision (default)
+                - 'bf16': run the forward pass under bfloat16 autocast
+                - 'int8-dynamic': dynamically quantize the Linear layers of
+                  the transformer encoder and decoder to int8 (CPU only)
+            fast_preprocess: Preprocess OpenCV (BGR numpy) images with
+                ``FastPreprocessor`` instead of going through PIL and the
+                image processor. PIL images always use the processor.
+            model_cache_dir: Optional directory of a local model cache. The
+                model is saved there as safetensors on first use and loaded
+                from there, without contacting the Hub, afterwards.
+            mmap_weights: Memory-map the weights from a file in the model
+                cache (``model_cache_dir``, or the default cache directory)
+                instead of loading them into process memory, so that
+                several processes serving the same model share one copy.
+                Only useful on the CPU; layers quantized by 'int8-dynamic'
+                are not shared.
+            backend: What runs the network (see ``backends.py``):
+                - 'eager': the PyTorch model as it is (default)
+                - 'compile': the model compiled with ``torch.compile``
+                - 'torchscript': a traced TorchScript graph
+                - 'onnxruntime': an ONNX graph run by ONNX Runtime (CPU only,
+                  needs the onnxruntime package)
+                All give the same detections up to float rounding. The
+                'torchscript' and 'onnxruntime' backends need fp32 precision.
+            backend_path: File written by ``export_model`` to load for the
+                'torchscript' and 'onnxruntime' backends. If not specified,
+                the model is traced or exported when the detector is created.
+            backend_options: Keyword arguments for the backend, e.g. for
+                ``torch.compile`` or ``num_threads`` for ONNX Runtime
+            input_size: Size the shorter image side is resized to before
+                the forward pass. Smaller sizes are faster but find fewer
+                small objects. If not specified, uses the processor's
+                setting (800 for the pretrained DETR models).
+            max_input_size: Maximum size of the longer side after resizing.
+                If not specified, it keeps the processor's ratio to the
+                shorter side (1333 / 800).
         """
+        if precision not in PRECISIONS:
+            raise ValueError(
+                f"Unknown precision {precision!r}, "
+                f"expected one of {', '.join(PRECISIONS)}"
+            )
+
+        for name, value in (
+            ("input_size", input_size),
+            ("max_input_size", max_input_size),
+        ):
+            if value is not None and value < 1:
+                raise ValueError(f"{name} must be at least 1, got {value}")
+
+        if backend not in BACKENDS:
+            raise ValueError(
+                f"Unknown backend {backend!r}, expected one of {', '.join(BACKENDS)}"
+            )
+        if backend in ("torchscript", "onnxruntime") and precision != "fp32":
+            raise ValueError(f"The {backend} backend only supports fp32 precision")
+
         # If no device is specified, use CUDA if available, otherwise use CPU
         if device is None:
             self.device = "cuda" if torch.cuda.is_available() else "cpu"
         else:
             self.device = device
 
-        print(f"Loading DETR model '{model_name}' on {self.device}...")
+        if precision == "int8-dynamic" and self.device != "cpu":
+            raise ValueError("int8-dynamic precision is only supported on the CPU")
+
+        self.model_name = model_name
+        self.cache = cache
+        self.precision = precision
+
+        # Results at reduced precision or another input size differ, so cache them
+        # separately
+        self._cache_name = model_name
+        if precision != "fp32":
+            self._cache_name += f"@{precision}"
+
+        print(
+            f"Loading DETR model '{model_name}' on {self.device} ({precision}"
+            f"{'' if backend == 'eager' else ', ' + backend})..."
+        )
+
+        # Time each loading phase so slow startups can be diagnosed
+        timer = StartupTimer()
+        self.startup_times = timer.times
 
         # Load the model and processor
-        self.processor = DetrImageProcessor.from_pretrained(model_name)
-        self.model = DetrForObjectDetection.from_pretrained(model_name)
+        if model_cache_dir is not None or mmap_weights:
+            self.processor, self.model, cached = load_pretrained(
+                model_name, model_cache_dir, timer, mmap=mmap_weights
+            )
+            path = model_cache_path(model_name, model_cache_dir)
+            print(
+                f"Model {'loaded from' if cached else 'saved to'} the cache in {path}"
+                f"{' (memory-mapped weights)' if mmap_weights else ''}"
+            )
+        else:
+            # Deferred so importing this module doesn't pay for importing transformers
+            with timer.phase("import"):
+                from transformers import DetrForObjectDetection, DetrImageProcessor
+            with timer.phase("processor"):
+                self.processor = DetrImageProcessor.from_pretrained(model_name)
+            with timer.phase("model"):
+                self.model = DetrForObjectDetection.from_pretrained(model_name)
+
+        # Resize settings: (shortest edge, longest edge)
+        default_size = (
+            self.processor.size["shortest_edge"],
+            self.processor.size["longest_edge"],
+        )
+        if input_size is not None or max_input_size is not None:
+            shortest_edge = input_size or default_size[0]
+            longest_edge = max_input_size or round(
+                shortest_edge * default_size[1] / default_size[0]
+            )
+            self.processor.size = {
+                "shortest_edge": shortest_edge,
+                "longest_edge": longest_edge,
+            }
+        self.input_size = (
+            self.processor.size["shortest_edge"],
+            self.processor.size["longest_edge"],
+        )
+        if self.input_size != default_size:
+            self._cache_name += f"@{self.input_size[0]}x{self.input_size[1]}"
+
+        with timer.phase("to_device"):
+            # Move model to the specified device (GPU or CPU)
+            self.model.to(self.device)
 
-        # Move model to the specified device (GPU or CPU)
-        self.model.to(self.device)
+            # Set model to evaluation mode (not training)
+            self.model.eval()
 
-        # Set model to evaluation mode (not training)
-        self.model.eval()
+        if precision == "int8-dynamic":
+            with timer.phase("quantize"):
+                self.model = self._quantize_dynamic(self.model)
+
+        with timer.phase("backend"):
+            self.backend = create_backend(
+                backend,
+                self.model,
+                backend_path,
+                self.device,
+                **(backend_options or {}),
+            )
+
+        self.fast_preprocessor = None
+        if fast_preprocess:
+            self.fast_preprocessor = FastPreprocessor.from_processor(
+                self.processor, self.device
+            )
 
         # Get the class names (labels) from the model config
         self.labels = self.model.config.id2label
 
-        print(f"Model loaded successfully with {len(self.labels)} classes!")
+        print(
+            f"Model loaded successfully with {len(self.labels)} classes "
+            f"in {timer.total:.2f}s ({timer.format()})"
+        )
+
+    def warmup(self, image_size: Tuple[int, int] = (480, 640), runs: int = 1) -> float:
+        """
+        Run forward passes on a blank image so later requests run at full speed.
+
+        The first forward pass is much slower than the following ones
+        (memory allocation, kernel selection, lazy initialization), so a
+        server should make it before serving its first request. The cache is
+        bypassed.
+
+        Args:
+            image_size: (height, width) of the blank image, ideally the size
+                of typical inputs
+            runs: Number of forward passes
 
-    def detect(self,
-               image: Union[np.ndarray, Image.Image],
-               threshold: float = 0.7) -> Dict:
+        Returns:
+            Time taken in seconds
+        """
+        image = np.zeros((*image_size, 3), dtype=np.uint8)
+        timer = StartupTimer()
+        with timer.phase("warmup"):
+            for _ in range(runs):
+                self._predict([image])
+        self.startup_times["warmup"] = timer.total
+        print(
+            f"Warmup with {runs} forward pass(es) at {image_size[1]}x{image_size[0]} "
+            f"took {timer.total:.2f}s"
+        )
+        return timer.total
+
+    def detect(
+        self, image: Union[np.ndarray, Image.Image], threshold: float = 0.7
+    ) -> Detections:
         """
         Perform object detection on an image.
 
@@ -55,32 +282,402 @@ class DetrObjectDetector:
             threshold: Confidence threshold for detections
 
         Returns:
-            Dictionary containing detection results
+            Detection results; indexable like a dictionary with "boxes",
+            "scores" and "labels"
         """
-        # Convert OpenCV image (numpy array) to PIL Image if necessary
-        if isinstance(image, np.ndarray):
-            image_pil = Image.fromarray(image[:, :, ::-1])  # Convert BGR to RGB
+        if self.cache is None:
+            return self.detect_raw(image).filter(threshold)
+
+        # Cache entries hold every query so any threshold can be served
+        key = content_key(image, self._cache_name)
+        detections = self.cache.get(key)
+        if detections is None:
+            detections = self.detect_raw(image).filter(0.0)
+            self.cache.put(key, detections)
+
+        return Detections.from_dict(detections, self.labels).filter(threshold)
+
+    def detect_raw(self, image: Union[np.ndarray, Image.Image]) -> RawDetections:
+        """
+        Run the model on an image without any threshold filtering.
+
+        The result holds every object query, so it can be filtered at many
+        thresholds (e.g. for a threshold slider or an evaluation sweep) with
+        ``RawDetections.filter`` instead of running the model again.
+
+        Args:
+            image: Input image (can be numpy array from OpenCV or PIL Image)
+
+        Returns:
+            Unfiltered detections for the image
+        """
+        return self._predict([image])[0]
+
+    def detect_batch(
+        self,
+        images: Sequence[Union[np.ndarray, Image.Image]],
+        threshold: float = 0.7,
+        batch_size: int = 8,
+        max_padding: Optional[float] = MAX_BATCH_PADDING,
+    ) -> List[Detections]:
+        """
+        Perform object detection on a list of images.
+
+        Images are processed in chunks of up to ``batch_size``. Each chunk is
+        padded to a common size by the processor and run through the model in
+        a single forward pass; the accompanying ``pixel_mask`` keeps the
+        padding out of the attention. Chunks are formed from images of similar
+        aspect ratio (see ``aspect_buckets``), so that little of each forward
+        pass is spent on padding. Images of identical size give exactly the
+        same results as calling ``detect`` on each of them. Images found in
+        the cache are skipped.
+
+        Args:
+            images: Input images (numpy arrays from OpenCV and/or PIL Images)
+            threshold: Confidence threshold for detections
+            batch_size: Maximum number of images per forward pass
+            max_padding: Largest share of a forward pass's pixels that may be
+                padding before images are split into separate passes, or
+                None to batch the images in their given order
+
+        Returns:
+            List of detection results, one per input image, in the same
+            format as ``detect``
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+
+        all_results = [None] * len(images)
+        keys = [None] * len(images)
+        pending = []
+
+        for i, image in enumerate(images):
+            if self.cache is not None:
+                keys[i] = content_key(image, self._cache_name)
+                detections = self.cache.get(keys[i])
+                if detections is not None:
+                    all_results[i] = Detections.from_dict(
+                        detections, self.labels
+                    ).filter(threshold)
+                    continue
+            pending.append(i)
+
+        raw_results = self.detect_batch_raw(
+            [images[i] for i in pending], batch_size, max_padding
+        )
+        for i, raw in zip(pending, raw_results):
+            if self.cache is not None:
+                self.cache.put(keys[i], raw.filter(0.0))
+            all_results[i] = raw.filter(threshold)
+
+        return all_results
+
+    def detect_batch_raw(
+        self,
+        images: Sequence[Union[np.ndarray, Image.Image]],
+        batch_size: int = 8,
+        max_padding: Optional[float] = MAX_BATCH_PADDING,
+    ) -> List[RawDetections]:
+        """
+        Run the model on a list of images without any threshold filtering.
+
+        Args:
+            images: Input images (numpy arrays from OpenCV and/or PIL Images)
+            batch_size: Maximum number of images per forward pass
+            max_padding: Largest share of a forward pass's pixels that may be
+                padding, or None to batch the images in their given order
+                (see ``detect_batch``)
+
+        Returns:
+            List of unfiltered detections, one per input image
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+
+        if max_padding is None:
+            chunks = [
+                list(range(start, min(start + batch_size, len(images))))
+                for start in range(0, len(images), batch_size)
+            ]
+        else:
+            # Group the images by the shape they are resized to
+            sizes = [
+                get_resize_size(*self._image_size(image), *self.input_size)
+                for image in images
+            ]
+            chunks = aspect_buckets(sizes, batch_size, max_padding)
+
+        all_results = [None] * len(images)
+        for chunk in chunks:
+            for i, raw in zip(chunk, self._predict([images[i] for i in chunk])):
+                all_results[i] = raw
+
+        return all_results
+
+    def detect_tiled(
+        self,
+        image: Union[np.ndarray, Image.Image],
+        threshold: float = 0.7,
+        tile_size: int = 800,
+        overlap: float = 0.2,
+        tile_batch_size: int = 4,
+        merge: str = "nms",
+        iou_threshold: float = 0.5,
+        full_image: bool = True,
+    ) -> Detections:
+        """
+        Perform object detection on a large image by splitting it into tiles.
+
+        DETR resizes every input to about 800 pixels, so small objects in a
+        large image shrink below what the model can find. Here the image is
+        cut into overlapping ``tile_size`` squares, which are run through the
+        model ``tile_batch_size`` at a time. Each chunk is thresholded right
+        away and only the surviving boxes, shifted to image coordinates, are
+        kept, so peak memory depends on the tile batch rather than the image
+        size. Objects seen by several tiles are merged with class-aware NMS
+        or weighted box fusion, which compare the boxes in blocks so that
+        memory grows only linearly with their number. The cache is bypassed.
+
+        Args:
+            image: Input image (can be numpy array from OpenCV or PIL Image)
+            threshold: Confidence threshold for detections
+            tile_size: Side length of the square tiles in pixels
+            overlap: Fraction of the tile size shared by neighbouring tiles
+            tile_batch_size: Maximum number of tiles per forward pass
+            merge: How to merge duplicate detections:
+                - 'nms': keep the highest scoring box (default)
+                - 'wbf': average the boxes, weighted by score
+            iou_threshold: Overlap above which two boxes of the same class
+                are duplicates
+            full_image: Also detect on the whole (downscaled) image, so that
+                objects larger than a tile are found in one piece
+
+        Returns:
+            Detection results in image coordinates, sorted by score
+        """
+        if tile_batch_size < 1:
+            raise ValueError(
+                f"tile_batch_size must be at least 1, got {tile_batch_size}"
+            )
+        if merge not in MERGE_METHODS:
+            raise ValueError(
+                f"Unknown merge method {merge!r}, "
+                f"expected one of {', '.join(MERGE_METHODS)}"
+            )
+
+        if isinstance(image, Image.Image):
+            # A contiguous BGR copy, so the tiles are plain views into it
+            image = np.ascontiguousarray(np.asarray(image.convert("RGB"))[:, :, ::-1])
+        height, width = image.shape[:2]
+        tiles = tile_grid(height, width, tile_size, overlap)
+
+        boxes, scores, class_ids = [], [], []
+
+        def collect(detections: Detections, offset_x: int = 0, offset_y: int = 0):
+            boxes.append(
+                detections.boxes
+                + np.array(
+                    [offset_x, offset_y, offset_x, offset_y],
+                    dtype=detections.boxes.dtype,
+                )
+            )
+            scores.append(detections.scores)
+            class_ids.append(detections.class_ids)
+
+        if full_image and len(tiles) > 1:
+            collect(self.detect_raw(image).filter(threshold))
+
+        for start in range(0, len(tiles), tile_batch_size):
+            chunk = tiles[start : start + tile_batch_size]
+            # Tiles are views into the image, not copies
+            crops = [image[y1:y2, x1:x2] for x1, y1, x2, y2 in chunk]
+            for (x1, y1, _, _), raw in zip(chunk, self._predict(crops)):
+                collect(raw.filter(threshold), x1, y1)
+
+        boxes = np.concatenate(boxes)
+        scores = np.concatenate(scores)
+        class_ids = np.concatenate(class_ids)
+
+        if merge == "wbf":
+            boxes, scores, class_ids = weighted_box_fusion(
+                boxes, scores, class_ids, iou_threshold
+            )
         else:
-            image_pil = image
+            keep = nms(boxes, scores, class_ids, iou_threshold)
+            boxes, scores, class_ids = boxes[keep], scores[keep], class_ids[keep]
 
-        # Prepare image for the model
-        inputs = self.processor(images=image_pil, return_tensors="pt")
-        inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        return Detections(boxes, scores, class_ids, self.labels)
 
-        # Run inference
+    def _predict(
+        self, images: Sequence[Union[np.ndarray, Image.Image]]
+    ) -> List[RawDetections]:
+        """
+        Run one forward pass over a list of images.
+        """
+        inputs = self._preprocess(images)
+        outputs = self._forward(inputs)
+        predictions = self._postprocess(
+            outputs, [self._image_size(image) for image in images]
+        )
+        return self._to_raw_detections(predictions)
+
+    def _preprocess(
+        self, images: Sequence[Union[np.ndarray, Image.Image]]
+    ) -> Dict[str, torch.Tensor]:
+        """
+        Resize, normalize and batch images into model inputs on the device.
+        """
+        if self.fast_preprocessor is not None and all(
+            map(FastPreprocessor.supports, images)
+        ):
+            return self.fast_preprocessor(images)
+
+        # Several images are padded to a common size with a matching pixel_mask
+        inputs = self.processor(
+            images=[self._to_pil(image) for image in images], return_tensors="pt"
+        )
+        return {k: v.to(self.device) for k, v in inputs.items()}
+
+    def _forward(self, inputs: Dict[str, torch.Tensor]):
+        """
+        Run the model on the backend at the configured precision.
+        """
         with torch.no_grad():  # No need to track gradients for inference
-            outputs = self.model(**inputs)
+            with self._autocast():
+                return self.backend(inputs["pixel_values"], inputs["pixel_mask"])
+
+    def _postprocess(
+        self, outputs, image_sizes: List[Tuple[int, int]]
+    ) -> Dict[str, torch.Tensor]:
+        """
+        Convert model outputs to per-query classes, scores and pixel boxes.
+
+        Args:
+            outputs: Model outputs with ``logits`` and ``pred_boxes``
+            image_sizes: (height, width) of each original image
+
+        Returns:
+            Dictionary of batched tensors: boxes, scores, class_ids and logits
+        """
+        with torch.no_grad():
+            # Post-process in full precision
+            logits = outputs.logits.float()
+            pred_boxes = outputs.pred_boxes.float()
 
-        # Convert outputs to a more usable format
-        results = self.processor.post_process_object_detection(
-            outputs,
-            threshold=threshold,
-            target_sizes=[(image_pil.height, image_pil.width)]
-        )[0]
+            # Best class per query, excluding the final "no object" class
+            probs = logits.softmax(-1)
+            scores, class_ids = probs[..., :-1].max(-1)
+
+            # Convert relative (center_x, center_y, width, height) boxes to
+            # absolute (x1, y1, x2, y2) pixel coordinates
+            cx, cy, w, h = pred_boxes.unbind(-1)
+            boxes = torch.stack(
+                [cx - 0.5 * w, cy - 0.5 * h, cx + 0.5 * w, cy + 0.5 * h], dim=-1
+            )
+            sizes = torch.tensor(
+                [[width, height, width, height] for height, width in image_sizes],
+                dtype=boxes.dtype,
+                device=boxes.device,
+            )
+            boxes = boxes * sizes[:, None, :]
 
-        # Return the processed results
         return {
-            "boxes": results["boxes"].cpu().numpy(),
-            "scores": results["scores"].cpu().numpy(),
-            "labels": [self.labels[l.item()] for l in results["labels"]]
-        }
\ No newline at end of file
+            "boxes": boxes,
+            "scores": scores,
+            "class_ids": class_ids,
+            "logits": logits,
+        }
+
+    def _to_raw_detections(
+        self, predictions: Dict[str, torch.Tensor]
+    ) -> List[RawDetections]:
+        """
+        Copy post-processed predictions to the CPU and split them per image.
+        """
+        # Copy everything to the CPU in one go
+        boxes = predictions["boxes"].cpu().numpy()
+        scores = predictions["scores"].cpu().numpy()
+        class_ids = predictions["class_ids"].cpu().numpy()
+        logits = predictions["logits"].cpu().numpy()
+
+        return [
+            RawDetections(
+                boxes[i], scores[i], class_ids[i], self.labels, logits=logits[i]
+            )
+            for i in range(len(boxes))
+        ]
+
+    def _autocast(self):
+        """
+        Context manager for the forward pass at the configured precision.
+        """
+        if self.precision == "bf16":
+            device_type = "cuda" if self.device.startswith("cuda") else "cpu"
+            return torch.autocast(device_type=device_type, dtype=torch.bfloat16)
+        return contextlib.nullcontext()
+
+    @staticmethod
+    def _quantize_dynamic(model: "DetrForObjectDetection") -> "DetrForObjectDetection":
+        """
+        Quantize the transformer's Linear layers to int8 with dynamic activation scales.
+
+        The CNN backbone and the small prediction heads stay in fp32, which
+        keeps the box and score error low. Uses torchao's ``quantize_`` when
+        torchao is installed, and otherwise PyTorch's deprecated
+        ``torch.ao.quantization.quantize_dynamic``. If neither is available,
+        an ImportError asks for torchao.
+        """
+        try:
+            from torchao.quantization import (
+                Int8DynamicActivationInt8WeightConfig,
+                quantize_,
+            )
+        except ImportError:
+            pass
+        else:
+            quantize_(
+                model,
+                Int8DynamicActivationInt8WeightConfig(),
+                filter_fn=lambda module, name: (
+                    isinstance(module, torch.nn.Linear)
+                    and name.startswith(("model.encoder.", "model.decoder."))
+                ),
+            )
+            return model
+
+        try:
+            from torch.ao.quantization import quantize_dynamic
+        except ImportError as e:
+            raise ImportError(
+                "int8-dynamic precision needs the torchao package (pip install torchao)"
+            ) from e
+
+        # quantize_dynamic warns that torch.ao.quantization and its quantized
+        # tensors are deprecated; torchao, used above when installed, is the
+        # replacement
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            warnings.filterwarnings(
+                "ignore", message=".*quantize_per_tensor", category=UserWarning
+            )
+            return quantize_dynamic(
+                model, {"model.encoder", "model.decoder"}, dtype=torch.qint8
+            )
+
+    @staticmethod
+    def _image_size(image: Union[np.ndarray, Image.Image]) -> Tuple[int, int]:
+        """
+        Get the (height, width) of a numpy array or PIL Image.
+        """
+        if isinstance(image, np.ndarray):
+            return image.shape[0], image.shape[1]
+        return image.height, image.width
+
+    @staticmethod
+    def _to_pil(image: Union[np.ndarray, Image.Image]) -> Image.Image:
+        """
+        Convert an OpenCV image (BGR numpy array) to a PIL Image if necessary.
+        """
+        if isinstance(image, np.ndarray):
+            return Image.fromarray(image[:, :, ::-1])  # Convert BGR to RGB
+        return image
@@ -0,0 +1,507 @@
+"""
+Batch processing pipelines for running detection over many images and videos.
+"""
+
+import glob
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from .model import DetrObjectDetector
+from .visualization import draw_detections, save_image
+
+# File extensions picked up when a directory is given as input
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp")
+
+# Files with these extensions are treated as lists of image paths
+LIST_FILE_EXTENSIONS = (".txt", ".lst")
+
+# Marks the end of the stream on the queues between pipeline stages
+_END_OF_STREAM = object()
+
+
+def is_batch_source(source: str) -> bool:
+    """
+    Check whether an input refers to several images rather than a single file.
+
+    Args:
+        source: Directory, glob pattern, list file or image path
+
+    Returns:
+        True if the input is a directory, a glob pattern or a list file
+    """
+    return (
+        os.path.isdir(source)
+        or glob.has_magic(source)
+        or source.lower().endswith(LIST_FILE_EXTENSIONS)
+    )
+
+
+def collect_image_paths(source: str) -> List[str]:
+    """
+    Expand an input specification into a list of image paths.
+
+    Args:
+        source: One of
+            - a directory (searched recursively for image files)
+            - a glob pattern such as ``data/images/*.jpg``
+            - a list file (``.txt``/``.lst``) with one image path per line
+            - a single image path
+
+    Returns:
+        List of image paths, sorted for directories and glob patterns
+    """
+    if os.path.isdir(source):
+        paths = []
+        for root, _, files in os.walk(source):
+            for name in files:
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    paths.append(os.path.join(root, name))
+        return sorted(paths)
+
+    if glob.has_magic(source):
+        return sorted(p for p in glob.glob(source, recursive=True) if os.path.isfile(p))
+
+    if source.lower().endswith(LIST_FILE_EXTENSIONS):
+        base_dir = os.path.dirname(source)
+        with open(source) as f:
+            lines = [line.strip() for line in f]
+        # Relative paths in a list file are resolved against the file's directory
+        return [
+            line if os.path.isabs(line) else os.path.join(base_dir, line)
+            for line in lines
+            if line and not line.startswith("#")
+        ]
+
+    return [source]
+
+
+def get_output_path(image_path: str, input_root: str, output_dir: str) -> str:
+    """
+    Build the annotated output path for an input image.
+
+    The directory structure below ``input_root`` is preserved so images with
+    the same file name in different folders don't overwrite each other.
+
+    Args:
+        image_path: Path of the input image
+        input_root: Common root directory of all inputs
+        output_dir: Directory to write results to
+
+    Returns:
+        Output path of the form ``<output_dir>/<subdirs>/result_<filename>``
+    """
+    relative = os.path.relpath(image_path, input_root)
+    subdir, filename = os.path.split(relative)
+    return os.path.join(output_dir, subdir, f"result_{filename}")
+
+
+def run_batch_detection(
+    detector: DetrObjectDetector,
+    image_paths: List[str],
+    output_dir: str,
+    threshold: float = 0.7,
+    batch_size: int = 8,
+    num_readers: int = 4,
+    num_writers: int = 4,
+    queue_size: int = 32,
+    on_result: Optional[Callable[[str, Dict], None]] = None,
+) -> Dict:
+    """
+    Run detection over many images with overlapping decode, inference and encode.
+
+    A pool of reader threads decodes images with ``cv2.imread`` into a bounded
+    queue. The calling thread pulls batches from the queue and runs them
+    through the single loaded detector, and a pool of writer threads draws
+    and saves the annotated results. OpenCV releases the GIL while decoding
+    and encoding, so these stages run alongside the forward pass. Memory use
+    is bounded by ``queue_size`` on both sides of the model.
+
+    Args:
+        detector: Loaded object detector
+        image_paths: Paths of the images to process
+        output_dir: Directory to save annotated images to
+        threshold: Confidence threshold for detections
+        batch_size: Number of images per forward pass
+        num_readers: Number of decoding threads
+        num_writers: Number of drawing/encoding threads
+        queue_size: Maximum number of decoded images (and pending writes)
+            held in memory
+        on_result: Optional callback called with ``(image_path, detections)``
+            for every successfully processed image
+
+    Returns:
+        Dictionary of run statistics
+    """
+    if not image_paths:
+        return _summarize(0, 0, 0, 0.0, 0.0, 0.0)
+
+    input_root = os.path.commonpath(
+        [os.path.dirname(os.path.abspath(p)) for p in image_paths]
+    )
+
+    path_queue = queue.Queue()
+    for path in image_paths:
+        path_queue.put(path)
+
+    decoded_queue = queue.Queue(maxsize=queue_size)
+    stop_event = threading.Event()
+
+    def read_worker():
+        while not stop_event.is_set():
+            try:
+                path = path_queue.get_nowait()
+            except queue.Empty:
+                break
+            decoded_queue.put((path, cv2.imread(path)))
+        decoded_queue.put(_END_OF_STREAM)
+
+    def write_result(path: str, image: np.ndarray, detections: Dict):
+        try:
+            result_image = draw_detections(
+                image, detections, confidence_threshold=0.0, inplace=True
+            )
+            output_path = get_output_path(os.path.abspath(path), input_root, output_dir)
+            save_image(result_image, output_path)
+        finally:
+            write_slots.release()
+
+    # Limits the number of images waiting to be drawn and written
+    write_slots = threading.BoundedSemaphore(queue_size)
+
+    readers = [
+        threading.Thread(target=read_worker, daemon=True) for _ in range(num_readers)
+    ]
+    start_time = time.perf_counter()
+    for reader in readers:
+        reader.start()
+
+    processed = failed = num_detections = 0
+    inference_time = 0.0
+    wait_time = 0.0
+    finished_readers = 0
+    pending_writes = []
+
+    def run_batch(batch):
+        nonlocal processed, num_detections, inference_time
+        images = [image for _, image in batch]
+        batch_start = time.perf_counter()
+        results = detector.detect_batch(
+            images, threshold=threshold, batch_size=len(images)
+        )
+        inference_time += time.perf_counter() - batch_start
+
+        for (path, image), detections in zip(batch, results):
+            processed += 1
+            num_detections += len(detections["boxes"])
+            if on_result is not None:
+                on_result(path, detections)
+            write_slots.acquire()
+            pending_writes.append(writers.submit(write_result, path, image, detections))
+
+        # Drop finished writes, re-raising any error from drawing or saving
+        for future in [f for f in pending_writes if f.done()]:
+            future.result()
+            pending_writes.remove(future)
+
+    try:
+        with ThreadPoolExecutor(max_workers=num_writers) as writers:
+            batch = []
+            while finished_readers < num_readers:
+                wait_start = time.perf_counter()
+                item = decoded_queue.get()
+                wait_time += time.perf_counter() - wait_start
+
+                if item is _END_OF_STREAM:
+                    finished_readers += 1
+                    continue
+
+                path, image = item
+                if image is None:
+                    print(f"Error: Couldn't read image at {path}")
+                    failed += 1
+                    continue
+
+                batch.append((path, image))
+                if len(batch) >= batch_size:
+                    run_batch(batch)
+                    batch = []
+
+            if batch:
+                run_batch(batch)
+
+            # Surface any exceptions raised while drawing or saving
+            for future in pending_writes:
+                future.result()
+    finally:
+        stop_event.set()
+        # Unblock readers that may still be waiting on a full queue
+        while any(reader.is_alive() for reader in readers):
+            try:
+                decoded_queue.get_nowait()
+            except queue.Empty:
+                time.sleep(0.001)
+
+    elapsed = time.perf_counter() - start_time
+    return _summarize(
+        processed, failed, num_detections, elapsed, inference_time, wait_time
+    )
+
+
+def _summarize(
+    processed: int,
+    failed: int,
+    num_detections: int,
+    elapsed: float,
+    inference_time: float,
+    wait_time: float,
+) -> Dict:
+    """
+    Build the statistics dictionary returned by ``run_batch_detection``.
+    """
+    return {
+        "images": processed,
+        "failed": failed,
+        "detections": num_detections,
+        "elapsed": elapsed,
+        "images_per_second": processed / elapsed if elapsed > 0 else 0.0,
+        "inference_time": inference_time,
+        "decode_wait_time": wait_time,
+    }
+
+
+# Video codecs used for common output file extensions
+VIDEO_CODECS = {".mp4": "mp4v", ".avi": "MJPG", ".mkv": "XVID", ".mov": "mp4v"}
+
+
+def run_video_detection(
+    detector: DetrObjectDetector,
+    input_path: str,
+    output_path: Optional[str] = None,
+    jsonl_path: Optional[str] = None,
+    threshold: float = 0.7,
+    batch_size: int = 4,
+    stride: int = 1,
+    queue_size: int = 16,
+    on_progress: Optional[Callable[[Dict], None]] = None,
+    progress_interval: float = 2.0,
+) -> Dict:
+    """
+    Annotate a video file with a decode -> detect -> draw/encode pipeline.
+
+    A decoder thread reads every ``stride``-th frame into a bounded queue
+    (skipped frames are grabbed but never decoded). The calling thread runs
+    the frames through the detector in batches, and an encoder thread draws
+    the detections, writes the frames to ``output_path`` and appends one JSON
+    line per frame to ``jsonl_path``. All queues are bounded, so memory use
+    doesn't depend on the length of the video.
+
+    Args:
+        detector: Loaded object detector
+        input_path: Path of the video to process
+        output_path: Path of the annotated video to write; the frame rate is
+            divided by ``stride`` so the output keeps the input's duration
+        jsonl_path: Path of a JSON Lines file to write detections to, one
+            ``{"frame", "time", "detections"}`` record per processed frame
+        threshold: Confidence threshold for detections
+        batch_size: Number of frames per forward pass
+        stride: Process every ``stride``-th frame
+        queue_size: Maximum number of frames buffered between stages
+        on_progress: Optional callback called with the current statistics
+            every ``progress_interval`` seconds
+        progress_interval: Seconds between progress callbacks
+
+    Returns:
+        Dictionary of run statistics
+    """
+    if stride < 1:
+        raise ValueError(f"stride must be at least 1, got {stride}")
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+
+    capture = cv2.VideoCapture(input_path)
+    if not capture.isOpened():
+        raise RuntimeError(f"Failed to open video {input_path}")
+
+    fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+    total_frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+    width = int(capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    writer = None
+    if output_path is not None:
+        directory = os.path.dirname(output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        extension = os.path.splitext(output_path)[1].lower()
+        fourcc = cv2.VideoWriter_fourcc(*VIDEO_CODECS.get(extension, "mp4v"))
+        writer = cv2.VideoWriter(output_path, fourcc, fps / stride, (width, height))
+        if not writer.isOpened():
+            capture.release()
+            raise RuntimeError(f"Failed to open video writer for {output_path}")
+
+    jsonl_file = None
+    if jsonl_path is not None:
+        directory = os.path.dirname(jsonl_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        jsonl_file = open(jsonl_path, "w")
+
+    decoded_queue = queue.Queue(maxsize=queue_size)
+    encode_queue = queue.Queue(maxsize=queue_size)
+    stop_event = threading.Event()
+    errors = []
+
+    stats = {
+        "frames_decoded": 0,
+        "frames_processed": 0,
+        "frames_written": 0,
+        "detections": 0,
+        "total_frames": total_frames,
+        "elapsed": 0.0,
+        "inference_time": 0.0,
+        "frames_per_second": 0.0,
+    }
+
+    def decode_worker():
+        try:
+            index = 0
+            while not stop_event.is_set():
+                # Skipped frames are only grabbed, which avoids decoding them
+                if index % stride == 0:
+                    success, frame = capture.read()
+                else:
+                    success, frame = capture.grab(), None
+                if not success:
+                    break
+                if frame is not None:
+                    _put(decoded_queue, (index, frame), stop_event)
+                    stats["frames_decoded"] += 1
+                index += 1
+        except Exception as e:
+            errors.append(e)
+        finally:
+            _put(decoded_queue, _END_OF_STREAM, stop_event)
+
+    def encode_worker():
+        try:
+            while True:
+                item = encode_queue.get()
+                if item is _END_OF_STREAM:
+                    break
+                index, frame, detections = item
+                if writer is not None:
+                    writer.write(
+                        draw_detections(
+                            frame, detections, confidence_threshold=0.0, inplace=True
+                        )
+                    )
+                if jsonl_file is not None:
+                    record = {
+                        "frame": index,
+                        "time": index / fps,
+                        "detections": detections.to_records(),
+                    }
+                    jsonl_file.write(json.dumps(record) + "\n")
+                stats["frames_written"] += 1
+        except Exception as e:
+            errors.append(e)
+            stop_event.set()
+            # Keep draining so the inference stage never blocks on a dead encoder
+            while encode_queue.get() is not _END_OF_STREAM:
+                pass
+
+    decoder = threading.Thread(target=decode_worker, name="video-decode", daemon=True)
+    encoder = threading.Thread(target=encode_worker, name="video-encode", daemon=True)
+
+    start_time = time.perf_counter()
+    last_progress = start_time
+
+    def update_timing():
+        stats["elapsed"] = time.perf_counter() - start_time
+        if stats["elapsed"] > 0:
+            stats["frames_per_second"] = stats["frames_processed"] / stats["elapsed"]
+
+    def run_batch(batch):
+        nonlocal last_progress
+        batch_start = time.perf_counter()
+        results = detector.detect_batch(
+            [frame for _, frame in batch], threshold=threshold, batch_size=len(batch)
+        )
+        stats["inference_time"] += time.perf_counter() - batch_start
+
+        for (index, frame), detections in zip(batch, results):
+            stats["frames_processed"] += 1
+            stats["detections"] += len(detections["boxes"])
+            _put(encode_queue, (index, frame, detections), stop_event)
+
+        if (
+            on_progress is not None
+            and time.perf_counter() - last_progress >= progress_interval
+        ):
+            last_progress = time.perf_counter()
+            update_timing()
+            on_progress(dict(stats))
+
+    decoder.start()
+    encoder.start()
+    try:
+        batch = []
+        while not stop_event.is_set():
+            try:
+                item = decoded_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is _END_OF_STREAM:
+                break
+            batch.append(item)
+            if len(batch) >= batch_size:
+                run_batch(batch)
+                batch = []
+        if batch and not stop_event.is_set():
+            run_batch(batch)
+    except BaseException:
+        stop_event.set()
+        raise
+    finally:
+        if stop_event.is_set():
+            # Unblock the decoder if it is waiting on a full queue
+            while decoder.is_alive():
+                try:
+                    decoded_queue.get(timeout=0.01)
+                except queue.Empty:
+                    pass
+        decoder.join()
+        encode_queue.put(_END_OF_STREAM)
+        encoder.join()
+
+        capture.release()
+        if writer is not None:
+            writer.release()
+        if jsonl_file is not None:
+            jsonl_file.close()
+
+    if errors:
+        raise errors[0]
+
+    update_timing()
+    return stats
+
+
+def _put(q: queue.Queue, item, stop_event: threading.Event):
+    """
+    Put an item on a bounded queue, giving up once ``stop_event`` is set.
+    """
+    while not stop_event.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            continue
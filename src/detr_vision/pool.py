@@ -0,0 +1,435 @@
+"""
+Multi-process detection for using many CPU cores at once.
+"""
+
+import collections
+import itertools
+import multiprocessing
+import os
+import pickle
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+from PIL import Image
+
+from .results import Detections
+
+# Tells a worker process to exit
+_STOP = None
+
+# How often the result thread checks that the workers are still alive
+_POLL_INTERVAL = 0.5
+
+
+def split_cores(
+    num_workers: int, cores: Optional[Sequence[int]] = None
+) -> List[List[int]]:
+    """
+    Split CPU cores into equal, disjoint groups, one per worker.
+
+    Args:
+        num_workers: Number of groups
+        cores: Available core ids. If not specified, uses the cores this
+            process may run on.
+
+    Returns:
+        List of core id lists; cores that don't divide evenly are left out
+    """
+    if cores is None:
+        if hasattr(os, "sched_getaffinity"):
+            cores = sorted(os.sched_getaffinity(0))
+        else:
+            cores = list(range(os.cpu_count() or 1))
+    # With fewer cores than workers, workers share cores round-robin
+    per_worker = max(len(cores) // num_workers, 1)
+    return [
+        [cores[(i * per_worker + j) % len(cores)] for j in range(per_worker)]
+        for i in range(num_workers)
+    ]
+
+
+def _worker_main(
+    model_name: str,
+    detector_kwargs: Dict[str, Any],
+    cores: List[int],
+    num_threads: int,
+    tasks,
+    results,
+):
+    """
+    Worker process: load a detector and run detections from the task queue.
+    """
+    import torch
+
+    from .model import DetrObjectDetector
+
+    if hasattr(os, "sched_setaffinity") and cores:
+        os.sched_setaffinity(0, cores)
+    torch.set_num_threads(num_threads)
+
+    try:
+        detector = DetrObjectDetector(model_name=model_name, **detector_kwargs)
+    except Exception as e:
+        results.put(("error", None, _picklable(e)))
+        return
+    results.put(("ready", os.getpid(), dict(detector.labels)))
+
+    while True:
+        task = tasks.get()
+        if task is _STOP:
+            break
+
+        task_id, shm_name, shape, threshold = task
+        try:
+            shm = shared_memory.SharedMemory(name=shm_name)
+            try:
+                image = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+                detections = detector.detect(image, threshold=threshold)
+                del image
+            finally:
+                shm.close()
+            results.put(
+                (
+                    "done",
+                    task_id,
+                    (detections.boxes, detections.scores, detections.class_ids),
+                )
+            )
+        except Exception as e:
+            results.put(("failed", task_id, _picklable(e)))
+
+
+def _picklable(error: Exception) -> Exception:
+    """
+    Make sure an exception can be sent back to the parent process.
+    """
+    try:
+        pickle.dumps(error)
+        return error
+    except Exception:
+        return RuntimeError(f"{type(error).__name__}: {error}")
+
+
+class DetectorPool:
+    """
+    Runs detections in several worker processes, each with its own detector.
+
+    PyTorch's intra-op parallelism over a single model scales poorly past a
+    few cores for camera-sized images. The pool instead starts
+    ``num_workers`` processes, each pinned to its own group of cores with
+    ``threads_per_worker`` PyTorch threads, and hands each image to the next
+    free worker. Images travel through shared memory, so only a small task
+    description is pickled; results come back as compact arrays.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "facebook/detr-resnet-50",
+        num_workers: int = 2,
+        threads_per_worker: Optional[int] = None,
+        start_timeout: float = 300.0,
+        **detector_kwargs,
+    ):
+        """
+        Start the worker processes and wait for their models to load.
+
+        Args:
+            model_name: Name or path of the DETR model to use
+            num_workers: Number of worker processes
+            threads_per_worker: PyTorch threads per worker. If not specified,
+                the available cores are divided evenly between the workers.
+            start_timeout: Maximum number of seconds to wait for the workers
+                to load their models
+            **detector_kwargs: Further ``DetrObjectDetector`` arguments, e.g.
+                ``precision``, ``fast_preprocess`` or ``mmap_weights``
+                (which lets the workers share one copy of the weights).
+                The device is always the CPU.
+        """
+        if num_workers < 1:
+            raise ValueError(f"num_workers must be at least 1, got {num_workers}")
+
+        core_groups = split_cores(num_workers)
+        if threads_per_worker is None:
+            threads_per_worker = len(core_groups[0])
+        if threads_per_worker < 1:
+            raise ValueError(
+                f"threads_per_worker must be at least 1, got {threads_per_worker}"
+            )
+
+        self.num_workers = num_workers
+        self.threads_per_worker = threads_per_worker
+        detector_kwargs["device"] = "cpu"
+
+        # Spawn rather than fork: forking a process that has already used
+        # PyTorch's thread pools can deadlock
+        context = multiprocessing.get_context("spawn")
+        self._tasks = context.Queue()
+        self._results = context.Queue()
+        self._processes = [
+            context.Process(
+                target=_worker_main,
+                args=(
+                    model_name,
+                    detector_kwargs,
+                    cores,
+                    threads_per_worker,
+                    self._tasks,
+                    self._results,
+                ),
+                name=f"detr-pool-{i}",
+                daemon=True,
+            )
+            for i, cores in enumerate(core_groups)
+        ]
+
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._next_id = 0
+        self._buffers = []
+        self._free_buffers = []
+        self._closed = False
+        self._error = None
+
+        for process in self._processes:
+            process.start()
+        try:
+            self.labels = self._wait_ready(start_timeout)
+        except BaseException:
+            self._terminate()
+            raise
+
+        self._result_thread = threading.Thread(
+            target=self._collect_results, name="detr-pool-results", daemon=True
+        )
+        self._result_thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def submit(
+        self, image: Union[np.ndarray, Image.Image], threshold: float = 0.7
+    ) -> Future:
+        """
+        Queue an image for detection by the next free worker.
+
+        Args:
+            image: Input image (can be numpy array from OpenCV or PIL Image)
+            threshold: Confidence threshold for detections
+
+        Returns:
+            Future resolving to the same results as ``DetrObjectDetector.detect``
+        """
+        image = self._to_bgr(image)
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("DetectorPool is closed")
+            if self._error is not None:
+                raise RuntimeError("DetectorPool is broken") from self._error
+            shm = self._acquire_buffer(image.nbytes)
+            task_id = self._next_id
+            self._next_id += 1
+            future = Future()
+            self._pending[task_id] = (future, shm)
+
+        # Copy the image into shared memory; only its name and shape are pickled
+        np.ndarray(image.shape, dtype=np.uint8, buffer=shm.buf)[...] = image
+        self._tasks.put((task_id, shm.name, image.shape, threshold))
+        return future
+
+    def map(
+        self,
+        images: Iterable[Union[np.ndarray, Image.Image]],
+        threshold: float = 0.7,
+        timeout: Optional[float] = None,
+        max_in_flight: Optional[int] = None,
+    ) -> Iterator[Detections]:
+        """
+        Detect objects in many images, spread over all workers.
+
+        Every submitted image holds a shared memory copy until its result
+        arrives, so only ``max_in_flight`` images are submitted at a time
+        and the next one is submitted as each result is taken. The first
+        ones are submitted right away, like ``Executor.map``; ``images`` may
+        be a long or endless generator.
+
+        Args:
+            images: Input images
+            threshold: Confidence threshold for detections
+            timeout: Maximum number of seconds to wait for each result
+            max_in_flight: Maximum number of images submitted but not yet
+                returned. If not specified, twice the number of workers, so
+                each worker has its next image queued.
+
+        Returns:
+            Iterator over the detection results in the order of ``images``
+        """
+        if max_in_flight is None:
+            max_in_flight = 2 * self.num_workers
+        if max_in_flight < 1:
+            raise ValueError(f"max_in_flight must be at least 1, got {max_in_flight}")
+
+        images = iter(images)
+        futures = collections.deque(
+            self.submit(image, threshold)
+            for image in itertools.islice(images, max_in_flight)
+        )
+
+        def results():
+            while futures:
+                result = futures.popleft().result(timeout=timeout)
+                for image in itertools.islice(images, 1):
+                    futures.append(self.submit(image, threshold))
+                yield result
+
+        return results()
+
+    def detect(
+        self,
+        image: Union[np.ndarray, Image.Image],
+        threshold: float = 0.7,
+        timeout: Optional[float] = None,
+    ) -> Detections:
+        """
+        Submit an image and wait for its detection results.
+
+        Args:
+            image: Input image (can be numpy array from OpenCV or PIL Image)
+            threshold: Confidence threshold for detections
+            timeout: Maximum number of seconds to wait for the result
+
+        Returns:
+            Detection results
+        """
+        return self.submit(image, threshold).result(timeout=timeout)
+
+    def close(self):
+        """
+        Finish the queued images, stop the workers and free the shared memory.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+
+        for _ in self._processes:
+            self._tasks.put(_STOP)
+        for process in self._processes:
+            process.join()
+        self._result_thread.join()
+
+        self._fail_pending(RuntimeError("DetectorPool was closed"))
+        with self._lock:
+            for shm in self._buffers:
+                shm.close()
+                shm.unlink()
+            self._buffers = []
+            self._free_buffers = []
+
+    def _wait_ready(self, timeout: float) -> Dict[int, str]:
+        """
+        Wait until every worker has loaded its model.
+
+        Returns:
+            The model's mapping from class id to class name
+        """
+        labels = None
+        ready = 0
+        deadline = time.monotonic() + timeout
+        while ready < len(self._processes):
+            try:
+                kind, _, payload = self._results.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                if any(process.exitcode is not None for process in self._processes):
+                    raise RuntimeError("A pool worker exited while starting") from None
+                if time.monotonic() > deadline:
+                    raise RuntimeError(
+                        "Timed out waiting for the pool workers to start"
+                    ) from None
+                continue
+            if kind == "error":
+                raise RuntimeError(
+                    "A pool worker failed to load the model"
+                ) from payload
+            labels = payload
+            ready += 1
+        return labels
+
+    def _collect_results(self):
+        """
+        Result thread: resolve futures as the workers finish images.
+        """
+        while True:
+            try:
+                kind, task_id, payload = self._results.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                if all(not process.is_alive() for process in self._processes):
+                    break
+                if self._error is None and any(
+                    process.exitcode not in (None, 0) for process in self._processes
+                ):
+                    # Whatever the dead worker was doing is lost, so give up
+                    self._error = RuntimeError("A pool worker exited unexpectedly")
+                    self._fail_pending(self._error)
+                continue
+
+            with self._lock:
+                entry = self._pending.pop(task_id, None)
+                if entry is None:
+                    # Already failed by _fail_pending
+                    continue
+                future, shm = entry
+                self._free_buffers.append(shm)
+
+            if kind == "done":
+                boxes, scores, class_ids = payload
+                future.set_result(Detections(boxes, scores, class_ids, self.labels))
+            else:
+                future.set_exception(payload)
+
+    def _fail_pending(self, error: Exception):
+        """
+        Fail every waiting future. Their buffers aren't reused, as a worker
+        may still be reading them.
+        """
+        with self._lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for future, _ in pending:
+            future.set_exception(error)
+
+    def _acquire_buffer(self, nbytes: int) -> shared_memory.SharedMemory:
+        """
+        Reuse a free shared memory block of at least ``nbytes``, or create one.
+
+        Must be called with the lock held.
+        """
+        for i, shm in enumerate(self._free_buffers):
+            if shm.size >= nbytes:
+                return self._free_buffers.pop(i)
+        shm = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+        self._buffers.append(shm)
+        return shm
+
+    def _terminate(self):
+        for process in self._processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+
+    @staticmethod
+    def _to_bgr(image: Union[np.ndarray, Image.Image]) -> np.ndarray:
+        """
+        Convert a PIL Image (RGB) to a contiguous OpenCV-style BGR array.
+        """
+        if isinstance(image, Image.Image):
+            image = np.asarray(image.convert("RGB"))[:, :, ::-1]
+        return np.ascontiguousarray(image, dtype=np.uint8)
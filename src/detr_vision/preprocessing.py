@@ -0,0 +1,301 @@
+"""
+Fast preprocessing of OpenCV frames into DETR model inputs.
+"""
+
+import threading
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+# Largest share of a batch's pixels that may be padding before aspect_buckets
+# puts images into separate batches
+MAX_BATCH_PADDING = 0.1
+
+
+def get_resize_size(
+    height: int, width: int, shortest_edge: int, longest_edge: int
+) -> Tuple[int, int]:
+    """
+    Compute the size DETR resizes an image to.
+
+    The shorter side is scaled to ``shortest_edge`` unless that would make
+    the longer side exceed ``longest_edge``, in which case the longer side is
+    scaled to ``longest_edge``. This mirrors ``DetrImageProcessor``.
+
+    Args:
+        height: Height of the original image
+        width: Width of the original image
+        shortest_edge: Target size of the shorter side
+        longest_edge: Maximum size of the longer side
+
+    Returns:
+        Tuple of (height, width) after resizing
+    """
+    size = shortest_edge
+    raw_size = None
+    min_original_size = float(min(height, width))
+    max_original_size = float(max(height, width))
+    if max_original_size / min_original_size * size > longest_edge:
+        raw_size = longest_edge * min_original_size / max_original_size
+        size = int(round(raw_size))
+
+    if (height <= width and height == size) or (width <= height and width == size):
+        return height, width
+    if width < height:
+        scale = raw_size if raw_size is not None else size
+        return int(scale * height / width), size
+    scale = raw_size if raw_size is not None else size
+    return size, int(scale * width / height)
+
+
+def padding_fraction(sizes: Sequence[Tuple[int, int]]) -> float:
+    """
+    Compute the share of a padded batch's pixels that are padding.
+
+    Args:
+        sizes: (height, width) of each resized image in the batch
+
+    Returns:
+        Fraction between 0 (all images the same size) and 1
+    """
+    if not sizes:
+        return 0.0
+    pad_height = max(h for h, _ in sizes)
+    pad_width = max(w for _, w in sizes)
+    return 1.0 - sum(h * w for h, w in sizes) / (len(sizes) * pad_height * pad_width)
+
+
+def aspect_buckets(
+    sizes: Sequence[Tuple[int, int]],
+    batch_size: int,
+    max_padding: float = MAX_BATCH_PADDING,
+) -> List[List[int]]:
+    """
+    Group images into batches of similar aspect ratio.
+
+    A batch is padded to its largest height and largest width, so mixing
+    portrait and landscape images makes most of the batch padding, which
+    the model still runs over (the attention cost grows with the square of
+    the padded area). The images are sorted by aspect ratio and cut into
+    batches of up to ``batch_size`` images, and a batch is also ended early
+    when adding the next image would make more than ``max_padding`` of it
+    padding.
+
+    Args:
+        sizes: (height, width) of each image after resizing
+        batch_size: Maximum number of images per batch
+        max_padding: Largest allowed share of padding pixels in a batch
+
+    Returns:
+        Lists of image indices, one per batch; every index appears once
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+
+    order = sorted(
+        range(len(sizes)), key=lambda i: (sizes[i][0] / sizes[i][1], sizes[i])
+    )
+    buckets = []
+    bucket = []
+    for i in order:
+        if bucket and (
+            len(bucket) == batch_size
+            or padding_fraction([sizes[j] for j in bucket] + [sizes[i]]) > max_padding
+        ):
+            buckets.append(bucket)
+            bucket = []
+        bucket.append(i)
+    if bucket:
+        buckets.append(bucket)
+    return buckets
+
+
+class FastPreprocessor:
+    """
+    Converts uint8 BGR frames into DETR inputs without PIL.
+
+    The standard path flips the channels, builds a PIL image and lets
+    ``DetrImageProcessor`` convert it back to a tensor, resize, normalize and
+    pad it, copying the full frame several times. This class resizes the
+    uint8 frame directly (the numpy array is wrapped without a copy, unless
+    it is a read-only or negatively strided view) and writes the normalized
+    result, with the BGR to RGB swap folded into the per-channel
+    normalization, straight into a preallocated padded batch tensor. The
+    batch tensors are reused while the input sizes stay the same, as they do
+    for a camera stream.
+
+    The output matches ``DetrImageProcessor`` up to float rounding.
+    """
+
+    def __init__(
+        self,
+        size: Mapping[str, int],
+        image_mean: Sequence[float],
+        image_std: Sequence[float],
+        rescale_factor: float = 1 / 255,
+        device: str = "cpu",
+    ):
+        """
+        Initialize the preprocessor.
+
+        Args:
+            size: Resize settings with ``shortest_edge`` and ``longest_edge``
+            image_mean: Per-channel (RGB) mean used for normalization
+            image_std: Per-channel (RGB) standard deviation used for normalization
+            rescale_factor: Factor converting pixel values to the range [0, 1]
+            device: Device to create the model inputs on
+        """
+        if not size.get("shortest_edge") or not size.get("longest_edge"):
+            raise ValueError(
+                "Size must contain 'shortest_edge' and 'longest_edge', "
+                f"got {dict(size)}"
+            )
+
+        self.shortest_edge = size["shortest_edge"]
+        self.longest_edge = size["longest_edge"]
+        self.device = device
+
+        # Fused rescale and normalize: (x - mean / rescale) / (std / rescale)
+        self._mean = [m / rescale_factor for m in image_mean]
+        self._std = [s / rescale_factor for s in image_std]
+
+        # Batch buffers are per thread, so concurrent callers never share them
+        self._local = threading.local()
+
+    @classmethod
+    def from_processor(cls, processor, device: str = "cpu") -> "FastPreprocessor":
+        """
+        Create a preprocessor with the settings of a ``DetrImageProcessor``.
+
+        Args:
+            processor: Image processor of the model
+            device: Device to create the model inputs on
+
+        Returns:
+            Preprocessor producing the same inputs as the processor
+        """
+        return cls(
+            size={
+                "shortest_edge": processor.size["shortest_edge"],
+                "longest_edge": processor.size["longest_edge"],
+            },
+            image_mean=processor.image_mean,
+            image_std=processor.image_std,
+            rescale_factor=processor.rescale_factor,
+            device=device,
+        )
+
+    @staticmethod
+    def supports(image) -> bool:
+        """
+        Whether an image can be handled by the fast path.
+
+        Only 3-channel uint8 numpy arrays (OpenCV BGR frames) are supported.
+        """
+        return (
+            isinstance(image, np.ndarray)
+            and image.dtype == np.uint8
+            and image.ndim == 3
+            and image.shape[2] == 3
+        )
+
+    def __call__(self, images: Sequence[np.ndarray]) -> Dict[str, torch.Tensor]:
+        """
+        Resize, normalize and pad a batch of BGR frames.
+
+        The returned tensors are reused by the next call from the same thread
+        with the same batch shape, so they must be consumed (e.g. by the
+        forward pass) before calling again.
+
+        Args:
+            images: uint8 BGR images of shape (height, width, 3)
+
+        Returns:
+            Dictionary with ``pixel_values`` of shape (batch, 3, height, width)
+            and ``pixel_mask`` of shape (batch, height, width), padded to the
+            largest resized image like ``DetrImageProcessor`` does
+        """
+        sizes = [
+            get_resize_size(
+                image.shape[0], image.shape[1], self.shortest_edge, self.longest_edge
+            )
+            for image in images
+        ]
+        pad_height = max(h for h, _ in sizes)
+        pad_width = max(w for _, w in sizes)
+        pixel_values, pixel_mask = self._buffers(len(images), pad_height, pad_width)
+
+        for i, (image, (height, width)) in enumerate(zip(images, sizes)):
+            resized = self._resize(image, height, width)
+
+            # Write each RGB output channel from the matching BGR input channel
+            for c in range(3):
+                out = pixel_values[i, c, :height, :width]
+                torch.sub(resized[2 - c], self._mean[c], out=out)
+                out.div_(self._std[c])
+
+            # Clear whatever an earlier, larger image left in the padding
+            pixel_values[i, :, height:, :].zero_()
+            pixel_values[i, :, :height, width:].zero_()
+            pixel_mask[i].zero_()
+            pixel_mask[i, :height, :width] = 1
+
+        return {"pixel_values": pixel_values, "pixel_mask": pixel_mask}
+
+    def _resize(self, image: np.ndarray, height: int, width: int) -> torch.Tensor:
+        """
+        Resize a BGR frame with antialiased bilinear interpolation.
+
+        Returns:
+            Tensor of shape (3, height, width) in BGR channel order
+        """
+        # torch can't wrap negative strides (e.g. a flipped view) and warns on
+        # read-only arrays, so copy those; anything else is wrapped as a
+        # channels-last view without a copy on the CPU
+        if not image.flags.writeable or any(stride < 0 for stride in image.strides):
+            image = image.copy()
+        frame = torch.from_numpy(image).to(self.device).permute(2, 0, 1).unsqueeze(0)
+        if frame.shape[-2:] == (height, width):
+            return frame[0]
+
+        if frame.device.type == "cpu":
+            # The CPU kernels resize uint8 directly, rounding like the processor
+            resized = F.interpolate(
+                frame,
+                size=(height, width),
+                mode="bilinear",
+                align_corners=False,
+                antialias=True,
+            )
+        else:
+            resized = (
+                F.interpolate(
+                    frame.float(),
+                    size=(height, width),
+                    mode="bilinear",
+                    align_corners=False,
+                    antialias=True,
+                )
+                .round_()
+                .clamp_(0, 255)
+            )
+        return resized[0]
+
+    def _buffers(
+        self, batch: int, height: int, width: int
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Get the batch tensors for a batch shape, allocating them on first use.
+        """
+        key = (batch, height, width)
+        if getattr(self._local, "key", None) != key:
+            self._local.key = key
+            self._local.pixel_values = torch.zeros(
+                (batch, 3, height, width), dtype=torch.float32, device=self.device
+            )
+            self._local.pixel_mask = torch.zeros(
+                (batch, height, width), dtype=torch.int64, device=self.device
+            )
+        return self._local.pixel_values, self._local.pixel_mask
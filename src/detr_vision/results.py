@@ -0,0 +1,281 @@
+"""
+Containers for detection results.
+"""
+
+import json
+from typing import Dict, Iterable, List, Mapping, Optional, Union
+
+import numpy as np
+
+# Keys of the dictionary format returned by ``DetrObjectDetector.detect``
+DETECTION_KEYS = ("boxes", "scores", "labels")
+
+
+def detections_to_records(detections: Union["Detections", Dict]) -> List[Dict]:
+    """
+    Convert detection results to a list of JSON-serializable records.
+
+    Args:
+        detections: Detection results in the format of ``DetrObjectDetector.detect``
+
+    Returns:
+        List of ``{"label", "confidence", "box"}`` dictionaries
+    """
+    if isinstance(detections, Detections):
+        return detections.to_records()
+
+    return [
+        {"label": label, "confidence": score, "box": box}
+        for label, score, box in zip(
+            detections["labels"],
+            np.asarray(detections["scores"], dtype=float).tolist(),
+            np.asarray(detections["boxes"], dtype=float).tolist(),
+        )
+    ]
+
+
+class Detections:
+    """
+    Compact detection results for a single image.
+
+    Boxes and scores are contiguous float32 arrays and classes are stored as
+    int16 ids; the label strings are only built from ``id2label`` when they
+    are asked for. The object can be indexed like the dictionary returned by
+    earlier versions of ``DetrObjectDetector.detect`` (``detections["boxes"]``,
+    ``detections["scores"]``, ``detections["labels"]``), so existing callers
+    such as ``draw_detections`` keep working. ``len`` is the number of
+    detections.
+    """
+
+    __slots__ = ("boxes", "scores", "class_ids", "id2label", "_labels")
+
+    # Fields available through dictionary-style indexing
+    _keys = DETECTION_KEYS
+
+    def __init__(
+        self,
+        boxes: np.ndarray,
+        scores: np.ndarray,
+        class_ids: np.ndarray,
+        id2label: Mapping[int, str],
+    ):
+        """
+        Initialize the detections.
+
+        Args:
+            boxes: Array of shape (num_detections, 4) with (x1, y1, x2, y2)
+                boxes in image pixel coordinates
+            scores: Array of shape (num_detections,) with confidence scores
+            class_ids: Array of shape (num_detections,) with class ids
+            id2label: Mapping from class id to class name
+        """
+        self.boxes = np.ascontiguousarray(boxes, dtype=np.float32).reshape(-1, 4)
+        self.scores = np.ascontiguousarray(scores, dtype=np.float32).reshape(-1)
+        self.class_ids = np.ascontiguousarray(class_ids, dtype=np.int16).reshape(-1)
+        self.id2label = id2label
+        self._labels = None
+
+    @classmethod
+    def from_dict(
+        cls, detections: Mapping, id2label: Mapping[int, str]
+    ) -> "Detections":
+        """
+        Create detections from the dictionary format with label strings.
+
+        Args:
+            detections: Dictionary with boxes, scores and labels
+            id2label: Mapping from class id to class name, used to look up
+                the class id of each label
+
+        Returns:
+            Equivalent compact detections
+        """
+        if isinstance(detections, Detections):
+            return detections
+        class_ids = _label_ids(detections["labels"], id2label)
+        return cls(detections["boxes"], detections["scores"], class_ids, id2label)
+
+    @property
+    def labels(self) -> List[str]:
+        """
+        Class name of each detection.
+        """
+        if self._labels is None:
+            self._labels = [self.id2label[i] for i in self.class_ids.tolist()]
+        return self._labels
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def __getitem__(self, key: str):
+        if key not in self._keys:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key) -> bool:
+        return key in self._keys
+
+    def __repr__(self) -> str:
+        return f"Detections({len(self)} detections)"
+
+    def keys(self):
+        """
+        Keys available through indexing, as for a dictionary.
+        """
+        return self._keys
+
+    def get(self, key: str, default=None):
+        """
+        Get a field by key, as for a dictionary.
+        """
+        return self[key] if key in self._keys else default
+
+    def to_dict(self) -> Dict:
+        """
+        Convert to a plain dictionary with boxes, scores and labels.
+        """
+        return {"boxes": self.boxes, "scores": self.scores, "labels": self.labels}
+
+    def filter(
+        self,
+        threshold: float = 0.0,
+        classes: Optional[Iterable[Union[int, str]]] = None,
+        top_k: Optional[int] = None,
+    ) -> "Detections":
+        """
+        Select detections by confidence, class and rank.
+
+        Args:
+            threshold: Confidence threshold for detections
+            classes: Optional class ids or names to keep
+            top_k: Optional maximum number of detections to keep. When given,
+                the highest-scoring detections are returned in descending
+                score order; otherwise detections keep their order.
+
+        Returns:
+            The selected detections
+        """
+        keep = self.scores > threshold
+        if classes is not None:
+            keep &= np.isin(self.class_ids, _label_ids(classes, self.id2label))
+
+        indices = np.flatnonzero(keep)
+        if top_k is not None:
+            order = np.argsort(-self.scores[indices], kind="stable")
+            indices = indices[order[: max(top_k, 0)]]
+
+        return Detections(
+            self.boxes[indices],
+            self.scores[indices],
+            self.class_ids[indices],
+            self.id2label,
+        )
+
+    def to_records(self) -> List[Dict]:
+        """
+        Convert to a list of JSON-serializable records.
+
+        Returns:
+            List of ``{"label", "confidence", "box"}`` dictionaries
+        """
+        # Convert each array to Python floats in one call rather than per box
+        return [
+            {"label": label, "confidence": score, "box": box}
+            for label, score, box in zip(
+                self.labels,
+                self.scores.astype(float).tolist(),
+                self.boxes.astype(float).tolist(),
+            )
+        ]
+
+    def to_json(self) -> str:
+        """
+        Serialize to a JSON array of ``{"label", "confidence", "box"}`` records.
+        """
+        return json.dumps(self.to_records())
+
+
+def _label_ids(
+    classes: Iterable[Union[int, str]], id2label: Mapping[int, str]
+) -> np.ndarray:
+    """
+    Convert a mix of class ids and names to an array of class ids.
+    """
+    label2id = {}
+    for i, label in id2label.items():
+        label2id.setdefault(label, i)
+
+    ids = []
+    for c in classes:
+        if isinstance(c, str):
+            if c not in label2id:
+                raise ValueError(f"Unknown class label: {c!r}")
+            ids.append(label2id[c])
+        else:
+            ids.append(int(c))
+    return np.asarray(ids, dtype=np.int16)
+
+
+class RawDetections:
+    """
+    Unfiltered DETR outputs for a single image.
+
+    Holds one prediction per object query (100 for the pretrained models) as
+    compact numpy arrays: the best class and its probability, the box in
+    image pixel coordinates and, optionally, the raw class logits. Because
+    nothing has been thresholded yet, the same object can be filtered at any
+    threshold or for any classes without running the model again.
+    """
+
+    def __init__(
+        self,
+        boxes: np.ndarray,
+        scores: np.ndarray,
+        class_ids: np.ndarray,
+        id2label: Mapping[int, str],
+        logits: Optional[np.ndarray] = None,
+    ):
+        """
+        Initialize the raw detections.
+
+        Args:
+            boxes: Array of shape (num_queries, 4) with (x1, y1, x2, y2) boxes
+                in image pixel coordinates
+            scores: Array of shape (num_queries,) with the probability of the
+                best class of each query
+            class_ids: Array of shape (num_queries,) with the best class of
+                each query
+            id2label: Mapping from class id to class name
+            logits: Optional array of shape (num_queries, num_classes + 1)
+                with the raw class logits, including the "no object" class
+        """
+        self.boxes = np.ascontiguousarray(boxes, dtype=np.float32).reshape(-1, 4)
+        self.scores = np.ascontiguousarray(scores, dtype=np.float32).reshape(-1)
+        self.class_ids = np.ascontiguousarray(class_ids, dtype=np.int32).reshape(-1)
+        self.id2label = id2label
+        self.logits = logits
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def filter(
+        self,
+        threshold: float = 0.7,
+        classes: Optional[Iterable[Union[int, str]]] = None,
+        top_k: Optional[int] = None,
+    ) -> Detections:
+        """
+        Select detections by confidence, class and rank.
+
+        Args:
+            threshold: Confidence threshold for detections
+            classes: Optional class ids or names to keep
+            top_k: Optional maximum number of detections to keep. When given,
+                the highest-scoring detections are returned in descending
+                score order; otherwise detections keep their query order.
+
+        Returns:
+            Detection results in the format of ``DetrObjectDetector.detect``
+        """
+        detections = Detections(self.boxes, self.scores, self.class_ids, self.id2label)
+        return detections.filter(threshold, classes=classes, top_k=top_k)
@@ -0,0 +1,256 @@
+"""
+Helpers for starting up a detector quickly: a local model cache and startup timing.
+"""
+
+import contextlib
+import os
+import re
+import shutil
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Iterator, Optional, Tuple
+
+# Default location of the local model cache
+DEFAULT_MODEL_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+    "detr_vision",
+    "models",
+)
+
+# Weights file written by save_pretrained with safetensors serialization
+_WEIGHTS_NAME = "model.safetensors"
+
+# Weights file for memory-mapped loading, a torch.save'd state dict
+MMAP_WEIGHTS_NAME = "weights.pt"
+
+
+class StartupTimer:
+    """
+    Records how long each phase of a startup takes.
+    """
+
+    def __init__(self):
+        self.times = OrderedDict()
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Time a block of code as a named phase.
+
+        Args:
+            name: Name of the phase
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.times[name] = self.times.get(name, 0.0) + time.perf_counter() - start
+
+    @property
+    def total(self) -> float:
+        """
+        Total time of all phases in seconds.
+        """
+        return sum(self.times.values())
+
+    def format(self) -> str:
+        """
+        Format the phases as a one-line breakdown, e.g. ``model 1.20s, warmup 0.35s``.
+        """
+        return ", ".join(
+            f"{name} {seconds:.2f}s" for name, seconds in self.times.items()
+        )
+
+
+def model_cache_path(model_name: str, cache_dir: Optional[str] = None) -> str:
+    """
+    Get the directory a model is cached in.
+
+    Args:
+        model_name: Name or path of the model
+        cache_dir: Root of the model cache. If not specified, uses
+            ``DEFAULT_MODEL_CACHE_DIR``.
+
+    Returns:
+        Directory of the cached copy of the model
+    """
+    cache_dir = cache_dir or DEFAULT_MODEL_CACHE_DIR
+    safe_name = re.sub(r"[^A-Za-z0-9._-]+", "--", model_name.strip("/"))
+    return os.path.join(cache_dir, safe_name)
+
+
+def is_model_cached(path: str) -> bool:
+    """
+    Whether a directory holds a complete cached model.
+    """
+    return (
+        os.path.isfile(os.path.join(path, "config.json"))
+        and os.path.isfile(os.path.join(path, _WEIGHTS_NAME))
+        and os.path.isfile(os.path.join(path, "preprocessor_config.json"))
+    )
+
+
+def load_pretrained(
+    model_name: str,
+    cache_dir: Optional[str] = None,
+    timer: Optional[StartupTimer] = None,
+    mmap: bool = False,
+) -> Tuple:
+    """
+    Load a DETR model and image processor through the local model cache.
+
+    The first time a model is loaded it is fetched with ``from_pretrained``
+    as usual and then saved to the cache with ``save_pretrained``, which
+    writes safetensors that ``from_pretrained`` memory-maps. Later loads
+    read the cached copy directly: no Hub requests, no legacy checkpoint
+    conversion and no network access needed.
+
+    With ``mmap`` the weights are also saved as a state dict that is loaded
+    with ``torch.load(mmap=True)`` and assigned to the model without a copy,
+    so the parameters live in the read-only page cache of that file. Every
+    process loading the same file then shares one copy of the weights
+    instead of holding its own (requires torch 2.1 or later).
+
+    Args:
+        model_name: Name or path of the DETR model
+        cache_dir: Root of the model cache. If not specified, uses
+            ``DEFAULT_MODEL_CACHE_DIR``.
+        timer: Optional timer to record the load phases in
+        mmap: Whether to memory-map the weights
+
+    Returns:
+        Tuple of (processor, model, whether the cached copy was used)
+    """
+    timer = timer or StartupTimer()
+
+    # Deferred so importing this package doesn't pay for importing transformers
+    with timer.phase("import"):
+        from transformers import DetrForObjectDetection, DetrImageProcessor
+
+    path = model_cache_path(model_name, cache_dir)
+    cached = is_model_cached(path)
+    source = path if cached else model_name
+    mmap_path = os.path.join(path, MMAP_WEIGHTS_NAME)
+
+    with timer.phase("processor"):
+        processor = DetrImageProcessor.from_pretrained(source)
+
+    if mmap and cached and os.path.isfile(mmap_path):
+        with timer.phase("model"):
+            model = load_mmap_model(path)
+        return processor, model, cached
+
+    with timer.phase("model"):
+        model = DetrForObjectDetection.from_pretrained(source)
+
+    if not cached:
+        with timer.phase("save_cache"):
+            save_to_cache(processor, model, path)
+
+    if mmap:
+        with timer.phase("save_mmap"):
+            save_mmap_weights(model, mmap_path)
+        # Reload so the weights come from the shared mapping, not private memory
+        with timer.phase("model"):
+            model = load_mmap_model(path)
+
+    return processor, model, cached
+
+
+def save_mmap_weights(model, path: str):
+    """
+    Save a model's state dict for memory-mapped loading, atomically.
+
+    Args:
+        model: Model to save
+        path: Path of the weights file
+    """
+    import torch
+
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    try:
+        torch.save(model.state_dict(), tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_mmap_model(path: str):
+    """
+    Build a DETR model whose weights are memory-mapped from a cache directory.
+
+    The model is created on the meta device, so no memory is allocated for
+    randomly initialised weights, and the memory-mapped tensors are then
+    assigned to it as its parameters and buffers.
+
+    Args:
+        path: Cache directory holding ``config.json`` and ``MMAP_WEIGHTS_NAME``
+
+    Returns:
+        Model with memory-mapped weights
+    """
+    import torch
+    from transformers import DetrConfig, DetrForObjectDetection
+
+    config = DetrConfig.from_pretrained(path)
+    # All weights come from the file; never download pretrained backbone weights
+    if getattr(config, "use_pretrained_backbone", False):
+        config.use_pretrained_backbone = False
+
+    with torch.device("meta"):
+        model = DetrForObjectDetection(config)
+
+    state_dict = torch.load(
+        os.path.join(path, MMAP_WEIGHTS_NAME),
+        mmap=True,
+        weights_only=True,
+        map_location="cpu",
+    )
+    model.load_state_dict(state_dict, strict=True, assign=True)
+
+    # Anything not in the state dict would be left without storage
+    uninitialized = [
+        name
+        for name, tensor in list(model.named_parameters()) + list(model.named_buffers())
+        if tensor.is_meta
+    ]
+    if uninitialized:
+        raise RuntimeError(
+            f"Tensors missing from {MMAP_WEIGHTS_NAME}: {', '.join(uninitialized)}"
+        )
+
+    return model
+
+
+def save_to_cache(processor, model, path: str):
+    """
+    Save a model and processor to a cache directory atomically.
+
+    The files are written to a temporary directory next to ``path`` and
+    moved into place in one rename, so a concurrently starting process never
+    sees a half-written cache entry. If another process got there first its
+    copy is kept.
+
+    Args:
+        processor: Image processor to save
+        model: Model to save
+        path: Cache directory from ``model_cache_path``
+    """
+    parent = os.path.dirname(path)
+    os.makedirs(parent, exist_ok=True)
+    tmp_path = tempfile.mkdtemp(prefix=".tmp-", dir=parent)
+    try:
+        processor.save_pretrained(tmp_path)
+        model.save_pretrained(tmp_path)
+        if os.path.isdir(path) and not is_model_cached(path):
+            # Left behind by an older, incomplete save
+            shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+    except OSError:
+        # Another process finished writing the same entry first
+        if not is_model_cached(path):
+            raise
+    finally:
+        shutil.rmtree(tmp_path, ignore_errors=True)
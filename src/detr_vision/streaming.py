@@ -0,0 +1,335 @@
+"""
+Pipelined real-time detection for live video sources.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+from .batching import QueueFullError
+from .model import DetrObjectDetector
+
+
+class LatestSlot:
+    """
+    A thread-safe single-item slot that always holds the newest value.
+
+    Writers overwrite whatever is in the slot, so a slow reader only ever sees
+    the most recent value and stale ones are dropped instead of queueing up.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._item = None
+        self._seq = 0
+        self._taken = False
+        self._closed = False
+        self.dropped = 0
+
+    @property
+    def closed(self) -> bool:
+        """
+        Whether ``close`` has been called.
+        """
+        return self._closed
+
+    def put(self, item: Any) -> int:
+        """
+        Replace the current value.
+
+        Args:
+            item: New value
+
+        Returns:
+            Sequence number of the new value (starting at 1)
+        """
+        with self._condition:
+            if self._item is not None and not self._taken:
+                self.dropped += 1
+            self._item = item
+            self._taken = False
+            self._seq += 1
+            self._condition.notify_all()
+            return self._seq
+
+    def get(self) -> Tuple[int, Any]:
+        """
+        Get the current value without waiting.
+
+        Returns:
+            Tuple of (sequence number, value); (0, None) if nothing was put yet
+        """
+        with self._condition:
+            return self._seq, self._item
+
+    def wait_newer(self, seq: int, timeout: Optional[float] = None) -> Tuple[int, Any]:
+        """
+        Wait for a value newer than ``seq`` and mark it as taken.
+
+        Args:
+            seq: Sequence number of the last value the caller has seen
+            timeout: Maximum number of seconds to wait
+
+        Returns:
+            Tuple of (sequence number, value); the value is None if the wait
+            timed out or the slot was closed
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._seq > seq or self._closed, timeout)
+            if self._seq <= seq:
+                return seq, None
+            self._taken = True
+            return self._seq, self._item
+
+    def close(self):
+        """
+        Wake up all waiting readers.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class RateMeter:
+    """
+    Measures events per second over a sliding time window.
+    """
+
+    def __init__(self, window: float = 2.0):
+        """
+        Args:
+            window: Length of the measurement window in seconds
+        """
+        self.window = window
+        self._times = deque()
+        self._lock = threading.Lock()
+
+    def tick(self, now: Optional[float] = None):
+        """
+        Record one event.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._times.append(now)
+            self._trim(now)
+
+    def rate(self, now: Optional[float] = None) -> float:
+        """
+        Get the current rate in events per second.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._trim(now)
+            if len(self._times) < 2:
+                return 0.0
+            span = now - self._times[0]
+            return (len(self._times) - 1) / span if span > 0 else 0.0
+
+    def _trim(self, now: float):
+        while self._times and now - self._times[0] > self.window:
+            self._times.popleft()
+
+
+class DetectionPipeline:
+    """
+    Runs capture and inference on background threads for a live video source.
+
+    A capture thread keeps reading frames from the source into a single slot,
+    and an inference thread always picks up the newest frame, so frames that
+    arrive while the model is busy are dropped instead of piling up. The
+    display loop calls ``latest_frame`` and ``latest_detections`` to show
+    every captured frame with the most recent detections drawn on it.
+
+    The detector may also be a ``BatchScheduler`` shared with other callers;
+    frames it rejects because its queue is full are dropped as well.
+    """
+
+    def __init__(
+        self, source: Any, detector: DetrObjectDetector, threshold: float = 0.7
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            source: Opened frame source with a ``read()`` method returning
+                ``(success, frame)``, such as a ``Camera``
+            detector: Loaded object detector
+            threshold: Confidence threshold for detections
+        """
+        self.source = source
+        self.detector = detector
+        self.threshold = threshold
+
+        self.capture_rate = RateMeter()
+        self.inference_rate = RateMeter()
+        self.latency = 0.0
+        self.rejected_frames = 0
+
+        self._frames = LatestSlot()
+        self._detections = LatestSlot()
+        self._stop_event = threading.Event()
+        self._threads = []
+        self._error = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def running(self) -> bool:
+        """
+        Whether the background threads are still running.
+        """
+        return any(thread.is_alive() for thread in self._threads)
+
+    @property
+    def finished(self) -> bool:
+        """
+        Whether no more detections will come, because the source ended or
+        the pipeline was stopped.
+        """
+        return self._detections.closed
+
+    def start(self):
+        """
+        Start the capture and inference threads.
+
+        Returns:
+            self for method chaining
+        """
+        self._stop_event.clear()
+        self._threads = [
+            threading.Thread(
+                target=self._capture_loop, name="detr-capture", daemon=True
+            ),
+            threading.Thread(
+                target=self._inference_loop, name="detr-inference", daemon=True
+            ),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop the background threads and wait for them to finish.
+        """
+        self._stop_event.set()
+        self._frames.close()
+        self._detections.close()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def latest_frame(self) -> Optional[Tuple[int, float, Any]]:
+        """
+        Get the most recently captured frame.
+
+        Returns:
+            Tuple of (sequence number, capture time, frame), or None if no
+            frame has been captured yet
+        """
+        self._raise_error()
+        _, item = self._frames.get()
+        return item
+
+    def latest_detections(self) -> Optional[Tuple[int, float, Dict]]:
+        """
+        Get the most recent detection results.
+
+        Returns:
+            Tuple of (frame sequence number, frame capture time, detections),
+            or None if no frame has been processed yet
+        """
+        self._raise_error()
+        _, item = self._detections.get()
+        return item
+
+    def wait_detections(
+        self, seq: int, timeout: Optional[float] = None
+    ) -> Tuple[int, Optional[Tuple[int, float, Dict]]]:
+        """
+        Wait for detection results newer than the ones last seen.
+
+        Results that were superseded while the caller was busy are skipped,
+        so a slow consumer always gets the most recent results.
+
+        Args:
+            seq: Sequence number returned by the previous call, 0 at first
+            timeout: Maximum number of seconds to wait
+
+        Returns:
+            Tuple of (sequence number, item), where the item is as returned by
+            ``latest_detections`` and None if the wait timed out or the
+            pipeline finished
+        """
+        seq, item = self._detections.wait_newer(seq, timeout)
+        self._raise_error()
+        return seq, item
+
+    def stats(self) -> Dict:
+        """
+        Get pipeline statistics.
+
+        Returns:
+            Dictionary with capture and inference rates, the end-to-end
+            latency of the latest detections (from frame capture until the
+            results were available) and the number of frames skipped by the
+            inference thread, including frames a busy scheduler rejected
+        """
+        return {
+            "capture_fps": self.capture_rate.rate(),
+            "inference_fps": self.inference_rate.rate(),
+            "latency": self.latency,
+            "dropped_frames": self._frames.dropped + self.rejected_frames,
+        }
+
+    def _capture_loop(self):
+        try:
+            seq = 0
+            while not self._stop_event.is_set():
+                success, frame = self.source.read()
+                if not success:
+                    break
+                seq += 1
+                now = time.monotonic()
+                self.capture_rate.tick(now)
+                self._frames.put((seq, now, frame))
+        except Exception as e:
+            self._error = e
+        finally:
+            self._frames.close()
+
+    def _inference_loop(self):
+        try:
+            last_seq = 0
+            while not self._stop_event.is_set():
+                last_seq, item = self._frames.wait_newer(last_seq, timeout=0.1)
+                if item is None:
+                    if self._frames.closed:
+                        break
+                    continue
+
+                seq, captured_at, frame = item
+                try:
+                    detections = self.detector.detect(frame, threshold=self.threshold)
+                except QueueFullError:
+                    # The shared scheduler is overloaded; skip to a newer frame
+                    self.rejected_frames += 1
+                    continue
+                now = time.monotonic()
+                self.inference_rate.tick(now)
+                self.latency = now - captured_at
+                self._detections.put((seq, captured_at, detections))
+        except Exception as e:
+            self._error = e
+        finally:
+            self._detections.close()
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise RuntimeError("Detection pipeline failed") from self._error
@@ -0,0 +1,91 @@
+"""
+Tiny, randomly initialised DETR models for running tests and benchmarks offline.
+"""
+
+import torch
+from transformers import (
+    DetrConfig,
+    DetrForObjectDetection,
+    DetrImageProcessor,
+    ResNetConfig,
+)
+
+# Model sizes: "tiny" keeps the unit tests fast, "small" has the same number
+# of queries and COCO classes as facebook/detr-resnet-50 and the default DETR
+# resize settings, so preprocessing and post-processing costs are realistic
+# in the benchmarks
+MODEL_SIZES = {
+    "tiny": {
+        "backbone": {"embedding_size": 8, "hidden_sizes": [8, 16, 16, 32]},
+        "d_model": 32,
+        "layers": 1,
+        "attention_heads": 2,
+        "ffn_dim": 32,
+        "num_queries": 10,
+        "num_labels": 5,
+        "processor_size": {"shortest_edge": 64, "longest_edge": 96},
+    },
+    "small": {
+        "backbone": {"embedding_size": 16, "hidden_sizes": [16, 32, 64, 128]},
+        "d_model": 64,
+        "layers": 2,
+        "attention_heads": 4,
+        "ffn_dim": 128,
+        "num_queries": 100,
+        "num_labels": 91,
+        "processor_size": None,
+    },
+}
+
+
+def build_tiny_detr(path: str, seed: int = 0, size: str = "tiny") -> str:
+    """
+    Save a small random-weight DETR model and processor to a directory.
+
+    The result can be passed as ``model_name`` to ``DetrObjectDetector`` so
+    tests and benchmarks run without downloading pretrained weights.
+
+    Args:
+        path: Directory to save the model and processor to
+        seed: Random seed used to initialise the weights
+        size: One of ``MODEL_SIZES``
+
+    Returns:
+        The directory the model was saved to
+    """
+    if size not in MODEL_SIZES:
+        raise ValueError(
+            f"Unknown model size {size!r}, expected one of {', '.join(MODEL_SIZES)}"
+        )
+    settings = MODEL_SIZES[size]
+
+    backbone_config = ResNetConfig(
+        **settings["backbone"],
+        depths=[1, 1, 1, 1],
+        layer_type="basic",
+        out_features=["stage4"],
+    )
+    config = DetrConfig(
+        backbone_config=backbone_config,
+        d_model=settings["d_model"],
+        encoder_layers=settings["layers"],
+        decoder_layers=settings["layers"],
+        encoder_attention_heads=settings["attention_heads"],
+        decoder_attention_heads=settings["attention_heads"],
+        encoder_ffn_dim=settings["ffn_dim"],
+        decoder_ffn_dim=settings["ffn_dim"],
+        num_queries=settings["num_queries"],
+        num_labels=settings["num_labels"],
+    )
+
+    torch.manual_seed(seed)
+    model = DetrForObjectDetection(config)
+    if settings["processor_size"] is None:
+        processor = DetrImageProcessor()
+    else:
+        processor = DetrImageProcessor(size=settings["processor_size"])
+
+    model.save_pretrained(path)
+    processor.save_pretrained(path)
+
+    return path
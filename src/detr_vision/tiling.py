@@ -0,0 +1,178 @@
+"""
+Tiling of large images and merging of overlapping detections.
+"""
+
+from typing import Iterator, Tuple
+
+import numpy as np
+
+# Ways of merging duplicate detections from overlapping tiles
+MERGE_METHODS = ("nms", "wbf")
+
+# Largest number of box pairs whose IoU is computed at once when merging
+_IOU_BLOCK_ELEMENTS = 1 << 20
+
+
+def tile_grid(height: int, width: int, tile_size: int, overlap: float) -> np.ndarray:
+    """
+    Compute tiles covering an image.
+
+    Neighbouring tiles overlap by ``overlap`` of the tile size, and the last
+    row and column are shifted to end exactly at the image border, so every
+    tile has the full tile size unless the image itself is smaller.
+
+    Args:
+        height: Height of the image
+        width: Width of the image
+        tile_size: Side length of the square tiles in pixels
+        overlap: Fraction of the tile size shared by neighbouring tiles,
+            in [0, 1)
+
+    Returns:
+        Array of shape (num_tiles, 4) with (x1, y1, x2, y2) tile corners
+    """
+    if tile_size < 1:
+        raise ValueError(f"tile_size must be at least 1, got {tile_size}")
+    if not 0 <= overlap < 1:
+        raise ValueError(f"overlap must be in [0, 1), got {overlap}")
+
+    stride = max(int(tile_size * (1 - overlap)), 1)
+
+    def starts(length):
+        if length <= tile_size:
+            return np.array([0])
+        positions = np.arange(0, length - tile_size, stride)
+        return np.append(positions, length - tile_size)
+
+    ys, xs = np.meshgrid(starts(height), starts(width), indexing="ij")
+    x1 = xs.ravel()
+    y1 = ys.ravel()
+    return np.stack(
+        [x1, y1, np.minimum(x1 + tile_size, width), np.minimum(y1 + tile_size, height)],
+        axis=1,
+    )
+
+
+def box_iou(boxes1: np.ndarray, boxes2: np.ndarray) -> np.ndarray:
+    """
+    Compute the pairwise intersection over union of two sets of boxes.
+
+    Args:
+        boxes1: Array of shape (N, 4) with (x1, y1, x2, y2) boxes
+        boxes2: Array of shape (M, 4) with (x1, y1, x2, y2) boxes
+
+    Returns:
+        Array of shape (N, M) with the IoU of every pair
+    """
+    area1 = (boxes1[:, 2] - boxes1[:, 0]) * (boxes1[:, 3] - boxes1[:, 1])
+    area2 = (boxes2[:, 2] - boxes2[:, 0]) * (boxes2[:, 3] - boxes2[:, 1])
+
+    top_left = np.maximum(boxes1[:, None, :2], boxes2[None, :, :2])
+    bottom_right = np.minimum(boxes1[:, None, 2:], boxes2[None, :, 2:])
+    wh = np.clip(bottom_right - top_left, 0, None)
+    intersection = wh[..., 0] * wh[..., 1]
+
+    union = area1[:, None] + area2[None, :] - intersection
+    return np.where(union > 0, intersection / np.maximum(union, 1e-9), 0.0)
+
+
+def _overlap_blocks(
+    boxes: np.ndarray, class_ids: np.ndarray, iou_threshold: float
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Yield the same-class overlap matrix of the boxes a block of rows at a time.
+
+    A dense matrix over every box from every tile grows with the square of the
+    number of boxes, so at most ``_IOU_BLOCK_ELEMENTS`` pairs are compared at
+    once.
+
+    Yields:
+        Tuples of (first row, boolean array of shape (rows, N) that is True
+        where a pair of the same class overlaps by more than ``iou_threshold``)
+    """
+    rows = max(_IOU_BLOCK_ELEMENTS // max(len(boxes), 1), 1)
+    for start in range(0, len(boxes), rows):
+        iou = box_iou(boxes[start : start + rows], boxes)
+        iou[class_ids[start : start + rows, None] != class_ids[None, :]] = 0.0
+        yield start, iou > iou_threshold
+
+
+def nms(
+    boxes: np.ndarray,
+    scores: np.ndarray,
+    class_ids: np.ndarray,
+    iou_threshold: float = 0.5,
+) -> np.ndarray:
+    """
+    Class-aware non-maximum suppression.
+
+    Boxes are visited from the highest score down; each kept box suppresses
+    all lower-scoring boxes of the same class that overlap it by more than
+    ``iou_threshold``. The IoU matrix is computed in blocks of rows, so
+    memory grows linearly with the number of boxes.
+
+    Args:
+        boxes: Array of shape (N, 4) with (x1, y1, x2, y2) boxes
+        scores: Array of shape (N,) with confidence scores
+        class_ids: Array of shape (N,) with class ids
+        iou_threshold: Overlap above which a box is a duplicate
+
+    Returns:
+        Indices of the kept boxes, in descending score order
+    """
+    order = np.argsort(-scores, kind="stable")
+
+    suppressed = np.zeros(len(order), dtype=bool)
+    for start, overlaps in _overlap_blocks(
+        boxes[order], class_ids[order], iou_threshold
+    ):
+        for i in range(start, start + len(overlaps)):
+            if not suppressed[i]:
+                suppressed[i + 1 :] |= overlaps[i - start, i + 1 :]
+    return order[~suppressed]
+
+
+def weighted_box_fusion(
+    boxes: np.ndarray,
+    scores: np.ndarray,
+    class_ids: np.ndarray,
+    iou_threshold: float = 0.5,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Class-aware weighted box fusion.
+
+    Boxes are grouped like in ``nms``, but instead of keeping only the best
+    box of each group, the group is replaced by the score-weighted average of
+    its boxes with the group's highest score. This gives steadier boxes for
+    objects seen by several overlapping tiles.
+
+    Args:
+        boxes: Array of shape (N, 4) with (x1, y1, x2, y2) boxes
+        scores: Array of shape (N,) with confidence scores
+        class_ids: Array of shape (N,) with class ids
+        iou_threshold: Overlap above which boxes are fused
+
+    Returns:
+        Tuple of (boxes, scores, class_ids) of the fused boxes, in descending
+        score order
+    """
+    order = np.argsort(-scores, kind="stable")
+    boxes, scores, class_ids = boxes[order], scores[order], class_ids[order]
+
+    # Assign every box to the group of the first (best) box that claims it
+    group = np.full(len(order), -1)
+    for start, overlaps in _overlap_blocks(boxes, class_ids, iou_threshold):
+        for i in range(start, start + len(overlaps)):
+            if group[i] < 0:
+                group[i] = i
+                members = overlaps[i - start] & (group < 0)
+                group[members] = i
+
+    leaders, group_index = np.unique(group, return_inverse=True)
+    weights = np.zeros(len(leaders))
+    weighted_boxes = np.zeros((len(leaders), 4))
+    np.add.at(weights, group_index, scores)
+    np.add.at(weighted_boxes, group_index, boxes * scores[:, None])
+
+    fused_boxes = weighted_boxes / np.maximum(weights, 1e-9)[:, None]
+    return fused_boxes, scores[leaders], class_ids[leaders]
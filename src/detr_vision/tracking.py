@@ -0,0 +1,462 @@
+"""
+Object tracking between detections for live video streams.
+"""
+
+from collections import Counter
+from typing import Dict, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+from .model import DetrObjectDetector
+from .motion import downscale_gray, motion_score
+from .results import DETECTION_KEYS, Detections
+from .streaming import RateMeter
+from .tiling import box_iou
+
+# Constant velocity motion model over the state (cx, cy, w, h, vcx, vcy, vw, vh)
+_TRANSITION = np.eye(8)
+_TRANSITION[:4, 4:] = np.eye(4)
+
+
+def _boxes_to_xywh(boxes: np.ndarray) -> np.ndarray:
+    """
+    Convert (x1, y1, x2, y2) boxes to (center_x, center_y, width, height).
+    """
+    boxes = boxes.astype(np.float64)
+    wh = boxes[:, 2:] - boxes[:, :2]
+    return np.concatenate([boxes[:, :2] + 0.5 * wh, wh], axis=1)
+
+
+def _xywh_to_boxes(xywh: np.ndarray) -> np.ndarray:
+    """
+    Convert (center_x, center_y, width, height) boxes to (x1, y1, x2, y2).
+    """
+    half = 0.5 * xywh[:, 2:4]
+    return np.concatenate([xywh[:, :2] - half, xywh[:, :2] + half], axis=1)
+
+
+class TrackedDetections(Detections):
+    """
+    Detections with a persistent id for every tracked object.
+
+    Indexing with ``"track_ids"`` returns the ids, in addition to the keys
+    of ``Detections``.
+    """
+
+    __slots__ = ("track_ids",)
+
+    _keys = DETECTION_KEYS + ("track_ids",)
+
+    def __init__(
+        self,
+        boxes: np.ndarray,
+        scores: np.ndarray,
+        class_ids: np.ndarray,
+        track_ids: np.ndarray,
+        id2label: Mapping[int, str],
+    ):
+        """
+        Initialize the tracked detections.
+
+        Args:
+            boxes: Array of shape (num_tracks, 4) with (x1, y1, x2, y2) boxes
+            scores: Array of shape (num_tracks,) with the confidence of the
+                latest detection of each track
+            class_ids: Array of shape (num_tracks,) with class ids
+            track_ids: Array of shape (num_tracks,) with track ids
+            id2label: Mapping from class id to class name
+        """
+        super().__init__(boxes, scores, class_ids, id2label)
+        self.track_ids = np.ascontiguousarray(track_ids, dtype=np.int64).reshape(-1)
+
+    def __repr__(self) -> str:
+        return f"TrackedDetections({len(self)} tracks)"
+
+    def to_records(self) -> List[Dict]:
+        """
+        Convert to a list of JSON-serializable records.
+
+        Returns:
+            List of ``{"label", "confidence", "box", "track_id"}`` dictionaries
+        """
+        records = super().to_records()
+        for record, track_id in zip(records, self.track_ids.tolist()):
+            record["track_id"] = track_id
+        return records
+
+
+class SortTracker:
+    """
+    SORT-style multi-object tracker: a Kalman filter per object and IoU matching.
+
+    Every track has a constant velocity Kalman filter over its box center,
+    size and their velocities; the noise scales with the box size, so small
+    and large objects are treated alike. All tracks are predicted and
+    corrected together with batched numpy operations. New detections are
+    matched greedily to the predicted boxes of the same class by IoU;
+    unmatched detections start new tracks, and tracks without a matching
+    detection for more than ``max_age`` frames are dropped.
+
+    Call ``predict`` once per frame and ``update`` on the frames that were
+    run through the detector.
+    """
+
+    def __init__(
+        self,
+        iou_threshold: float = 0.3,
+        max_age: int = 30,
+        min_hits: int = 1,
+        position_noise: float = 1 / 20,
+        velocity_noise: float = 1 / 160,
+    ):
+        """
+        Initialize the tracker.
+
+        Args:
+            iou_threshold: Minimum IoU between a predicted track box and a
+                detection to match them
+            max_age: Number of frames a track survives without a matching
+                detection
+            min_hits: Number of matched detections before a track is reported
+            position_noise: Standard deviation of the box position and size
+                noise, relative to the box size
+            velocity_noise: Standard deviation of the velocity noise per
+                frame, relative to the box size
+        """
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.min_hits = min_hits
+        self.position_noise = position_noise
+        self.velocity_noise = velocity_noise
+        self.id2label = {}
+
+        self._mean = np.zeros((0, 8))
+        self._cov = np.zeros((0, 8, 8))
+        self._track_ids = np.zeros(0, dtype=np.int64)
+        self._class_ids = np.zeros(0, dtype=np.int16)
+        self._scores = np.zeros(0, dtype=np.float32)
+        self._hits = np.zeros(0, dtype=np.int64)
+        self._misses = np.zeros(0, dtype=np.int64)
+        self._next_id = 1
+
+    def __len__(self) -> int:
+        return len(self._track_ids)
+
+    def predict(self) -> TrackedDetections:
+        """
+        Advance all tracks by one frame with their motion model.
+
+        Returns:
+            The predicted tracks
+        """
+        if len(self):
+            scale = self._box_scale(self._mean)
+            noise = (
+                np.concatenate(
+                    [self.position_noise * scale, self.velocity_noise * scale], axis=1
+                )
+                ** 2
+            )
+
+            self._mean = self._mean @ _TRANSITION.T
+            self._mean[:, 2:4] = np.maximum(self._mean[:, 2:4], 1.0)
+            self._cov = _TRANSITION @ self._cov @ _TRANSITION.T
+            self._cov[:, np.arange(8), np.arange(8)] += noise
+            self._misses += 1
+
+        return self.tracks()
+
+    def update(self, detections: Detections) -> TrackedDetections:
+        """
+        Correct the predicted tracks with the detections of the current frame.
+
+        Args:
+            detections: Detections of the current frame
+
+        Returns:
+            The updated tracks
+        """
+        self.id2label = detections.id2label
+        measurements = _boxes_to_xywh(detections.boxes)
+        track_index, detection_index = self._match(detections)
+
+        if len(track_index):
+            self._correct(track_index, measurements[detection_index])
+            self._scores[track_index] = detections.scores[detection_index]
+            self._hits[track_index] += 1
+            self._misses[track_index] = 0
+
+        new = np.setdiff1d(np.arange(len(detections)), detection_index)
+        if len(new):
+            self._start_tracks(
+                measurements[new], detections.scores[new], detections.class_ids[new]
+            )
+
+        alive = self._misses <= self.max_age
+        if not alive.all():
+            self._select(alive)
+
+        return self.tracks()
+
+    def tracks(self) -> TrackedDetections:
+        """
+        Get the current tracks that have been confirmed by ``min_hits`` detections.
+        """
+        keep = self._hits >= self.min_hits
+        return TrackedDetections(
+            _xywh_to_boxes(self._mean[keep, :4]),
+            self._scores[keep],
+            self._class_ids[keep],
+            self._track_ids[keep],
+            self.id2label,
+        )
+
+    def uncertainty(self) -> float:
+        """
+        Largest position uncertainty of the confirmed tracks.
+
+        The uncertainty of a track is the standard deviation of its predicted
+        center, relative to its box size. It grows with every frame a track
+        is predicted without a detection, faster for objects whose motion
+        was hard to follow.
+
+        Returns:
+            Largest relative uncertainty, or 0.0 without tracks
+        """
+        keep = self._hits >= self.min_hits
+        if not keep.any():
+            return 0.0
+        position_var = self._cov[keep, 0, 0] + self._cov[keep, 1, 1]
+        size = np.sqrt(self._mean[keep, 2] * self._mean[keep, 3])
+        return float(np.max(np.sqrt(position_var) / np.maximum(size, 1.0)))
+
+    def reset(self):
+        """
+        Drop all tracks. Track ids keep counting up.
+        """
+        self._select(np.zeros(len(self), dtype=bool))
+
+    def _match(self, detections: Detections) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Greedily match tracks to detections of the same class by IoU.
+
+        Returns:
+            Tuple of (track indices, detection indices) of the matched pairs
+        """
+        if not len(self) or not len(detections):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        iou = box_iou(
+            _xywh_to_boxes(self._mean[:, :4]), detections.boxes.astype(np.float64)
+        )
+        iou[self._class_ids[:, None] != detections.class_ids[None, :]] = 0.0
+
+        rows, cols = np.nonzero(iou >= self.iou_threshold)
+        order = np.argsort(-iou[rows, cols], kind="stable")
+        used_tracks, used_detections = set(), set()
+        matches = []
+        for row, col in zip(rows[order].tolist(), cols[order].tolist()):
+            if row not in used_tracks and col not in used_detections:
+                used_tracks.add(row)
+                used_detections.add(col)
+                matches.append((row, col))
+
+        matches = np.array(matches, dtype=np.int64).reshape(-1, 2)
+        return matches[:, 0], matches[:, 1]
+
+    def _correct(self, track_index: np.ndarray, measurements: np.ndarray):
+        """
+        Kalman filter correction of the given tracks with their measurements.
+        """
+        mean = self._mean[track_index]
+        cov = self._cov[track_index]
+
+        measurement_var = (self.position_noise * self._box_scale(mean)) ** 2
+        innovation_cov = cov[:, :4, :4] + measurement_var[:, :, None] * np.eye(4)
+        # Kalman gain K = P H^T S^-1, with H selecting the first four states
+        gain = np.linalg.solve(innovation_cov, cov[:, :4, :]).transpose(0, 2, 1)
+
+        innovation = measurements - mean[:, :4]
+        self._mean[track_index] = mean + (gain @ innovation[:, :, None])[:, :, 0]
+        self._cov[track_index] = cov - gain @ cov[:, :4, :]
+
+    def _start_tracks(
+        self, measurements: np.ndarray, scores: np.ndarray, class_ids: np.ndarray
+    ):
+        """
+        Start a track for each unmatched detection.
+        """
+        count = len(measurements)
+        scale = self._box_scale(measurements)
+        std = np.concatenate(
+            [2 * self.position_noise * scale, 10 * self.velocity_noise * scale], axis=1
+        )
+        mean = np.concatenate([measurements, np.zeros((count, 4))], axis=1)
+        mean[:, 2:4] = np.maximum(mean[:, 2:4], 1.0)
+        cov = np.zeros((count, 8, 8))
+        cov[:, np.arange(8), np.arange(8)] = std**2
+
+        self._mean = np.concatenate([self._mean, mean])
+        self._cov = np.concatenate([self._cov, cov])
+        self._track_ids = np.concatenate(
+            [self._track_ids, np.arange(self._next_id, self._next_id + count)]
+        )
+        self._next_id += count
+        self._class_ids = np.concatenate([self._class_ids, class_ids.astype(np.int16)])
+        self._scores = np.concatenate([self._scores, scores.astype(np.float32)])
+        self._hits = np.concatenate([self._hits, np.ones(count, dtype=np.int64)])
+        self._misses = np.concatenate([self._misses, np.zeros(count, dtype=np.int64)])
+
+    def _select(self, keep: np.ndarray):
+        """
+        Keep only the selected tracks.
+        """
+        self._mean = self._mean[keep]
+        self._cov = self._cov[keep]
+        self._track_ids = self._track_ids[keep]
+        self._class_ids = self._class_ids[keep]
+        self._scores = self._scores[keep]
+        self._hits = self._hits[keep]
+        self._misses = self._misses[keep]
+
+    @staticmethod
+    def _box_scale(xywh: np.ndarray) -> np.ndarray:
+        """
+        Per-state noise scale (w, h, w, h) of each box.
+        """
+        wh = np.maximum(xywh[:, 2:4], 1.0)
+        return np.concatenate([wh, wh], axis=1)
+
+
+class TrackingDetector:
+    """
+    Runs the detector on only some frames of a video stream and tracks objects in
+    between.
+
+    A frame goes through the model when ``detect_every`` frames have passed
+    since the last detection, when the scene has changed by more than
+    ``motion_threshold`` since then, or when the tracker's position
+    uncertainty exceeds ``uncertainty_threshold``. On all other frames the
+    tracked boxes are propagated by the tracker's motion model, which costs
+    a tiny fraction of a forward pass.
+    """
+
+    def __init__(
+        self,
+        detector: DetrObjectDetector,
+        threshold: float = 0.7,
+        detect_every: int = 5,
+        motion_threshold: Optional[float] = None,
+        uncertainty_threshold: Optional[float] = None,
+        tracker: Optional[SortTracker] = None,
+    ):
+        """
+        Initialize the tracking detector.
+
+        Args:
+            detector: Loaded object detector
+            threshold: Confidence threshold for detections
+            detect_every: Run the detector at least every this many frames
+            motion_threshold: Optional fraction (0 to 1) of the downscaled
+                frame that changed since the last detected frame above which
+                the detector runs early (see ``motion.motion_score``, the
+                score ``MotionGate`` uses as well)
+            uncertainty_threshold: Optional tracker uncertainty (see
+                ``SortTracker.uncertainty``) above which the detector runs early
+            tracker: Tracker to use; a ``SortTracker`` with default settings
+                if not specified
+        """
+        if detect_every < 1:
+            raise ValueError(f"detect_every must be at least 1, got {detect_every}")
+
+        self.detector = detector
+        self.threshold = threshold
+        self.detect_every = detect_every
+        self.motion_threshold = motion_threshold
+        self.uncertainty_threshold = uncertainty_threshold
+        self.tracker = tracker or SortTracker()
+
+        self.display_rate = RateMeter()
+        self.inference_rate = RateMeter()
+        self.frames = 0
+        self.inferences = 0
+        self.triggers = Counter()
+
+        self._last_detection_frame = None
+        self._last_detection_small = None
+
+    def process(self, frame: Union[np.ndarray, Image.Image]) -> TrackedDetections:
+        """
+        Get the tracked objects of the next frame, running the detector if needed.
+
+        Args:
+            frame: Next frame of the stream (numpy array from OpenCV or PIL Image)
+
+        Returns:
+            Tracked objects with persistent ids
+        """
+        self.tracker.predict()
+
+        small = None
+        if self.motion_threshold is not None:
+            image = (
+                frame
+                if isinstance(frame, np.ndarray)
+                else np.asarray(frame.convert("L"))
+            )
+            small = downscale_gray(image)
+
+        trigger = self._trigger(small)
+        if trigger is None:
+            tracks = self.tracker.tracks()
+        else:
+            detections = self.detector.detect(frame, threshold=self.threshold)
+            tracks = self.tracker.update(detections)
+            self._last_detection_frame = self.frames
+            self._last_detection_small = small
+            self.inferences += 1
+            self.triggers[trigger] += 1
+            self.inference_rate.tick()
+
+        self.frames += 1
+        self.display_rate.tick()
+        return tracks
+
+    def stats(self) -> Dict:
+        """
+        Get tracking statistics.
+
+        Returns:
+            Dictionary with the display and effective inference rates, the
+            number of frames and forward passes, the fraction of frames run
+            through the model and how often each condition triggered it
+        """
+        return {
+            "display_fps": self.display_rate.rate(),
+            "inference_fps": self.inference_rate.rate(),
+            "frames": self.frames,
+            "inferences": self.inferences,
+            "inference_fraction": self.inferences / self.frames if self.frames else 0.0,
+            "triggers": dict(self.triggers),
+        }
+
+    def _trigger(self, small: Optional[np.ndarray]) -> Optional[str]:
+        """
+        Decide whether the current frame needs a forward pass, and why.
+        """
+        if self._last_detection_frame is None:
+            return "first"
+        if self.frames - self._last_detection_frame >= self.detect_every:
+            return "interval"
+        if (
+            self.motion_threshold is not None
+            and motion_score(self._last_detection_small, small) > self.motion_threshold
+        ):
+            return "motion"
+        if (
+            self.uncertainty_threshold is not None
+            and self.tracker.uncertainty() > self.uncertainty_threshold
+        ):
+            return "uncertainty"
+        return None
@@ -1,107 +1,385 @@
 """
 Visualization module for displaying and saving detection results.
 """
+
+import functools
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Mapping, Optional, Tuple
+
 import cv2
 import numpy as np
-import matplotlib.pyplot as plt
-from typing import Dict, List, Tuple
-import os
-import random
 
-# Create a persistent color mapping for class labels
-COLOR_MAP = {}
 BOX_THICKNESS = 2
 TEXT_THICKNESS = 2
 FONT_SCALE = 0.5
+FONT_FACE = cv2.FONT_HERSHEY_SIMPLEX
+TEXT_COLOR = (255, 255, 255)
+
+# Darkest value of a color channel, so white label text stays readable
+MIN_COLOR_VALUE = 50
 
 
+@functools.lru_cache(maxsize=4096)
 def get_color(label: str) -> Tuple[int, int, int]:
     """
     Get a consistent color for a given label.
 
+    The color is derived from a hash of the label, so it is the same in
+    every process and every run.
+
     Args:
         label: The class label
 
     Returns:
         BGR color tuple
     """
-    if label not in COLOR_MAP:
-        # Generate random color and ensure it's visually distinct
-        color = (
-            random.randint(50, 255),
-            random.randint(50, 255),
-            random.randint(50, 255)
+    digest = hashlib.blake2b(str(label).encode("utf-8"), digest_size=3).digest()
+    return tuple(
+        MIN_COLOR_VALUE + value * (256 - MIN_COLOR_VALUE) // 256 for value in digest
+    )
+
+
+class ColorPalette:
+    """
+    Colors of all classes of a model, as an array indexed by class id.
+
+    Built once from the model's ``id2label``; each class gets ``get_color``
+    of its label, so the colors agree with drawing by label and between
+    processes.
+    """
+
+    def __init__(self, id2label: Mapping[int, str]):
+        """
+        Initialize the palette.
+
+        Args:
+            id2label: Mapping from class id to class name
+        """
+        size = max(id2label, default=-1) + 1
+        self.colors = np.zeros((size, 3), dtype=np.uint8)
+        for class_id, label in id2label.items():
+            self.colors[class_id] = get_color(label)
+
+    def __len__(self) -> int:
+        return len(self.colors)
+
+    def lookup(self, class_ids: np.ndarray) -> np.ndarray:
+        """
+        Look up the colors of many classes at once.
+
+        Args:
+            class_ids: Array of class ids
+
+        Returns:
+            Array of shape (len(class_ids), 3) with BGR colors
+        """
+        return self.colors[np.asarray(class_ids, dtype=np.intp)]
+
+
+# Palettes by id2label contents, and the last mapping looked up for a quick
+# identity check
+_PALETTES = {}
+_LAST_PALETTE = (None, None)
+
+
+def get_palette(id2label: Mapping[int, str]) -> ColorPalette:
+    """
+    Get the color palette of a model, building it on first use.
+
+    Args:
+        id2label: Mapping from class id to class name
+
+    Returns:
+        Palette shared by all callers with the same classes
+    """
+    global _LAST_PALETTE
+    last_mapping, palette = _LAST_PALETTE
+    if last_mapping is id2label:
+        return palette
+
+    key = tuple(sorted(id2label.items()))
+    palette = _PALETTES.get(key)
+    if palette is None:
+        palette = _PALETTES.setdefault(key, ColorPalette(id2label))
+    _LAST_PALETTE = (id2label, palette)
+    return palette
+
+
+def detection_colors(detections: Dict) -> np.ndarray:
+    """
+    Get the color of every detection at once.
+
+    Detections with class ids are looked up in the palette of their model;
+    for detections with only label strings, each label's color is used.
+
+    Args:
+        detections: Detection results from the model
+
+    Returns:
+        Array of shape (num_detections, 3) with BGR colors
+    """
+    class_ids = getattr(detections, "class_ids", None)
+    if class_ids is not None:
+        return get_palette(detections.id2label).lookup(class_ids)
+    return np.array(
+        [get_color(label) for label in detections["labels"]], dtype=np.uint8
+    ).reshape(-1, 3)
+
+
+def _blit(
+    image: np.ndarray, x: int, y: int, patch: np.ndarray, mask: Optional[np.ndarray]
+):
+    """
+    Copy a patch, or only its masked pixels, to an image at (x, y), clipped
+    to the image bounds.
+    """
+    height, width = patch.shape[:2]
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + width, image.shape[1]), min(y + height, image.shape[0])
+    if x0 >= x1 or y0 >= y1:
+        return
+
+    region = image[y0:y1, x0:x1]
+    window = (slice(y0 - y, y1 - y), slice(x0 - x, x1 - x))
+    if mask is None:
+        region[...] = patch[window]
+    else:
+        np.copyto(region, patch[window], where=mask[window][..., None])
+
+
+class LabelRenderer:
+    """
+    Draws detection labels from cached sprites instead of rasterizing text.
+
+    ``cv2.putText`` re-rasterizes every glyph of every label on every frame.
+    Here the background box with the ``"<label>: "`` text is rendered once
+    per label, color and width, and the score digits that follow it once per
+    score (there are only 101 two-decimal scores), after which drawing a
+    label is two numpy copies. The sprites are rendered with the same OpenCV
+    calls as before and cut where the digits begin, so the result is
+    pixel-identical, including OpenCV's sub-pixel glyph placement and
+    anti-aliasing.
+    """
+
+    def __init__(
+        self,
+        font_face: int = FONT_FACE,
+        font_scale: float = FONT_SCALE,
+        thickness: int = TEXT_THICKNESS,
+        text_color: Tuple[int, int, int] = TEXT_COLOR,
+        max_sprites: int = 4096,
+    ):
+        """
+        Initialize the renderer.
+
+        Args:
+            font_face: OpenCV font
+            font_scale: Font scale factor
+            thickness: Thickness of the text strokes
+            text_color: BGR color of the text
+            max_sprites: Maximum number of cached sprites of each kind; the
+                least recently used are dropped
+        """
+        self.font_face = font_face
+        self.font_scale = font_scale
+        self.thickness = thickness
+        self.text_color = text_color
+        self.max_sprites = max_sprites
+
+        self.text_height = cv2.getTextSize("0", font_face, font_scale, thickness)[0][1]
+        self._margin = self.text_height + 2 * thickness + 5
+
+        self._labels = OrderedDict()
+        self._sprites = OrderedDict()
+        self._lock = threading.Lock()
+
+    def draw(
+        self,
+        image: np.ndarray,
+        x: int,
+        y: int,
+        label: str,
+        score: float,
+        color: Tuple[int, int, int],
+    ):
+        """
+        Draw a label box with its bottom-left corner at (x, y), as a filled
+        ``cv2.rectangle`` with white ``cv2.putText`` text on it.
+
+        Args:
+            image: BGR image to draw on, modified in place
+            x: Left edge of the label box
+            y: Bottom edge of the label box
+            label: Class label
+            score: Confidence score, shown with two decimals
+            color: BGR background color
+        """
+        key = (label, color, f"{score:.2f}")
+        sprites = self._cached(self._sprites, key, lambda: self._render(*key))
+        for dx, dy, patch, mask in sprites:
+            _blit(image, x + dx, y + dy, patch, mask)
+
+    def _cached(self, cache: OrderedDict, key, render):
+        with self._lock:
+            value = cache.get(key)
+            if value is not None:
+                cache.move_to_end(key)
+                return value
+
+        value = render()
+        with self._lock:
+            cache[key] = value
+            while len(cache) > self.max_sprites:
+                cache.popitem(last=False)
+        return value
+
+    def _render_label(self, prefix: str, color: Tuple[int, int, int], text_width: int):
+        """
+        Render the background box of a label with the prefix text on it.
+
+        Returns:
+            Tuple of the canvas and its mask, with the box's bottom-left
+            corner at (margin, margin + text height + 5)
+        """
+        margin = self._margin
+        height = self.text_height
+        canvas = np.zeros(
+            (height + 5 + 2 * margin, text_width + 2 * margin, 3), dtype=np.uint8
+        )
+        mask = np.zeros(canvas.shape[:2], dtype=np.uint8)
+        self._draw_text(canvas, mask, prefix, color, text_width)
+        return canvas, mask
+
+    def _render(self, label: str, color: Tuple[int, int, int], digits: str):
+        """
+        Render the sprites of a label: the box with the label text, shared by
+        all scores of the same width, and the part of the box the digits change.
+
+        Returns:
+            List of (x, y, patch, mask) with the offset of each sprite from
+            the box's bottom-left corner; the mask is None where the patch
+            is copied whole
+        """
+        prefix = f"{label}: "
+        (text_width, _), _ = cv2.getTextSize(
+            prefix + digits, self.font_face, self.font_scale, self.thickness
         )
-        COLOR_MAP[label] = color
+        label_canvas, label_mask = self._cached(
+            self._labels,
+            (prefix, color, text_width),
+            lambda: self._render_label(prefix, color, text_width),
+        )
+
+        canvas = np.zeros_like(label_canvas)
+        mask = np.zeros_like(label_mask)
+        self._draw_text(canvas, mask, prefix + digits, color, text_width)
+
+        # Everything left of the first column the digits touch comes from the label
+        # sprite
+        changed = np.flatnonzero((canvas != label_canvas).any(axis=(0, 2)))
+        split = int(changed[0]) if len(changed) else canvas.shape[1]
+
+        origin_x, origin_y = self._margin, self._margin + self.text_height + 5
+        sprites = []
+        for x0, x1, source, source_mask in (
+            (0, split, label_canvas, label_mask),
+            (split, canvas.shape[1], canvas, mask),
+        ):
+            ys, xs = np.nonzero(source_mask[:, x0:x1])
+            if len(xs) == 0:
+                continue
+            left, right = x0 + int(xs.min()), x0 + int(xs.max()) + 1
+            top, bottom = int(ys.min()), int(ys.max()) + 1
+            patch_mask = source_mask[top:bottom, left:right] > 0
+            patch = source[top:bottom, left:right]
+            sprites.append(
+                (
+                    left - origin_x,
+                    top - origin_y,
+                    # The label part stays a view of the label canvas shared by all
+                    # scores
+                    patch if source is label_canvas else patch.copy(),
+                    None if patch_mask.all() else patch_mask,
+                )
+            )
+        return sprites
 
-    return COLOR_MAP[label]
+    def _draw_text(self, canvas, mask, text, color, text_width):
+        """
+        Draw a label box and its text the way draw_detections always has,
+        on a canvas and on a mask of the pixels drawn.
+        """
+        x, y = self._margin, self._margin + self.text_height + 5
+        for target, fill, text_fill in (
+            (canvas, color, self.text_color),
+            (mask, 255, 255),
+        ):
+            cv2.rectangle(
+                target, (x, y - self.text_height - 5), (x + text_width, y), fill, -1
+            )
+            cv2.putText(
+                target,
+                text,
+                (x, y - 5),
+                self.font_face,
+                self.font_scale,
+                text_fill,
+                self.thickness,
+            )
+
+
+# Renderer used by draw_detections
+_LABEL_RENDERER = LabelRenderer()
 
 
 def draw_detections(
-        image: np.ndarray,
-        detections: Dict,
-        confidence_threshold: float = 0.0
+    image: np.ndarray,
+    detections: Dict,
+    confidence_threshold: float = 0.0,
+    inplace: bool = False,
 ) -> np.ndarray:
     """
     Draw detection results on an image.
 
     Args:
-        image: Input image as numpy array (OpenCV format)
+        image: Input image as numpy array (OpenCV BGR format)
         detections: Detection results from the model
         confidence_threshold: Minimum confidence to display a detection
+        inplace: Draw on the input image itself instead of a copy. Saves a
+            full-frame copy when the caller doesn't need the original.
 
     Returns:
         Image with detections drawn on it
     """
     # Make a copy of the image to avoid modifying the original
-    img_with_detections = image.copy()
+    img_with_detections = image if inplace else image.copy()
 
     # Get detection data
-    boxes = detections["boxes"]
-    scores = detections["scores"]
+    scores = np.asarray(detections["scores"])
     labels = detections["labels"]
 
-    # Draw each detection that meets the confidence threshold
-    for box, score, label in zip(boxes, scores, labels):
-        if score < confidence_threshold:
-            continue
+    # Select the detections that meet the confidence threshold and convert
+    # their boxes to integers, all at once
+    keep = np.flatnonzero(scores >= confidence_threshold)
+    if len(keep) == 0:
+        return img_with_detections
+    corners = np.asarray(detections["boxes"])[keep].astype(int).tolist()
 
-        # Convert box coordinates to integers
-        x1, y1, x2, y2 = box.astype(int)
+    # Look up the colors of all classes in one go
+    colors = detection_colors(detections)[keep].tolist()
 
-        # Get color for this class
-        color = get_color(label)
+    for i, (x1, y1, x2, y2), color in zip(keep.tolist(), corners, colors):
+        label = labels[i]
+        color = tuple(color)
 
         # Draw bounding box
         cv2.rectangle(img_with_detections, (x1, y1), (x2, y2), color, BOX_THICKNESS)
 
-        # Create label text with class name and confidence score
-        text = f"{label}: {score:.2f}"
-
-        # Get text size to position it properly
-        (text_width, text_height), _ = cv2.getTextSize(
-            text, cv2.FONT_HERSHEY_SIMPLEX, FONT_SCALE, TEXT_THICKNESS
-        )
-
-        # Create a filled rectangle for the text background
-        cv2.rectangle(
-            img_with_detections,
-            (x1, y1 - text_height - 5),
-            (x1 + text_width, y1),
-            color,
-            -1  # Filled rectangle
-        )
-
-        # Add text with white color
-        cv2.putText(
-            img_with_detections,
-            text,
-            (x1, y1 - 5),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            FONT_SCALE,
-            (255, 255, 255),
-            TEXT_THICKNESS
-        )
+        # Draw the label with its confidence score from the cached sprites
+        _LABEL_RENDERER.draw(img_with_detections, x1, y1, label, scores[i], color)
 
     return img_with_detections
 
@@ -141,4 +419,4 @@ def show_image(image: np.ndarray, title: str = "Detection Result", wait: bool =
         # Wait for a key press
         cv2.waitKey(0)
         # Close all windows
-        cv2.destroyAllWindows()
\ No newline at end of file
+        cv2.destroyAllWindows()
@@ -0,0 +1,306 @@
+"""
+Background writing of annotated frames and detection logs.
+"""
+
+import json
+import os
+import queue
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from .encoding import IMAGE_FORMATS, encode_image
+from .results import detections_to_records
+
+# Marks the end of the stream on the writer queues
+_END_OF_STREAM = object()
+
+
+def next_sequence_number(output_dir: str, prefix: str) -> int:
+    """
+    Find the first sequence number not used by a file in a directory.
+
+    Args:
+        output_dir: Directory with files named ``<prefix>_<number>.<extension>``
+        prefix: File name prefix
+
+    Returns:
+        One more than the largest number found, or 1 if there is none
+    """
+    pattern = re.compile(rf"{re.escape(prefix)}_(\d+)\.\w+$")
+    try:
+        names = os.listdir(output_dir)
+    except OSError:
+        return 1
+    numbers = [int(match.group(1)) for match in map(pattern.match, names) if match]
+    return max(numbers, default=0) + 1
+
+
+class OutputWriter:
+    """
+    Writes annotated frames and detection logs on background threads.
+
+    ``write`` only hands a frame to a bounded queue; a pool of worker
+    threads encodes the images (``cv2.imencode`` releases the GIL) and
+    writes the files. When the workers fall behind and the queue is full,
+    the frame is dropped and counted instead of stalling the caller, unless
+    ``block`` is set.
+
+    Files are numbered in the order frames are written, continuing after
+    the numbers already in the directory, so no two frames overwrite each
+    other; the numbers of dropped frames are skipped.
+
+    Detection records are collected in memory and appended to the JSONL log
+    by a single thread, ``log_batch_size`` lines per write.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        prefix: str = "frame",
+        image_format: str = "jpeg",
+        quality: Optional[int] = None,
+        num_workers: int = 2,
+        queue_size: int = 32,
+        block: bool = False,
+        log_path: Optional[str] = None,
+        log_batch_size: int = 100,
+    ):
+        """
+        Initialize the writer and start its threads.
+
+        Args:
+            output_dir: Directory to write the images to, created on the
+                first write
+            prefix: File name prefix; files are named ``<prefix>_000001.jpg`` etc.
+            image_format: 'jpeg', 'png' or 'webp'
+            quality: Quality from 1 to 100 for JPEG and WebP; OpenCV's
+                default is used if not specified
+            num_workers: Number of threads encoding and writing images
+            queue_size: Maximum number of frames waiting to be written
+            block: Wait for room in the queue instead of dropping the frame
+            log_path: JSONL file to append the detections of every frame
+                to, or None for no log
+            log_batch_size: Number of records collected before they are
+                written to the log
+        """
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Unknown image format: {image_format!r}")
+        if quality is not None and not 1 <= quality <= 100:
+            raise ValueError(f"quality must be between 1 and 100, got {quality}")
+
+        self.output_dir = output_dir
+        self.prefix = prefix
+        self.image_format = image_format
+        self.quality = quality
+        self.block = block
+        self.log_path = log_path
+        self.log_batch_size = log_batch_size
+        self.extension = IMAGE_FORMATS[image_format][0]
+
+        self._sequence = next_sequence_number(output_dir, prefix)
+        self._frames = queue.Queue(maxsize=queue_size)
+        self._records = []
+        self._batches = queue.Queue()
+        self._lock = threading.Lock()
+        self._dir_created = False
+        self._closed = False
+        self._stats = {
+            "frames_queued": 0,
+            "frames_written": 0,
+            "frames_dropped": 0,
+            "write_errors": 0,
+            "bytes_written": 0,
+            "write_time": 0.0,
+            "max_queue_depth": 0,
+            "records_logged": 0,
+            "log_flushes": 0,
+        }
+        self.last_error = None
+
+        self._workers = [
+            threading.Thread(
+                target=self._write_frames, name=f"output-writer-{i}", daemon=True
+            )
+            for i in range(num_workers)
+        ]
+        if log_path is not None:
+            self._workers.append(
+                threading.Thread(
+                    target=self._write_logs, name="output-log", daemon=True
+                )
+            )
+        for worker in self._workers:
+            worker.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(
+        self,
+        frame: Optional[np.ndarray] = None,
+        detections: Optional[Dict] = None,
+        **fields,
+    ) -> Optional[str]:
+        """
+        Queue a frame to be saved and its detections to be logged.
+
+        The frame is written as it is when a worker gets to it, so it must
+        not be modified afterwards.
+
+        Args:
+            frame: Annotated image to save, or None to only log the detections
+            detections: Detection results to log, if the writer has a log
+            **fields: Further values to add to the log record
+
+        Returns:
+            Path the frame will be written to, or None if no frame was given
+            or it was dropped because the queue was full
+        """
+        path = None
+        if frame is not None:
+            with self._lock:
+                name = f"{self.prefix}_{self._sequence:06d}{self.extension}"
+                path = os.path.join(self.output_dir, name)
+                self._sequence += 1
+            try:
+                self._frames.put((path, frame), block=self.block)
+            except queue.Full:
+                path = None
+                with self._lock:
+                    self._stats["frames_dropped"] += 1
+            else:
+                with self._lock:
+                    self._stats["frames_queued"] += 1
+                    self._stats["max_queue_depth"] = max(
+                        self._stats["max_queue_depth"], self._frames.qsize()
+                    )
+
+        if self.log_path is not None and detections is not None:
+            self.log(detections, path=path, **fields)
+        return path
+
+    def log(self, detections: Dict, **fields):
+        """
+        Add the detections of a frame to the log.
+
+        Records are converted and written on the log thread once
+        ``log_batch_size`` of them have been collected.
+
+        Args:
+            detections: Detection results from the model
+            **fields: Further values to add to the record
+        """
+        if self.log_path is None:
+            raise RuntimeError("The writer has no log file")
+        fields["time"] = time.time()
+        with self._lock:
+            self._records.append((detections, fields))
+            if len(self._records) < self.log_batch_size:
+                return
+            batch, self._records = self._records, []
+        self._batches.put(batch)
+
+    def flush(self):
+        """
+        Hand the records collected so far to the log thread.
+        """
+        with self._lock:
+            batch, self._records = self._records, []
+        if batch:
+            self._batches.put(batch)
+
+    def stats(self) -> Dict:
+        """
+        Get the writer statistics.
+
+        Returns:
+            Dictionary with the numbers of frames queued, written and dropped
+            (queue full), write errors, bytes written, the total and mean
+            write time in seconds, the current and largest queue depth, and
+            the numbers of records logged and log writes
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queue_depth"] = self._frames.qsize()
+        stats["mean_write_time"] = (
+            stats["write_time"] / stats["frames_written"]
+            if stats["frames_written"]
+            else 0.0
+        )
+        return stats
+
+    def close(self):
+        """
+        Write everything still queued, flush the log and stop the threads.
+        """
+        if self._closed:
+            return
+        self._closed = True
+
+        for worker in self._workers:
+            if worker.name.startswith("output-writer"):
+                self._frames.put(_END_OF_STREAM)
+        if self.log_path is not None:
+            self.flush()
+            self._batches.put(_END_OF_STREAM)
+        for worker in self._workers:
+            worker.join()
+
+    def _write_frames(self):
+        """
+        Worker loop encoding and writing queued frames.
+        """
+        while True:
+            item = self._frames.get()
+            if item is _END_OF_STREAM:
+                return
+            path, frame = item
+
+            start_time = time.perf_counter()
+            try:
+                data, _ = encode_image(frame, self.image_format, self.quality)
+                self._ensure_output_dir()
+                with open(path, "wb") as f:
+                    f.write(data)
+            except Exception as e:
+                with self._lock:
+                    self._stats["write_errors"] += 1
+                    self.last_error = f"{path}: {e}"
+                continue
+
+            with self._lock:
+                self._stats["frames_written"] += 1
+                self._stats["bytes_written"] += len(data)
+                self._stats["write_time"] += time.perf_counter() - start_time
+
+    def _write_logs(self):
+        """
+        Worker loop appending batches of records to the log in order.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+        with open(self.log_path, "a") as f:
+            while True:
+                batch = self._batches.get()
+                if batch is _END_OF_STREAM:
+                    return
+                lines = [
+                    json.dumps({**fields, "detections": detections_to_records(dets)})
+                    for dets, fields in batch
+                ]
+                f.write("\n".join(lines) + "\n")
+                f.flush()
+                with self._lock:
+                    self._stats["records_logged"] += len(lines)
+                    self._stats["log_flushes"] += 1
+
+    def _ensure_output_dir(self):
+        if not self._dir_created:
+            os.makedirs(self.output_dir, exist_ok=True)
+            self._dir_created = True
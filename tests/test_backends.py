@@ -0,0 +1,122 @@
+"""
+Tests for the backends module.
+"""
+
+import importlib.util
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Add the parent directory to the Python path to import our package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.detr_vision.backends import export_model
+from src.detr_vision.model import DetrObjectDetector
+from tests.tiny_detr import TinyDetrTestCase
+
+HAS_ONNXRUNTIME = importlib.util.find_spec("onnxruntime") is not None
+
+
+class TestBackends(TinyDetrTestCase):
+    """
+    Test cases for running the detector on each backend, using a tiny offline model.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        # Images of different sizes, so batches are padded
+        rng = np.random.default_rng(0)
+        cls.images = [
+            rng.integers(0, 256, size=(48, 64, 3), dtype=np.uint8),
+            rng.integers(0, 256, size=(90, 40, 3), dtype=np.uint8),
+            Image.fromarray(rng.integers(0, 256, size=(64, 64, 3), dtype=np.uint8)),
+        ]
+        # Padding changes the results slightly, so batched and single results
+        # are compared separately
+        cls.expected = cls.detector.detect_batch_raw(cls.images, batch_size=3) + [
+            cls.detector.detect_raw(image) for image in cls.images
+        ]
+
+    def assert_matches_reference(self, detector):
+        results = detector.detect_batch_raw(self.images, batch_size=3) + [
+            detector.detect_raw(image) for image in self.images
+        ]
+        for raw, expected in zip(results, self.expected):
+            np.testing.assert_array_equal(raw.class_ids, expected.class_ids)
+            np.testing.assert_allclose(raw.scores, expected.scores, atol=1e-5)
+            np.testing.assert_allclose(raw.boxes, expected.boxes, atol=1e-3)
+
+    def test_eager(self):
+        self.assertEqual(self.detector.backend.name, "eager")
+        self.assert_matches_reference(self.detector)
+
+    def test_compile(self):
+        # The eager torch.compile backend checks the graph capture without
+        # paying for code generation
+        detector = DetrObjectDetector(
+            model_name=self.model_dir,
+            device="cpu",
+            backend="compile",
+            backend_options={"backend": "eager"},
+        )
+        self.assert_matches_reference(detector)
+
+    def test_torchscript(self):
+        detector = DetrObjectDetector(
+            model_name=self.model_dir, device="cpu", backend="torchscript"
+        )
+        self.assert_matches_reference(detector)
+
+    def test_torchscript_export(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = export_model(
+                self.detector.model,
+                os.path.join(directory, "model.pt"),
+                "torchscript",
+                image_size=(64, 96),
+            )
+            detector = DetrObjectDetector(
+                model_name=self.model_dir,
+                device="cpu",
+                backend="torchscript",
+                backend_path=path,
+            )
+            self.assert_matches_reference(detector)
+
+    @unittest.skipUnless(HAS_ONNXRUNTIME, "onnxruntime is not installed")
+    def test_onnxruntime_export(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = export_model(
+                self.detector.model,
+                os.path.join(directory, "model.onnx"),
+                "onnx",
+                image_size=(64, 96),
+            )
+            detector = DetrObjectDetector(
+                model_name=self.model_dir,
+                device="cpu",
+                backend="onnxruntime",
+                backend_path=path,
+            )
+            self.assert_matches_reference(detector)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            DetrObjectDetector(model_name=self.model_dir, backend="tensorrt")
+        with self.assertRaises(ValueError):
+            DetrObjectDetector(
+                model_name=self.model_dir, backend="torchscript", precision="bf16"
+            )
+        with self.assertRaises(ValueError):
+            export_model(self.detector.model, "model.trt", "tensorrt")
+
+
+if __name__ == "__main__":
+    unittest.main()
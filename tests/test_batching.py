@@ -0,0 +1,189 @@
+"""
+Tests for the batching module.
+"""
+
+import io
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add the parent directory to the Python path to import our package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.detr_vision.batching import BatchScheduler, QueueFullError
+from src.detr_vision.results import Detections
+
+
+class FakeDetector:
+    """
+    Stand-in for DetrObjectDetector that records the batches it receives.
+    """
+
+    def __init__(self):
+        self.batch_sizes = []
+        self.thresholds = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def detect_batch(self, images, threshold=0.7, batch_size=8):
+        self.release.wait()
+        self.batch_sizes.append(len(images))
+        self.thresholds.append(threshold)
+        # One detection per image, scored by the image's fill value
+        return [
+            Detections(
+                boxes=np.array([[0, 0, 1, 1], [0, 0, 2, 2]], dtype=np.float32),
+                scores=np.array(
+                    [np.asarray(image).flat[0] / 10, 0.95], dtype=np.float32
+                ),
+                class_ids=np.array([0, 1]),
+                id2label={0: "a", 1: "b"},
+            )
+            for image in images
+        ]
+
+
+class TestBatchScheduler(unittest.TestCase):
+    """
+    Test cases for the BatchScheduler class.
+    """
+
+    def setUp(self):
+        self.detector = FakeDetector()
+
+    def test_coalesces_concurrent_requests(self):
+        """
+        Test that requests waiting together are run as one batch.
+        """
+        scheduler = BatchScheduler(self.detector, max_batch_size=4, max_wait_ms=1000)
+        # Hold the worker so all requests are queued before the batch is built
+        self.detector.release.clear()
+        with scheduler:
+            first = scheduler.submit(
+                np.full((2, 2, 3), 1, dtype=np.uint8), threshold=0.0
+            )
+            futures = [
+                scheduler.submit(np.full((2, 2, 3), i, dtype=np.uint8), threshold=0.0)
+                for i in range(4)
+            ]
+            self.detector.release.set()
+            results = [f.result(timeout=5) for f in [first] + futures]
+
+        self.assertEqual(self.detector.batch_sizes, [4, 1])
+        self.assertAlmostEqual(float(results[3]["scores"][0]), 0.2, places=5)
+        self.assertEqual(scheduler.num_requests, 5)
+
+    def test_per_request_threshold(self):
+        """
+        Test that each caller gets results filtered at its own threshold.
+        """
+        self.detector.release.clear()
+        with BatchScheduler(
+            self.detector, max_batch_size=2, max_wait_ms=1000
+        ) as scheduler:
+            low = scheduler.submit(np.full((2, 2, 3), 5, dtype=np.uint8), threshold=0.1)
+            high = scheduler.submit(
+                np.full((2, 2, 3), 5, dtype=np.uint8), threshold=0.9
+            )
+            self.detector.release.set()
+            low_result, high_result = low.result(timeout=5), high.result(timeout=5)
+
+        self.assertEqual(low_result["labels"], ["a", "b"])
+        self.assertEqual(high_result["labels"], ["b"])
+        self.assertEqual(len(high_result["boxes"]), 1)
+
+    def test_queue_full(self):
+        """
+        Test that submitting to a full queue raises QueueFullError.
+        """
+        self.detector.release.clear()
+        scheduler = BatchScheduler(
+            self.detector, max_batch_size=1, max_wait_ms=0, max_queue_size=1
+        )
+        try:
+            image = np.zeros((2, 2, 3), dtype=np.uint8)
+            futures = [scheduler.submit(image)]
+            # Wait until the worker has taken the first request off the queue
+            while not futures[0].running():
+                threading.Event().wait(0.001)
+            futures.append(scheduler.submit(image))
+            with self.assertRaises(QueueFullError):
+                scheduler.submit(image)
+        finally:
+            self.detector.release.set()
+            scheduler.close()
+
+        for future in futures:
+            self.assertIn("boxes", future.result(timeout=5))
+
+    def test_detector_errors_propagate(self):
+        def fail(*args, **kwargs):
+            raise RuntimeError("boom")
+
+        self.detector.detect_batch = fail
+        with BatchScheduler(self.detector) as scheduler:
+            with self.assertRaises(RuntimeError):
+                scheduler.detect(np.zeros((2, 2, 3), dtype=np.uint8), timeout=5)
+
+    def test_invalid_settings(self):
+        with self.assertRaises(ValueError):
+            BatchScheduler(self.detector, max_batch_size=0)
+        with self.assertRaises(ValueError):
+            BatchScheduler(self.detector, max_queue_size=0)
+
+
+class TestDetectEndpoint(unittest.TestCase):
+    """
+    Test cases for backpressure on the /detect endpoint.
+    """
+
+    def setUp(self):
+        from PIL import Image
+
+        import app as app_module
+
+        self.app_module = app_module
+        self.client = app_module.app.test_client()
+
+        buffer = io.BytesIO()
+        Image.new("RGB", (4, 4), color="black").save(buffer, format="PNG")
+        self.image_bytes = buffer.getvalue()
+
+    def tearDown(self):
+        self.app_module.scheduler = None
+
+    def test_queue_full_returns_503(self):
+        class FullScheduler:
+            def detect(self, image, threshold=0.7, timeout=None):
+                raise QueueFullError("full")
+
+        self.app_module.scheduler = FullScheduler()
+        response = self.client.post(
+            "/detect", data={"image": (io.BytesIO(self.image_bytes), "test.png")}
+        )
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers["Retry-After"], "1")
+
+    def test_detect_uses_scheduler(self):
+        self.app_module.scheduler = BatchScheduler(FakeDetector())
+        try:
+            response = self.client.post(
+                "/detect",
+                data={
+                    "image": (io.BytesIO(self.image_bytes), "test.png"),
+                    "threshold": "0.5",
+                },
+            )
+        finally:
+            self.app_module.scheduler.close()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([d["label"] for d in response.get_json()["detections"]], ["b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
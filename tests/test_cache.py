@@ -0,0 +1,167 @@
+"""
+Tests for the cache module.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Add the parent directory to the Python path to import our package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.detr_vision.cache import DetectionCache, content_key
+from src.detr_vision.model import DetrObjectDetector
+from tests.tiny_detr import TinyDetrTestCase
+
+
+def make_detections(n: int) -> dict:
+    return {
+        "boxes": np.arange(n * 4, dtype=np.float32).reshape(n, 4),
+        "scores": np.linspace(0.1, 0.9, n, dtype=np.float32),
+        "labels": [f"label_{i}" for i in range(n)],
+    }
+
+
+class TestContentKey(unittest.TestCase):
+    """
+    Test cases for the content_key function.
+    """
+
+    def test_same_content_same_key(self):
+        a = np.zeros((4, 4, 3), dtype=np.uint8)
+        self.assertEqual(content_key(a, "m"), content_key(a.copy(), "m"))
+
+    def test_different_content_or_model(self):
+        a = np.zeros((4, 4, 3), dtype=np.uint8)
+        b = a.copy()
+        b[0, 0, 0] = 1
+        self.assertNotEqual(content_key(a, "m"), content_key(b, "m"))
+        self.assertNotEqual(content_key(a, "m"), content_key(a, "other"))
+        # Same bytes with a different shape are different images
+        self.assertNotEqual(content_key(a, "m"), content_key(a.reshape(2, 8, 3), "m"))
+
+    def test_pil_and_bytes(self):
+        image = Image.new("RGB", (4, 4), color="red")
+        self.assertEqual(content_key(image, "m"), content_key(image.copy(), "m"))
+        self.assertEqual(content_key(b"abc", "m"), content_key(b"abc", "m"))
+
+
+class TestDetectionCache(unittest.TestCase):
+    """
+    Test cases for the DetectionCache class.
+    """
+
+    def test_hit_and_miss_counters(self):
+        cache = DetectionCache()
+        self.assertIsNone(cache.get("a"))
+        cache.put("a", make_detections(3))
+        result = cache.get("a")
+
+        np.testing.assert_array_equal(result["boxes"], make_detections(3)["boxes"])
+        self.assertEqual(result["labels"], make_detections(3)["labels"])
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    def test_lru_entry_limit(self):
+        cache = DetectionCache(max_entries=2)
+        cache.put("a", make_detections(1))
+        cache.put("b", make_detections(1))
+        cache.get("a")  # "b" is now least recently used
+        cache.put("c", make_detections(1))
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_byte_limit(self):
+        entry_bytes = 10 * 16 + 10 * 4 + sum(len(f"label_{i}") + 64 for i in range(10))
+        cache = DetectionCache(max_bytes=entry_bytes * 2)
+        for key in "abc":
+            cache.put(key, make_detections(10))
+
+        self.assertEqual(len(cache), 2)
+        self.assertLessEqual(cache.stats()["bytes"], entry_bytes * 2)
+
+    def test_cached_arrays_are_read_only(self):
+        cache = DetectionCache()
+        cache.put("a", make_detections(2))
+        with self.assertRaises(ValueError):
+            cache.get("a")["boxes"][0, 0] = 5
+
+    def test_disk_tier(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache", "detections.sqlite")
+            cache = DetectionCache(disk_path=path)
+            cache.put("a", make_detections(3))
+            cache.close()
+
+            # A new cache (e.g. after a restart) finds the entry on disk
+            cache = DetectionCache(disk_path=path)
+            result = cache.get("a")
+            cache.close()
+
+        self.assertIsNotNone(result)
+        np.testing.assert_array_equal(result["scores"], make_detections(3)["scores"])
+        self.assertEqual(result["labels"], make_detections(3)["labels"])
+        self.assertEqual(cache.stats()["disk_hits"], 1)
+
+
+class TestDetectorCache(TinyDetrTestCase):
+    """
+    Test cases for using a DetectionCache with DetrObjectDetector.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.uncached = cls.detector
+
+    def setUp(self):
+        self.detector = DetrObjectDetector(
+            model_name=self.model_dir, device="cpu", cache=DetectionCache()
+        )
+        rng = np.random.default_rng(0)
+        self.image = rng.integers(0, 256, size=(40, 60, 3), dtype=np.uint8)
+
+    def test_repeat_request_at_any_threshold(self):
+        """
+        Test that cached results match uncached ones at every threshold.
+        """
+        scores = self.uncached.detect(self.image, threshold=0.0)["scores"]
+        thresholds = [0.0, float(np.median(scores)), 0.99]
+
+        for threshold in thresholds:
+            cached = self.detector.detect(self.image, threshold=threshold)
+            expected = self.uncached.detect(self.image, threshold=threshold)
+            np.testing.assert_allclose(cached["scores"], expected["scores"], rtol=1e-6)
+            np.testing.assert_allclose(cached["boxes"], expected["boxes"], rtol=1e-6)
+            self.assertEqual(cached["labels"], expected["labels"])
+
+        stats = self.detector.cache.stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hits"], len(thresholds) - 1)
+
+    def test_detect_batch_skips_cached_images(self):
+        other = self.image[::-1].copy()
+        self.detector.detect(self.image, threshold=0.5)
+
+        results = self.detector.detect_batch(
+            [self.image, other, self.image], threshold=0.0
+        )
+
+        self.assertEqual(len(results), 3)
+        np.testing.assert_allclose(results[0]["scores"], results[2]["scores"])
+        stats = self.detector.cache.stats()
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["misses"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+"""
+Tests for the camera module.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add the parent directory to the Python path to import our package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.detr_vision.camera import Camera, SyntheticFrameSource, ThreadedCamera
+
+
+def frame_index(frame: np.ndarray) -> int:
+    return int(frame[0, 0, 0])
+
+
+class TestSyntheticFrameSource(unittest.TestCase):
+    """
+    Test cases for the SyntheticFrameSource class.
+    """
+
+    def test_camera_stream(self):
+        source = SyntheticFrameSource(num_frames=5)
+        with Camera(source, width=64, height=48) as camera:
+            frames = list(camera.stream())
+
+        self.assertEqual(len(frames), 5)
+        self.assertEqual(frames[0].shape, (48, 64, 3))
+        self.assertEqual([frame_index(f) for f in frames], list(range(5)))
+
+    def test_fps_pacing(self):
+        source = SyntheticFrameSource(width=8, height=8, num_frames=6, fps=100)
+        start = time.monotonic()
+        while source.read()[0]:
+            pass
+        self.assertGreaterEqual(time.monotonic() - start, 0.045)
+
+
+class TestThreadedCamera(unittest.TestCase):
+    """
+    Test cases for the ThreadedCamera class.
+    """
+
+    def test_latest_is_non_blocking_and_fresh(self):
+        source = SyntheticFrameSource(width=16, height=16, fps=200)
+        with ThreadedCamera(source) as camera:
+            first = camera.latest()
+            self.assertIsNotNone(first)
+            time.sleep(0.1)
+            second = camera.latest()
+
+            self.assertGreater(second.seq, first.seq)
+            self.assertGreater(second.timestamp, first.timestamp)
+            self.assertEqual(frame_index(second.image), (second.seq - 1) % 256)
+            # Frames grabbed while we slept were never read
+            self.assertGreater(camera.stats()["frames_dropped"], 0)
+
+    def test_read_returns_increasing_frames_until_end(self):
+        source = SyntheticFrameSource(width=16, height=16, num_frames=20)
+        with ThreadedCamera(source, buffer_size=32) as camera:
+            frames = list(camera.stream())
+            stats = camera.stats()
+
+        # With a buffer larger than the source nothing is dropped
+        self.assertEqual([frame_index(f) for f in frames], list(range(20)))
+        self.assertEqual(stats, {"frames_grabbed": 20, "frames_dropped": 0})
+
+    def test_small_buffer_drops_stale_frames(self):
+        source = SyntheticFrameSource(width=16, height=16, num_frames=50)
+        with ThreadedCamera(source, buffer_size=1) as camera:
+            frames = []
+            while True:
+                success, frame = camera.read(timeout=1)
+                if not success:
+                    break
+                frames.append(frame_index(frame))
+                time.sleep(0.005)
+            stats = camera.stats()
+
+        self.assertEqual(frames, sorted(frames))
+        self.assertEqual(stats["frames_grabbed"], 50)
+        self.assertEqual(stats["frames_dropped"], 50 - len(frames))
+
+    def test_warmup_timeout(self):
+        class SilentSource(SyntheticFrameSource):
+            def read(self):
+                time.sleep(0.01)
+                return False, None
+
+        with self.assertRaises(RuntimeError):
+            ThreadedCamera(SilentSource(), warmup_timeout=0.5).open()
+
+    def test_video_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "video.avi")
+            writer = cv2.VideoWriter(
+                path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (32, 24)
+            )
+            for i in range(8):
+                writer.write(np.full((24, 32, 3), 30 * i, dtype=np.uint8))
+            writer.release()
+
+            with ThreadedCamera(path, buffer_size=8) as camera:
+                frames = list(camera.stream())
+
+        self.assertEqual(len(frames), 8)
+        self.assertEqual(frames[0].shape, (24, 32, 3))
+
+    def test_read_requires_open(self):
+        with self.assertRaises(RuntimeError):
+            ThreadedCamera(SyntheticFrameSource()).read()
+
+
+if __name__ == "__main__":
+    unittest.main()
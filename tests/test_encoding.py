@@ -0,0 +1,175 @@
+"""
+Tests for the encoding module.
+"""
+
+import io
+import sys
+import unittest
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add the parent directory to the Python path to import our package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.detr_vision.encoding import encode_image, pack_detections, unpack_detections
+from src.detr_vision.results import Detections
+
+
+def sample_detections():
+    return Detections(
+        boxes=np.array([[1, 2, 30, 40], [5.5, 6, 7, 8]], dtype=np.float32),
+        scores=np.array([0.9, 0.75], dtype=np.float32),
+        class_ids=np.array([3, 17]),
+        id2label={3: "car", 17: "cat", 20: "dog"},
+    )
+
+
+class FixedScheduler:
+    """
+    Stand-in scheduler returning the same detections for every image.
+    """
+
+    def detect(self, image, threshold=0.7, timeout=None):
+        return sample_detections()
+
+
+class TestEncodeImage(unittest.TestCase):
+    """
+    Test cases for encoding response images.
+    """
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.image = rng.integers(0, 256, size=(32, 48, 3), dtype=np.uint8)
+
+    def test_formats(self):
+        for image_format, mimetype in [
+            ("jpeg", "image/jpeg"),
+            ("png", "image/png"),
+            ("webp", "image/webp"),
+        ]:
+            with self.subTest(image_format=image_format):
+                data, result_mimetype = encode_image(self.image, image_format)
+                self.assertEqual(result_mimetype, mimetype)
+                decoded = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+                self.assertEqual(decoded.shape, self.image.shape)
+
+        data, _ = encode_image(self.image, "png")
+        decoded = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        np.testing.assert_array_equal(decoded, self.image)
+
+    def test_quality(self):
+        low, _ = encode_image(self.image, "jpeg", quality=10)
+        high, _ = encode_image(self.image, "jpeg", quality=95)
+        self.assertLess(len(low), len(high))
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            encode_image(self.image, "gif")
+        with self.assertRaises(ValueError):
+            encode_image(self.image, "jpeg", quality=0)
+
+
+class TestPackDetections(unittest.TestCase):
+    """
+    Test cases for the binary detection format.
+    """
+
+    def test_round_trip(self):
+        detections = sample_detections()
+        data = pack_detections(detections)
+        unpacked = unpack_detections(data)
+
+        np.testing.assert_array_equal(unpacked.boxes, detections.boxes)
+        np.testing.assert_array_equal(unpacked.scores, detections.scores)
+        np.testing.assert_array_equal(unpacked.class_ids, detections.class_ids)
+        self.assertEqual(unpacked.labels, ["car", "cat"])
+        self.assertEqual(unpacked.id2label, {3: "car", 17: "cat"})
+        self.assertLess(len(data), len(detections.to_json()))
+
+    def test_dictionary_detections(self):
+        data = pack_detections(
+            {"boxes": [[0, 0, 1, 1]], "scores": [0.5], "labels": ["cat"]}
+        )
+        unpacked = unpack_detections(data)
+        self.assertEqual(unpacked.labels, ["cat"])
+        np.testing.assert_array_equal(unpacked.boxes, [[0, 0, 1, 1]])
+
+    def test_empty(self):
+        detections = sample_detections().filter(threshold=1.0)
+        unpacked = unpack_detections(pack_detections(detections))
+        self.assertEqual(len(unpacked), 0)
+        self.assertEqual(unpacked.boxes.shape, (0, 4))
+
+    def test_rejects_other_data(self):
+        with self.assertRaises(ValueError):
+            unpack_detections(b"\x89PNG\r\n\x1a\n")
+
+
+class TestDetectFormats(unittest.TestCase):
+    """
+    Test cases for the response formats of the /detect endpoint.
+    """
+
+    def setUp(self):
+        import app as app_module
+
+        self.app_module = app_module
+        self.app_module.scheduler = FixedScheduler()
+        self.client = app_module.app.test_client()
+
+        _, buffer = cv2.imencode(".png", np.zeros((40, 60, 3), dtype=np.uint8))
+        self.image_bytes = buffer.tobytes()
+
+    def tearDown(self):
+        self.app_module.scheduler = None
+
+    def post(self, **params):
+        data = {"image": (io.BytesIO(self.image_bytes), "test.png")}
+        data.update(params)
+        return self.client.post("/detect", data=data)
+
+    def test_full(self):
+        response = self.post()
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertTrue(data["image"].startswith("data:image/jpeg;base64,"))
+        self.assertEqual(len(data["detections"]), 2)
+
+        data = self.post(image_format="webp").get_json()
+        self.assertTrue(data["image"].startswith("data:image/webp;base64,"))
+
+    def test_json(self):
+        response = self.post(format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.get_json(), {"detections": sample_detections().to_records()}
+        )
+
+    def test_image(self):
+        response = self.client.post(
+            "/detect?format=image&image_format=png",
+            data={"image": (io.BytesIO(self.image_bytes), "test.png")},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "image/png")
+        self.assertEqual(response.headers["X-Detection-Count"], "2")
+        image = cv2.imdecode(np.frombuffer(response.data, np.uint8), cv2.IMREAD_COLOR)
+        self.assertEqual(image.shape, (40, 60, 3))
+
+    def test_binary(self):
+        response = self.post(format="binary")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "application/octet-stream")
+        self.assertEqual(unpack_detections(response.data).labels, ["car", "cat"])
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.post(format="xml").status_code, 400)
+        self.assertEqual(self.post(image_format="gif").status_code, 400)
+        self.assertEqual(self.post(quality="101").status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
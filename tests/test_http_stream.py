@@ -0,0 +1,217 @@
+"""
+Tests for the http_stream module.
+"""
+
+import io
+import json
+import sys
+import time
+import unittest
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add the parent directory to the Python path to import our package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.detr_vision.http_stream import (
+    JpegStreamReader,
+    PacedSource,
+    detection_events,
+    encode_event,
+    find_jpeg,
+    mjpeg_frames,
+)
+from src.detr_vision.results import Detections
+from src.detr_vision.streaming import DetectionPipeline
+
+
+def encode_jpeg(value, size=(24, 32)):
+    frame = np.full((*size, 3), value, dtype=np.uint8)
+    return cv2.imencode(".jpg", frame)[1].tobytes()
+
+
+def with_thumbnail(jpeg):
+    """
+    Insert an APP1 segment holding a complete JPEG, like an EXIF thumbnail.
+    """
+    payload = b"Exif\x00\x00" + encode_jpeg(200, (8, 8))
+    segment = b"\xff\xe1" + (len(payload) + 2).to_bytes(2, "big") + payload
+    return jpeg[:2] + segment + jpeg[2:]
+
+
+class FrameListSource:
+    """
+    Frame source returning a fixed list of frames.
+    """
+
+    def __init__(self, frames, interval=0.0):
+        self.frames = list(frames)
+        self.interval = interval
+
+    def read(self):
+        if not self.frames:
+            return False, None
+        time.sleep(self.interval)
+        return True, self.frames.pop(0)
+
+
+class BoxDetector:
+    """
+    Stand-in detector returning one box per frame.
+    """
+
+    def detect(self, image, threshold=0.7):
+        return Detections([[1, 2, 3, 4]], [0.9], [0], {0: "thing"})
+
+
+class TestFindJpeg(unittest.TestCase):
+    """
+    Test cases for locating JPEG images in a byte stream.
+    """
+
+    def test_complete_image(self):
+        jpeg = encode_jpeg(100)
+        buffer = bytearray(b"junk" + jpeg + b"next")
+        self.assertEqual(find_jpeg(buffer), (4, 4 + len(jpeg)))
+
+    def test_incomplete_image(self):
+        jpeg = encode_jpeg(100)
+        self.assertEqual(find_jpeg(bytearray(jpeg[:-1])), (0, None))
+        self.assertEqual(find_jpeg(bytearray(jpeg[: len(jpeg) // 2])), (0, None))
+        self.assertEqual(find_jpeg(bytearray(b"no image")), (-1, None))
+
+    def test_embedded_thumbnail(self):
+        jpeg = with_thumbnail(encode_jpeg(100))
+        self.assertEqual(find_jpeg(bytearray(jpeg)), (0, len(jpeg)))
+
+    def test_corrupt_image(self):
+        self.assertEqual(find_jpeg(bytearray(b"\xff\xd8garbage")), (0, -1))
+
+
+class TestJpegStreamReader(unittest.TestCase):
+    """
+    Test cases for reading frames from a stream of JPEG images.
+    """
+
+    def read_all(self, reader):
+        frames = []
+        while True:
+            success, frame = reader.read()
+            if not success:
+                return frames
+            frames.append(frame)
+
+    def test_concatenated_images(self):
+        data = b"".join(encode_jpeg(v) for v in (10, 120, 240))
+        reader = JpegStreamReader(io.BytesIO(data), chunk_size=100)
+        frames = self.read_all(reader)
+        self.assertEqual(len(frames), 3)
+        for frame, value in zip(frames, (10, 120, 240)):
+            self.assertEqual(frame.shape, (24, 32, 3))
+            self.assertLess(abs(int(frame[12, 16, 0]) - value), 4)
+
+    def test_multipart_stream(self):
+        parts = [
+            b"--frame\r\nContent-Type: image/jpeg\r\n\r\n"
+            + with_thumbnail(encode_jpeg(v))
+            + b"\r\n"
+            for v in (50, 150)
+        ]
+        reader = JpegStreamReader(io.BytesIO(b"".join(parts)), chunk_size=64)
+        self.assertEqual(len(self.read_all(reader)), 2)
+
+    def test_skips_corrupt_images(self):
+        data = b"\xff\xd8broken" + encode_jpeg(80)
+        reader = JpegStreamReader(io.BytesIO(data))
+        self.assertEqual(len(self.read_all(reader)), 1)
+        self.assertEqual(reader.corrupt_frames, 1)
+
+    def test_frame_size_limit(self):
+        noise = np.random.default_rng(0).integers(0, 256, (64, 64, 3), dtype=np.uint8)
+        data = cv2.imencode(".jpg", noise)[1].tobytes() + encode_jpeg(90)
+        reader = JpegStreamReader(io.BytesIO(data), chunk_size=64, max_frame_bytes=1000)
+        frames = self.read_all(reader)
+        self.assertEqual(len(frames), 1)
+        self.assertEqual(frames[0].shape, (24, 32, 3))
+
+
+class TestPacedSource(unittest.TestCase):
+    """
+    Test cases for pacing a source to a frame rate.
+    """
+
+    def test_frame_rate(self):
+        source = PacedSource(FrameListSource([None] * 5), fps=50)
+        start = time.monotonic()
+        for _ in range(5):
+            source.read()
+        self.assertGreaterEqual(time.monotonic() - start, 4 / 50 - 0.005)
+
+
+class TestStreams(unittest.TestCase):
+    """
+    Test cases for the event and MJPEG response streams.
+    """
+
+    def test_encode_event(self):
+        self.assertEqual(encode_event({"frame": 1}), b'{"frame":1}\n')
+        self.assertEqual(
+            encode_event({"frame": 1}, "sse"),
+            b'event: detections\ndata: {"frame":1}\n\n',
+        )
+        self.assertTrue(
+            encode_event({"error": "x"}, "sse").startswith(b"event: error\n")
+        )
+
+    def test_detection_events(self):
+        frames = [np.full((8, 8, 3), i, dtype=np.uint8) for i in range(5)]
+        with DetectionPipeline(
+            FrameListSource(frames, 0.01), BoxDetector()
+        ) as pipeline:
+            events = [json.loads(line) for line in detection_events(pipeline)]
+
+        self.assertGreater(len(events), 0)
+        self.assertEqual(events[-1]["frame"], 5)
+        self.assertEqual(
+            events[-1]["detections"],
+            [
+                {
+                    "label": "thing",
+                    "confidence": 0.8999999761581421,
+                    "box": [1.0, 2.0, 3.0, 4.0],
+                }
+            ],
+        )
+        self.assertIn("latency_ms", events[-1])
+
+    def test_detection_events_report_errors(self):
+        class FailingDetector:
+            def detect(self, image, threshold=0.7):
+                raise ValueError("boom")
+
+        frames = [np.zeros((8, 8, 3), dtype=np.uint8)]
+        with DetectionPipeline(FrameListSource(frames), FailingDetector()) as pipeline:
+            events = list(detection_events(pipeline, "sse"))
+
+        self.assertEqual(events, [b'event: error\ndata: {"error":"boom"}\n\n'])
+
+    def test_mjpeg_frames(self):
+        frames = [np.full((16, 16, 3), i, dtype=np.uint8) for i in range(3)]
+        with DetectionPipeline(
+            FrameListSource(frames, 0.02), BoxDetector()
+        ) as pipeline:
+            parts = list(mjpeg_frames(pipeline, max_fps=200))
+
+        self.assertGreater(len(parts), 0)
+        for part in parts:
+            self.assertTrue(part.startswith(b"--frame\r\nContent-Type: image/jpeg\r\n"))
+            image = part.split(b"\r\n\r\n", 1)[1][:-2]
+            self.assertIsNotNone(
+                cv2.imdecode(np.frombuffer(image, np.uint8), cv2.IMREAD_COLOR)
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,17 +1,26 @@
 """
 Tests for the model module.
 """
-import unittest
-import numpy as np
-from PIL import Image
+
+import copy
+import importlib.util
 import os
 import sys
+import unittest
+import warnings
 from pathlib import Path
+from unittest import mock
+
+import numpy as np
+from PIL import Image
 
 # Add the parent directory to the Python path to import our package
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.detr_vision.model import DetrObjectDetector
+from tests.tiny_detr import TinyDetrTestCase
+
+HAS_TORCHAO = importlib.util.find_spec("torchao") is not None
 
 
 class TestDetrObjectDetector(unittest.TestCase):
@@ -24,7 +33,7 @@ class TestDetrObjectDetector(unittest.TestCase):
         Set up test fixtures.
         """
         # Create a tiny test image (3x3 pixels)
-        self.test_image = Image.new('RGB', (3, 3), color='red')
+        self.test_image = Image.new("RGB", (3, 3), color="red")
 
         # Convert to numpy array (OpenCV format)
         self.test_image_cv = np.array(self.test_image)
@@ -76,5 +85,230 @@ class TestDetrObjectDetector(unittest.TestCase):
             self.fail(f"Detection on OpenCV image raised exception: {e}")
 
 
+class TestDetectBatch(TinyDetrTestCase):
+    """
+    Test cases for batched detection, using a tiny offline model.
+    """
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.images = [
+            rng.integers(0, 256, size=(48, 64, 3), dtype=np.uint8) for _ in range(5)
+        ]
+        # Mix numpy (BGR) and PIL (RGB) inputs
+        self.images[1] = Image.fromarray(self.images[1][:, :, ::-1])
+        self.images[3] = Image.fromarray(self.images[3][:, :, ::-1])
+
+    def test_batch_matches_single(self):
+        """
+        Test that batched results are identical to per-image results.
+        """
+        batched = self.detector.detect_batch(self.images, threshold=0.0, batch_size=2)
+        single = [self.detector.detect(image, threshold=0.0) for image in self.images]
+
+        self.assertEqual(len(batched), len(self.images))
+        for b, s in zip(batched, single):
+            self.assertEqual(b["labels"], s["labels"])
+            np.testing.assert_allclose(b["boxes"], s["boxes"], rtol=1e-4, atol=1e-3)
+            np.testing.assert_allclose(b["scores"], s["scores"], rtol=1e-4, atol=1e-5)
+
+    def test_batch_mixed_sizes(self):
+        """
+        Test that padded mixed-size batches return one result per image.
+        """
+        images = [
+            np.zeros((40, 90, 3), dtype=np.uint8),
+            Image.new("RGB", (30, 70), color="blue"),
+        ]
+        results = self.detector.detect_batch(images, threshold=0.0)
+
+        self.assertEqual(len(results), 2)
+        for result in results:
+            self.assertIn("boxes", result)
+            self.assertIn("scores", result)
+            self.assertIn("labels", result)
+        # Boxes are scaled back to each image's own size
+        self.assertTrue(np.all(results[0]["boxes"][:, [0, 2]] <= 90 + 1e-3))
+        self.assertTrue(np.all(results[1]["boxes"][:, [1, 3]] <= 70 + 1e-3))
+
+    def test_raw_matches_processor_post_processing(self):
+        """
+        Test that raw results reproduce DetrImageProcessor's post-processing.
+        """
+        import torch
+
+        image = self.images[0]
+        raw = self.detector.detect_raw(image)
+
+        image_pil = Image.fromarray(image[:, :, ::-1])
+        inputs = self.detector.processor(images=image_pil, return_tensors="pt")
+        with torch.no_grad():
+            outputs = self.detector.model(**inputs)
+        expected = self.detector.processor.post_process_object_detection(
+            outputs, threshold=0.0, target_sizes=[(image_pil.height, image_pil.width)]
+        )[0]
+
+        self.assertEqual(len(raw), self.detector.model.config.num_queries)
+        np.testing.assert_allclose(raw.scores, expected["scores"].numpy(), rtol=1e-5)
+        np.testing.assert_allclose(
+            raw.boxes, expected["boxes"].numpy(), rtol=1e-5, atol=1e-4
+        )
+        np.testing.assert_array_equal(raw.class_ids, expected["labels"].numpy())
+
+    def test_detect_is_filtered_raw(self):
+        raw = self.detector.detect_raw(self.images[0])
+        threshold = float(np.median(raw.scores))
+        result = self.detector.detect(self.images[0], threshold=threshold)
+
+        np.testing.assert_array_equal(result["scores"], raw.filter(threshold)["scores"])
+        self.assertTrue(np.all(result["scores"] > threshold))
+
+    def test_fast_preprocess(self):
+        """
+        Test that the fast preprocessing path gives the same results.
+        """
+        detector = DetrObjectDetector(
+            model_name=self.model_dir, device="cpu", fast_preprocess=True
+        )
+        self.assertIsNotNone(detector.fast_preprocessor)
+
+        expected = self.detector.detect_batch(self.images, threshold=0.0, batch_size=2)
+        results = detector.detect_batch(self.images, threshold=0.0, batch_size=2)
+        for r, e in zip(results, expected):
+            np.testing.assert_allclose(r["scores"], e["scores"], rtol=1e-4, atol=1e-5)
+            np.testing.assert_allclose(r["boxes"], e["boxes"], rtol=1e-4, atol=1e-3)
+
+        # Flipped views can't be wrapped by torch directly
+        flipped = self.images[0][:, ::-1]
+        expected = self.detector.detect_raw(np.ascontiguousarray(flipped))
+        for raw in [
+            detector.detect_raw(flipped),
+            detector.detect_batch_raw([flipped])[0],
+        ]:
+            np.testing.assert_allclose(
+                raw.scores, expected.scores, rtol=1e-4, atol=1e-5
+            )
+
+    def test_aspect_buckets_match_single(self):
+        """
+        Test that landscape and portrait images are batched separately, so
+        they give the same results as on their own.
+        """
+        rng = np.random.default_rng(1)
+        images = [
+            rng.integers(0, 256, size=size, dtype=np.uint8)
+            for size in [(48, 64, 3), (64, 48, 3), (48, 64, 3), (64, 48, 3)]
+        ]
+        batched = self.detector.detect_batch_raw(images, batch_size=4)
+        single = [self.detector.detect_raw(image) for image in images]
+        for b, s in zip(batched, single):
+            np.testing.assert_allclose(b.scores, s.scores, rtol=1e-4, atol=1e-5)
+            np.testing.assert_allclose(b.boxes, s.boxes, rtol=1e-4, atol=1e-3)
+
+        # Without bucketing the padding changes the results
+        padded = self.detector.detect_batch_raw(images, batch_size=4, max_padding=None)
+        self.assertFalse(np.allclose(padded[1].scores, single[1].scores, atol=1e-5))
+
+    def test_input_size(self):
+        detector = DetrObjectDetector(
+            model_name=self.model_dir, device="cpu", input_size=32, fast_preprocess=True
+        )
+        self.assertEqual(self.detector.input_size, (64, 96))
+        self.assertEqual(detector.input_size, (32, 48))
+        self.assertEqual(detector.fast_preprocessor.shortest_edge, 32)
+        self.assertNotEqual(detector._cache_name, self.detector._cache_name)
+
+        image = np.zeros((48, 64, 3), dtype=np.uint8)
+        inputs = detector._preprocess([Image.fromarray(image)])
+        self.assertEqual(tuple(inputs["pixel_values"].shape), (1, 3, 32, 42))
+        self.assertEqual(
+            tuple(detector._preprocess([image])["pixel_values"].shape), (1, 3, 32, 42)
+        )
+        self.assertEqual(detector.detect_raw(image).boxes.shape, (10, 4))
+
+        detector = DetrObjectDetector(
+            model_name=self.model_dir, device="cpu", input_size=32, max_input_size=40
+        )
+        self.assertEqual(detector.input_size, (32, 40))
+        with self.assertRaises(ValueError):
+            DetrObjectDetector(model_name=self.model_dir, input_size=0)
+
+    def test_empty_batch(self):
+        self.assertEqual(self.detector.detect_batch([]), [])
+
+    def test_invalid_batch_size(self):
+        with self.assertRaises(ValueError):
+            self.detector.detect_batch(self.images, batch_size=0)
+
+
+class TestPrecision(TinyDetrTestCase):
+    """
+    Test cases for reduced-precision inference, using a tiny offline model.
+    """
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.image = rng.integers(0, 256, size=(48, 64, 3), dtype=np.uint8)
+
+    def assert_close_to_reference(self, precision, score_atol, box_atol):
+        detector = DetrObjectDetector(
+            model_name=self.model_dir, device="cpu", precision=precision
+        )
+        expected = self.detector.detect_raw(self.image)
+        raw = detector.detect_raw(self.image)
+
+        self.assertEqual(raw.scores.dtype, np.float32)
+        np.testing.assert_allclose(raw.scores, expected.scores, atol=score_atol)
+        np.testing.assert_allclose(raw.boxes, expected.boxes, atol=box_atol)
+
+    def test_bf16(self):
+        self.assert_close_to_reference("bf16", score_atol=0.02, box_atol=2.0)
+
+    def test_int8_dynamic(self):
+        import torch
+
+        self.assert_close_to_reference("int8-dynamic", score_atol=0.02, box_atol=2.0)
+
+        detector = DetrObjectDetector(
+            model_name=self.model_dir, device="cpu", precision="int8-dynamic"
+        )
+        q_proj = detector.model.model.encoder.layers[0].self_attn.q_proj
+        if HAS_TORCHAO:
+            self.assertIsNot(type(q_proj.weight), torch.nn.Parameter)
+        else:
+            self.assertIsInstance(q_proj, torch.ao.nn.quantized.dynamic.Linear)
+        # The prediction heads stay in full precision
+        self.assertIs(
+            type(detector.model.bbox_predictor.layers[0].weight), torch.nn.Parameter
+        )
+
+    def test_int8_dynamic_without_torchao(self):
+        import torch
+
+        with mock.patch.dict(sys.modules, {"torchao.quantization": None}):
+            with warnings.catch_warnings():
+                warnings.simplefilter("error", DeprecationWarning)
+                model = DetrObjectDetector._quantize_dynamic(
+                    copy.deepcopy(self.detector.model)
+                )
+            q_proj = model.model.encoder.layers[0].self_attn.q_proj
+            self.assertIsInstance(q_proj, torch.ao.nn.quantized.dynamic.Linear)
+
+            # Once PyTorch removes quantize_dynamic, torchao is required
+            with mock.patch.dict(sys.modules, {"torch.ao.quantization": None}):
+                with self.assertRaises(ImportError):
+                    DetrObjectDetector._quantize_dynamic(
+                        copy.deepcopy(self.detector.model)
+                    )
+
+    def test_invalid_precision(self):
+        with self.assertRaises(ValueError):
+            DetrObjectDetector(model_name=self.model_dir, precision="fp8")
+        with self.assertRaises(ValueError):
+            DetrObjectDetector(
+                model_name=self.model_dir, device="cuda", precision="int8-dynamic"
+            )
+
+
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
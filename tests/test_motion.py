@@ -0,0 +1,196 @@
+"""
+Tests for the motion module.
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Add the parent directory to the Python path to import our package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.detr_vision.camera import SyntheticFrameSource
+from src.detr_vision.model import DetrObjectDetector
+from src.detr_vision.motion import (
+    MotionGate,
+    MotionGatedDetector,
+    downscale_gray,
+    motion_region,
+    motion_score,
+)
+from src.detr_vision.results import Detections
+from tests.tiny_detr import tiny_detr_dir
+
+LABELS = {0: "square"}
+
+
+class SquareDetector:
+    """
+    Stand-in detector that finds the white square of SyntheticFrameSource frames.
+    """
+
+    def __init__(self):
+        self.image_sizes = []
+
+    def detect(self, image, threshold=0.7):
+        self.image_sizes.append(image.shape[:2])
+        ys, xs = np.nonzero(image[:, :, 0] == 255)
+        boxes = np.zeros((0, 4))
+        if len(xs):
+            boxes = [[xs.min(), ys.min(), xs.max() + 1, ys.max() + 1]]
+        return Detections(boxes, np.full(len(boxes), 0.9), np.zeros(len(boxes)), LABELS)
+
+
+def synthetic_frames(num_moves, repeats):
+    """
+    Frames of a mostly static camera: each SyntheticFrameSource frame is
+    shown ``repeats`` times before the square moves on.
+    """
+    source = SyntheticFrameSource(width=320, height=240, num_frames=num_moves)
+    frames = []
+    for _ in range(num_moves):
+        _, frame = source.read()
+        frame[0, 0] = 32  # Hide the frame counter pixel
+        frames.extend([frame] * repeats)
+    return frames
+
+
+class TestMotionGate(unittest.TestCase):
+    """
+    Test cases for measuring motion.
+    """
+
+    def test_static_and_moving_frames(self):
+        frames = synthetic_frames(2, 2)
+        gate = MotionGate()
+        self.assertEqual(gate.check(frames[0])[0], 1.0)
+        gate.accept()
+        self.assertEqual(gate.check(frames[1])[0], 0.0)
+        score, mask = gate.check(frames[2])
+        self.assertGreater(score, gate.threshold)
+        self.assertEqual(mask.shape, (48, 64))
+
+    def test_difference_accumulates_until_accepted(self):
+        frames = synthetic_frames(3, 1)
+        gate = MotionGate()
+        gate.check(frames[0])
+        gate.accept()
+        first = gate.check(frames[1])[0]
+        # Still compared with the accepted first frame
+        self.assertGreater(gate.check(frames[2])[0], first)
+        gate.accept()
+        self.assertEqual(gate.check(frames[2])[0], 0.0)
+
+    def test_motion_score_matches_gate(self):
+        frames = synthetic_frames(2, 1)
+        gate = MotionGate()
+        gate.check(frames[0])
+        gate.accept()
+        score, _ = gate.check(frames[1])
+        self.assertGreater(score, 0.0)
+        self.assertEqual(
+            motion_score(downscale_gray(frames[0]), downscale_gray(frames[1])), score
+        )
+
+    def test_background_absorbs_static_objects(self):
+        frames = synthetic_frames(2, 1)
+        gate = MotionGate(method="background", learning_rate=0.5)
+        gate.check(frames[0])
+        self.assertGreater(gate.check(frames[1])[0], gate.threshold)
+        for _ in range(10):
+            score, _ = gate.check(frames[1])
+        self.assertLessEqual(score, gate.threshold)
+
+    def test_invalid_method(self):
+        with self.assertRaises(ValueError):
+            MotionGate(method="optical-flow")
+
+    def test_motion_region(self):
+        mask = np.zeros((48, 64), dtype=bool)
+        mask[10:20, 30:40] = True
+        self.assertEqual(
+            motion_region(mask, (480, 640), margin=0.0), (300, 100, 400, 200)
+        )
+        self.assertEqual(
+            motion_region(mask, (480, 640), margin=0.5), (250, 50, 450, 250)
+        )
+        self.assertIsNone(motion_region(np.zeros((48, 64), dtype=bool), (480, 640)))
+
+
+class TestMotionGatedDetector(unittest.TestCase):
+    """
+    Test cases for skipping inference on static frames.
+    """
+
+    def test_skips_static_frames(self):
+        detector = SquareDetector()
+        gated = MotionGatedDetector(detector)
+        frames = synthetic_frames(5, 4)
+
+        for frame in frames:
+            detections = gated.process(frame)
+            expected = SquareDetector().detect(frame)
+            np.testing.assert_array_equal(detections.boxes, expected.boxes)
+
+        self.assertEqual(len(detector.image_sizes), 5)
+        stats = gated.stats()
+        self.assertEqual(stats["frames"], 20)
+        self.assertEqual(stats["skipped"], 15)
+        self.assertAlmostEqual(stats["skipped_fraction"], 0.75)
+
+    def test_refresh_every(self):
+        detector = SquareDetector()
+        gated = MotionGatedDetector(detector, refresh_every=3)
+        for frame in synthetic_frames(1, 7):
+            gated.process(frame)
+        self.assertEqual(len(detector.image_sizes), 3)
+
+    def test_crop_to_motion_region(self):
+        detector = SquareDetector()
+        gated = MotionGatedDetector(detector, crop=True, max_crop_area=0.9)
+        frames = synthetic_frames(4, 1)
+
+        for frame in frames:
+            detections = gated.process(frame)
+            expected = SquareDetector().detect(frame)
+            np.testing.assert_array_equal(detections.boxes, expected.boxes)
+
+        # Only the first frame is detected whole
+        self.assertEqual(detector.image_sizes[0], (240, 320))
+        for height, width in detector.image_sizes[1:]:
+            self.assertLess(height * width, 240 * 320)
+        self.assertEqual(gated.stats()["cropped"], 3)
+
+    def test_keeps_detections_outside_crop(self):
+        gated = MotionGatedDetector(SquareDetector(), crop=True)
+        frame = np.full((240, 320, 3), 32, dtype=np.uint8)
+        frame[10:50, 10:50] = 255
+        gated.process(frame)
+
+        # A second object appears far from the first one
+        moved = frame.copy()
+        moved[180:220, 260:300] = 255
+        detections = gated.process(moved)
+        self.assertEqual(gated.stats()["cropped"], 1)
+        np.testing.assert_array_equal(
+            detections.boxes, [[10, 10, 50, 50], [260, 180, 300, 220]]
+        )
+
+    def test_pil_frames_fast_preprocess(self):
+        detector = DetrObjectDetector(
+            model_name=tiny_detr_dir(), device="cpu", fast_preprocess=True
+        )
+        frame = synthetic_frames(1, 1)[0]
+        detections = MotionGatedDetector(detector, threshold=0.0).process(
+            Image.fromarray(frame[:, :, ::-1])
+        )
+        expected = detector.detect(frame, threshold=0.0)
+        self.assertGreater(len(detections), 0)
+        np.testing.assert_allclose(detections.scores, expected.scores, rtol=1e-5)
+
+
+if __name__ == "__main__":
+    unittest.main()
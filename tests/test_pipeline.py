@@ -0,0 +1,222 @@
+"""
+Tests for the pipeline module.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add the parent directory to the Python path to import our package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.detr_vision.pipeline import (
+    collect_image_paths,
+    is_batch_source,
+    run_batch_detection,
+    run_video_detection,
+)
+from tests.tiny_detr import TinyDetrTestCase
+
+
+class TestCollectImagePaths(unittest.TestCase):
+    """
+    Test cases for expanding batch inputs into image paths.
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        os.makedirs(os.path.join(self.root, "sub"))
+        for name in ("a.jpg", "b.png", "notes.md", os.path.join("sub", "c.jpg")):
+            Path(self.root, name).touch()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_directory(self):
+        paths = collect_image_paths(self.root)
+        names = [os.path.relpath(p, self.root) for p in paths]
+        self.assertEqual(names, ["a.jpg", "b.png", os.path.join("sub", "c.jpg")])
+
+    def test_glob(self):
+        paths = collect_image_paths(os.path.join(self.root, "*.jpg"))
+        self.assertEqual([os.path.basename(p) for p in paths], ["a.jpg"])
+
+    def test_list_file(self):
+        list_path = os.path.join(self.root, "images.txt")
+        with open(list_path, "w") as f:
+            f.write("b.png\n# comment\n\nsub/c.jpg\n")
+
+        paths = collect_image_paths(list_path)
+        self.assertEqual(
+            paths,
+            [
+                os.path.join(self.root, "b.png"),
+                os.path.join(self.root, "sub/c.jpg"),
+            ],
+        )
+
+    def test_is_batch_source(self):
+        self.assertTrue(is_batch_source(self.root))
+        self.assertTrue(is_batch_source("data/*.jpg"))
+        self.assertTrue(is_batch_source("images.txt"))
+        self.assertFalse(is_batch_source(os.path.join(self.root, "a.jpg")))
+
+
+class TestRunBatchDetection(TinyDetrTestCase):
+    """
+    Test cases for the threaded batch detection pipeline.
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input_dir = os.path.join(self.tmp.name, "input")
+        self.output_dir = os.path.join(self.tmp.name, "output")
+        os.makedirs(os.path.join(self.input_dir, "sub"))
+
+        rng = np.random.default_rng(0)
+        self.image_paths = []
+        for i in range(7):
+            subdir = "sub" if i % 2 else ""
+            path = os.path.join(self.input_dir, subdir, f"img_{i}.png")
+            cv2.imwrite(path, rng.integers(0, 256, size=(32, 48, 3), dtype=np.uint8))
+            self.image_paths.append(path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_processes_all_images(self):
+        """
+        Test that every image is detected and written exactly once.
+        """
+        results = {}
+        stats = run_batch_detection(
+            self.detector,
+            self.image_paths,
+            self.output_dir,
+            threshold=0.0,
+            batch_size=3,
+            num_readers=2,
+            num_writers=2,
+            queue_size=2,
+            on_result=lambda path, detections: results.setdefault(path, detections),
+        )
+
+        self.assertEqual(stats["images"], len(self.image_paths))
+        self.assertEqual(stats["failed"], 0)
+        self.assertEqual(set(results), set(self.image_paths))
+
+        for path in self.image_paths:
+            relative = os.path.relpath(path, self.input_dir)
+            subdir, filename = os.path.split(relative)
+            output_path = os.path.join(self.output_dir, subdir, f"result_{filename}")
+            self.assertTrue(os.path.exists(output_path), output_path)
+
+        # Results match running the detector directly
+        expected = self.detector.detect(cv2.imread(self.image_paths[0]), threshold=0.0)
+        np.testing.assert_allclose(
+            results[self.image_paths[0]]["scores"],
+            expected["scores"],
+            rtol=1e-4,
+            atol=1e-5,
+        )
+
+    def test_unreadable_images_are_counted(self):
+        bad_path = os.path.join(self.input_dir, "broken.jpg")
+        Path(bad_path).write_bytes(b"not an image")
+
+        stats = run_batch_detection(
+            self.detector, self.image_paths + [bad_path], self.output_dir, threshold=0.0
+        )
+
+        self.assertEqual(stats["images"], len(self.image_paths))
+        self.assertEqual(stats["failed"], 1)
+
+    def test_empty_input(self):
+        stats = run_batch_detection(self.detector, [], self.output_dir)
+        self.assertEqual(stats["images"], 0)
+
+
+class TestRunVideoDetection(TinyDetrTestCase):
+    """
+    Test cases for the video file pipeline.
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.video_path = os.path.join(self.tmp.name, "input.avi")
+        writer = cv2.VideoWriter(
+            self.video_path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (48, 32)
+        )
+        rng = np.random.default_rng(0)
+        for _ in range(11):
+            writer.write(rng.integers(0, 256, size=(32, 48, 3), dtype=np.uint8))
+        writer.release()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_stride_video_and_jsonl(self):
+        """
+        Test that sampled frames are annotated and logged in order.
+        """
+        output_path = os.path.join(self.tmp.name, "out", "result.avi")
+        jsonl_path = os.path.join(self.tmp.name, "out", "detections.jsonl")
+        progress = []
+
+        stats = run_video_detection(
+            self.detector,
+            self.video_path,
+            output_path=output_path,
+            jsonl_path=jsonl_path,
+            threshold=0.0,
+            batch_size=2,
+            stride=3,
+            queue_size=2,
+            on_progress=progress.append,
+            progress_interval=0.0,
+        )
+
+        # Frames 0, 3, 6 and 9 are processed
+        self.assertEqual(stats["frames_processed"], 4)
+        self.assertEqual(stats["frames_written"], 4)
+        self.assertTrue(progress)
+
+        with open(jsonl_path) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([r["frame"] for r in records], [0, 3, 6, 9])
+        self.assertAlmostEqual(records[1]["time"], 0.3)
+        self.assertEqual(
+            len(records[0]["detections"]), self.detector.model.config.num_queries
+        )
+
+        capture = cv2.VideoCapture(output_path)
+        self.assertEqual(int(capture.get(cv2.CAP_PROP_FRAME_COUNT)), 4)
+        self.assertEqual(int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)), 48)
+        capture.release()
+
+    def test_jsonl_only(self):
+        jsonl_path = os.path.join(self.tmp.name, "detections.jsonl")
+        stats = run_video_detection(
+            self.detector, self.video_path, jsonl_path=jsonl_path
+        )
+
+        self.assertEqual(stats["frames_processed"], 11)
+        with open(jsonl_path) as f:
+            self.assertEqual(len(f.readlines()), 11)
+
+    def test_missing_video(self):
+        with self.assertRaises(RuntimeError):
+            run_video_detection(
+                self.detector, os.path.join(self.tmp.name, "missing.mp4")
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
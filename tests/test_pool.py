@@ -0,0 +1,117 @@
+"""
+Tests for the pool module.
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Add the parent directory to the Python path to import our package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.detr_vision.pool import DetectorPool, split_cores
+from src.detr_vision.results import Detections
+from tests.tiny_detr import TinyDetrTestCase
+
+
+class TestSplitCores(unittest.TestCase):
+    """
+    Test cases for dividing cores between workers.
+    """
+
+    def test_even_split(self):
+        self.assertEqual(split_cores(2, [0, 1, 2, 3]), [[0, 1], [2, 3]])
+        self.assertEqual(split_cores(3, [0, 1, 2, 3]), [[0], [1], [2]])
+
+    def test_more_workers_than_cores(self):
+        self.assertEqual(split_cores(3, [4, 5]), [[4], [5], [4]])
+
+
+class TestDetectorPool(TinyDetrTestCase):
+    """
+    Test cases for the DetectorPool class, using a tiny offline model.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.pool = DetectorPool(cls.model_dir, num_workers=2, threads_per_worker=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+        super().tearDownClass()
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.images = [
+            rng.integers(0, 256, size=(32 + 8 * i, 48, 3), dtype=np.uint8)
+            for i in range(5)
+        ]
+
+    def test_map_matches_detector(self):
+        results = list(self.pool.map(self.images, threshold=0.0))
+
+        self.assertEqual(len(results), len(self.images))
+        for image, result in zip(self.images, results):
+            expected = self.detector.detect(image, threshold=0.0)
+            self.assertIsInstance(result, Detections)
+            self.assertEqual(result["labels"], expected["labels"])
+            np.testing.assert_allclose(
+                result["scores"], expected["scores"], rtol=1e-5, atol=1e-6
+            )
+            np.testing.assert_allclose(
+                result["boxes"], expected["boxes"], rtol=1e-5, atol=1e-4
+            )
+
+    def test_map_bounds_images_in_flight(self):
+        in_flight = []
+
+        def images():
+            for i in range(10):
+                in_flight.append(len(self.pool._pending))
+                yield self.images[i % len(self.images)]
+
+        results = self.pool.map(images(), threshold=0.0, max_in_flight=3)
+        self.assertEqual(len(in_flight), 3)
+        self.assertEqual(len(list(results)), 10)
+        self.assertEqual(len(in_flight), 10)
+        self.assertLessEqual(max(in_flight), 2)
+
+        with self.assertRaises(ValueError):
+            self.pool.map(self.images, max_in_flight=0)
+
+    def test_submit_pil_image_and_threshold(self):
+        image = self.images[0]
+        expected = self.detector.detect(image, threshold=0.0)
+        threshold = float(np.median(expected["scores"]))
+
+        result = self.pool.submit(
+            Image.fromarray(image[:, :, ::-1]), threshold
+        ).result()
+        np.testing.assert_allclose(
+            result["scores"], expected.filter(threshold)["scores"], rtol=1e-5, atol=1e-6
+        )
+
+    def test_worker_errors_are_raised(self):
+        with self.assertRaises(Exception):
+            self.pool.detect(np.zeros((0, 0, 3), dtype=np.uint8), timeout=60)
+        # The pool keeps working afterwards
+        self.assertIsInstance(self.pool.detect(self.images[0], timeout=60), Detections)
+
+    def test_closed_pool(self):
+        pool = DetectorPool(self.model_dir, num_workers=1)
+        pool.close()
+        with self.assertRaises(RuntimeError):
+            pool.submit(self.images[0])
+
+    def test_invalid_workers(self):
+        with self.assertRaises(ValueError):
+            DetectorPool(self.model_dir, num_workers=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+"""
+Tests for the preprocessing module.
+"""
+
+import sys
+import unittest
+import warnings
+from pathlib import Path
+
+import numpy as np
+import torch
+from PIL import Image
+from transformers import DetrImageProcessor
+
+# Add the parent directory to the Python path to import our package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.detr_vision.preprocessing import (
+    FastPreprocessor,
+    aspect_buckets,
+    get_resize_size,
+    padding_fraction,
+)
+
+
+class TestGetResizeSize(unittest.TestCase):
+    """
+    Test cases for the DETR resize rule.
+    """
+
+    def test_shortest_edge(self):
+        self.assertEqual(get_resize_size(480, 640, 800, 1333), (800, 1066))
+        self.assertEqual(get_resize_size(640, 480, 800, 1333), (1066, 800))
+
+    def test_longest_edge_limit(self):
+        self.assertEqual(get_resize_size(1080, 3840, 800, 1333), (375, 1333))
+
+    def test_unchanged(self):
+        self.assertEqual(get_resize_size(800, 1000, 800, 1333), (800, 1000))
+
+
+class TestAspectBuckets(unittest.TestCase):
+    """
+    Test cases for grouping images into batches by aspect ratio.
+    """
+
+    def test_padding_fraction(self):
+        self.assertEqual(padding_fraction([(800, 1066), (800, 1066)]), 0.0)
+        self.assertAlmostEqual(
+            padding_fraction([(800, 1066), (1066, 800)]), 1 - 800 / 1066
+        )
+        self.assertEqual(padding_fraction([]), 0.0)
+
+    def test_separates_portrait_and_landscape(self):
+        sizes = [(800, 1066), (1066, 800), (800, 1066), (1066, 800), (800, 1200)]
+        buckets = aspect_buckets(sizes, batch_size=8, max_padding=0.1)
+        self.assertEqual(buckets, [[4, 0, 2], [1, 3]])
+        for bucket in buckets:
+            self.assertLessEqual(padding_fraction([sizes[i] for i in bucket]), 0.1)
+
+        # Anything goes with enough padding allowed
+        self.assertEqual(
+            aspect_buckets(sizes, batch_size=8, max_padding=1.0), [[4, 0, 2, 1, 3]]
+        )
+
+    def test_batch_size(self):
+        sizes = [(800, 1066)] * 5
+        self.assertEqual(aspect_buckets(sizes, batch_size=2), [[0, 1], [2, 3], [4]])
+        self.assertEqual(aspect_buckets([], batch_size=2), [])
+        with self.assertRaises(ValueError):
+            aspect_buckets(sizes, batch_size=0)
+
+
+class TestFastPreprocessor(unittest.TestCase):
+    """
+    Test cases for preprocessing BGR frames without PIL.
+    """
+
+    def setUp(self):
+        self.processor = DetrImageProcessor(
+            size={"shortest_edge": 64, "longest_edge": 96}
+        )
+        self.preprocessor = FastPreprocessor.from_processor(self.processor)
+        self.rng = np.random.default_rng(0)
+
+    def random_image(self, height, width):
+        return self.rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+
+    def assert_matches_processor(self, images):
+        expected = self.processor(
+            images=[Image.fromarray(image[:, :, ::-1]) for image in images],
+            return_tensors="pt",
+        )
+        inputs = self.preprocessor(images)
+
+        self.assertEqual(inputs["pixel_values"].shape, expected["pixel_values"].shape)
+        self.assertEqual(inputs["pixel_values"].dtype, torch.float32)
+        torch.testing.assert_close(
+            inputs["pixel_values"], expected["pixel_values"], rtol=0, atol=1e-5
+        )
+        self.assertTrue(torch.equal(inputs["pixel_mask"], expected["pixel_mask"]))
+
+    def test_matches_processor(self):
+        # Upscaling, downscaling and an image already at the target size
+        for size in [(48, 64), (300, 200), (64, 80)]:
+            with self.subTest(size=size):
+                self.assert_matches_processor([self.random_image(*size)])
+
+    def test_matches_processor_padded_batch(self):
+        self.assert_matches_processor(
+            [self.random_image(48, 64), self.random_image(80, 40)]
+        )
+
+    def test_buffers_are_reused(self):
+        first = self.preprocessor([self.random_image(48, 64)])["pixel_values"]
+        second = self.preprocessor([self.random_image(48, 64)])["pixel_values"]
+        self.assertEqual(first.data_ptr(), second.data_ptr())
+
+    def test_reused_padding_is_cleared(self):
+        # A wide then a narrow image in the same padded buffer shape
+        self.preprocessor([self.random_image(48, 96), self.random_image(48, 64)])
+        self.assert_matches_processor(
+            [self.random_image(48, 64), self.random_image(48, 96)]
+        )
+
+    def test_flipped_and_read_only_views(self):
+        image = self.random_image(48, 64)
+        read_only = image.copy()
+        read_only.flags.writeable = False
+        flipped = image[:, ::-1]
+        channels_flipped = np.asarray(Image.fromarray(image))[:, :, ::-1]
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            for view in [read_only, flipped, channels_flipped]:
+                with self.subTest(strides=view.strides, writeable=view.flags.writeable):
+                    self.assertTrue(FastPreprocessor.supports(view))
+                    self.assert_matches_processor([view])
+
+    def test_supports(self):
+        self.assertTrue(FastPreprocessor.supports(self.random_image(4, 4)))
+        self.assertFalse(FastPreprocessor.supports(np.zeros((4, 4), dtype=np.uint8)))
+        self.assertFalse(
+            FastPreprocessor.supports(np.zeros((4, 4, 3), dtype=np.float32))
+        )
+        self.assertFalse(FastPreprocessor.supports(Image.new("RGB", (4, 4))))
+
+    def test_requires_shortest_and_longest_edge(self):
+        with self.assertRaises(ValueError):
+            FastPreprocessor({"height": 64, "width": 64}, [0.5] * 3, [0.5] * 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
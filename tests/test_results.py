@@ -0,0 +1,156 @@
+"""
+Tests for the results module.
+"""
+
+import json
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add the parent directory to the Python path to import our package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.detr_vision.results import Detections, RawDetections, detections_to_records
+
+
+class TestRawDetections(unittest.TestCase):
+    """
+    Test cases for the RawDetections class.
+    """
+
+    def setUp(self):
+        self.id2label = {0: "person", 1: "car", 2: "dog"}
+        self.raw = RawDetections(
+            boxes=np.arange(20, dtype=np.float64).reshape(5, 4),
+            scores=np.array([0.9, 0.2, 0.75, 0.5, 0.95]),
+            class_ids=np.array([0, 1, 1, 2, 0]),
+            id2label=self.id2label,
+        )
+
+    def test_compact_dtypes(self):
+        self.assertEqual(len(self.raw), 5)
+        self.assertEqual(self.raw.boxes.dtype, np.float32)
+        self.assertEqual(self.raw.scores.dtype, np.float32)
+        self.assertEqual(self.raw.class_ids.dtype, np.int32)
+
+    def test_threshold_keeps_query_order(self):
+        result = self.raw.filter(0.6)
+        np.testing.assert_allclose(result["scores"], [0.9, 0.75, 0.95])
+        self.assertEqual(result["labels"], ["person", "car", "person"])
+        np.testing.assert_array_equal(result["boxes"][1], [8, 9, 10, 11])
+
+    def test_threshold_is_exclusive(self):
+        result = self.raw.filter(0.5)
+        self.assertNotIn("dog", result["labels"])
+
+    def test_classes_by_name_or_id(self):
+        by_name = self.raw.filter(0.0, classes=["car", "dog"])
+        by_id = self.raw.filter(0.0, classes=[1, 2])
+        self.assertEqual(by_name["labels"], ["car", "car", "dog"])
+        self.assertEqual(by_name["labels"], by_id["labels"])
+
+    def test_unknown_class(self):
+        with self.assertRaises(ValueError):
+            self.raw.filter(0.0, classes=["unicorn"])
+
+    def test_top_k_sorted_by_score(self):
+        result = self.raw.filter(0.0, top_k=2)
+        np.testing.assert_allclose(result["scores"], [0.95, 0.9])
+        self.assertEqual(len(self.raw.filter(0.0, top_k=10)["scores"]), 5)
+        self.assertEqual(len(self.raw.filter(0.0, top_k=0)["scores"]), 0)
+
+    def test_nothing_above_threshold(self):
+        result = self.raw.filter(0.99)
+        self.assertEqual(result["boxes"].shape, (0, 4))
+        self.assertEqual(result["labels"], [])
+
+
+class TestDetections(unittest.TestCase):
+    """
+    Test cases for the Detections class.
+    """
+
+    def setUp(self):
+        self.id2label = {0: "person", 1: "car", 2: "dog"}
+        self.detections = Detections(
+            boxes=np.arange(12, dtype=np.float64).reshape(3, 4),
+            scores=np.array([0.9, 0.4, 0.8]),
+            class_ids=np.array([1, 0, 2]),
+            id2label=self.id2label,
+        )
+
+    def test_compact_dtypes(self):
+        self.assertEqual(len(self.detections), 3)
+        self.assertEqual(self.detections.boxes.dtype, np.float32)
+        self.assertEqual(self.detections.scores.dtype, np.float32)
+        self.assertEqual(self.detections.class_ids.dtype, np.int16)
+        self.assertTrue(self.detections.boxes.flags.c_contiguous)
+        self.assertFalse(hasattr(self.detections, "__dict__"))
+
+    def test_dict_compatible(self):
+        self.assertIn("boxes", self.detections)
+        self.assertNotIn("logits", self.detections)
+        self.assertEqual(self.detections["labels"], ["car", "person", "dog"])
+        np.testing.assert_array_equal(self.detections["scores"], self.detections.scores)
+        self.assertEqual(set(dict(self.detections)), {"boxes", "scores", "labels"})
+        with self.assertRaises(KeyError):
+            self.detections["logits"]
+
+    def test_filter(self):
+        result = self.detections.filter(0.5)
+        self.assertIsInstance(result, Detections)
+        self.assertEqual(result.labels, ["car", "dog"])
+        self.assertEqual(
+            self.detections.filter(0.0, classes=["dog", 0]).labels, ["person", "dog"]
+        )
+        self.assertEqual(self.detections.filter(0.0, top_k=1).labels, ["car"])
+
+    def test_raw_filter_returns_detections(self):
+        raw = RawDetections(
+            self.detections.boxes,
+            self.detections.scores,
+            self.detections.class_ids,
+            self.id2label,
+        )
+        result = raw.filter(0.5)
+        self.assertIsInstance(result, Detections)
+        np.testing.assert_array_equal(result.class_ids, [1, 2])
+
+    def test_to_records(self):
+        records = self.detections.filter(0.85).to_records()
+        self.assertEqual(
+            records,
+            [
+                {
+                    "label": "car",
+                    "confidence": records[0]["confidence"],
+                    "box": [0.0, 1.0, 2.0, 3.0],
+                }
+            ],
+        )
+        self.assertIsInstance(records[0]["confidence"], float)
+        self.assertAlmostEqual(records[0]["confidence"], 0.9, places=6)
+        self.assertEqual(
+            json.loads(self.detections.to_json()), self.detections.to_records()
+        )
+        self.assertEqual(
+            detections_to_records(self.detections), self.detections.to_records()
+        )
+        self.assertEqual(
+            detections_to_records(self.detections.to_dict()),
+            self.detections.to_records(),
+        )
+
+    def test_from_dict(self):
+        detections = Detections.from_dict(self.detections.to_dict(), self.id2label)
+        np.testing.assert_array_equal(detections.class_ids, self.detections.class_ids)
+        with self.assertRaises(ValueError):
+            Detections.from_dict(
+                {"boxes": [], "scores": [], "labels": ["unicorn"]}, self.id2label
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+"""
+Tests for the startup module.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add the parent directory to the Python path to import our package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.detr_vision.model import DetrObjectDetector
+from src.detr_vision.startup import (
+    MMAP_WEIGHTS_NAME,
+    StartupTimer,
+    is_model_cached,
+    load_pretrained,
+    model_cache_path,
+)
+from tests.tiny_detr import TinyDetrTestCase
+
+
+class TestStartupTimer(unittest.TestCase):
+    """
+    Test cases for the StartupTimer class.
+    """
+
+    def test_phases(self):
+        timer = StartupTimer()
+        with timer.phase("model"):
+            pass
+        with timer.phase("warmup"):
+            pass
+        with timer.phase("model"):
+            pass
+
+        self.assertEqual(list(timer.times), ["model", "warmup"])
+        self.assertAlmostEqual(timer.total, sum(timer.times.values()))
+        self.assertRegex(timer.format(), r"^model \d+\.\d\ds, warmup \d+\.\d\ds$")
+
+
+class TestModelCache(TinyDetrTestCase):
+    """
+    Test cases for loading models through the local model cache.
+    """
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def test_cache_path(self):
+        path = model_cache_path("facebook/detr-resnet-50", "/cache")
+        self.assertEqual(path, os.path.join("/cache", "facebook--detr-resnet-50"))
+
+    def test_saved_then_reused(self):
+        timer = StartupTimer()
+        _, model, cached = load_pretrained(self.model_dir, self.cache_dir.name, timer)
+        self.assertFalse(cached)
+        self.assertIn("save_cache", timer.times)
+
+        path = model_cache_path(self.model_dir, self.cache_dir.name)
+        self.assertTrue(is_model_cached(path))
+        # No temporary directories are left behind
+        self.assertEqual(os.listdir(self.cache_dir.name), [os.path.basename(path)])
+
+        _, cached_model, cached = load_pretrained(self.model_dir, self.cache_dir.name)
+        self.assertTrue(cached)
+        for (name, a), (_, b) in zip(
+            model.state_dict().items(), cached_model.state_dict().items()
+        ):
+            self.assertTrue(a.equal(b), name)
+
+    def test_detector_startup(self):
+        detector = DetrObjectDetector(
+            model_name=self.model_dir, device="cpu", model_cache_dir=self.cache_dir.name
+        )
+        self.assertIn("model", detector.startup_times)
+        self.assertIn("to_device", detector.startup_times)
+
+        elapsed = detector.warmup((32, 48), runs=2)
+        self.assertEqual(detector.startup_times["warmup"], elapsed)
+
+        # The cached copy gives the same results
+        cached = DetrObjectDetector(
+            model_name=self.model_dir, device="cpu", model_cache_dir=self.cache_dir.name
+        )
+        image = np.random.default_rng(0).integers(
+            0, 256, size=(32, 48, 3), dtype=np.uint8
+        )
+        np.testing.assert_array_equal(
+            cached.detect_raw(image).scores, detector.detect_raw(image).scores
+        )
+
+    def test_mmap_weights(self):
+        _, model, _ = load_pretrained(self.model_dir, self.cache_dir.name)
+        _, mapped, _ = load_pretrained(self.model_dir, self.cache_dir.name, mmap=True)
+
+        path = model_cache_path(self.model_dir, self.cache_dir.name)
+        weights_path = os.path.join(path, MMAP_WEIGHTS_NAME)
+        self.assertTrue(os.path.isfile(weights_path))
+        for (name, a), (_, b) in zip(
+            model.state_dict().items(), mapped.state_dict().items()
+        ):
+            self.assertTrue(a.equal(b), name)
+
+        # The weights file is mapped into the process rather than read into memory
+        if os.path.exists("/proc/self/maps"):
+            with open("/proc/self/maps") as f:
+                self.assertIn(os.path.realpath(weights_path), f.read())
+
+    def test_detector_mmap_weights(self):
+        image = np.random.default_rng(0).integers(
+            0, 256, size=(32, 48, 3), dtype=np.uint8
+        )
+        detector = DetrObjectDetector(model_name=self.model_dir, device="cpu")
+        mapped = DetrObjectDetector(
+            model_name=self.model_dir,
+            device="cpu",
+            model_cache_dir=self.cache_dir.name,
+            mmap_weights=True,
+        )
+        np.testing.assert_array_equal(
+            mapped.detect_raw(image).scores, detector.detect_raw(image).scores
+        )
+
+
+class TestLazyImports(unittest.TestCase):
+    """
+    Test that importing the package doesn't import heavy unused modules.
+    """
+
+    def test_lazy_imports(self):
+        code = (
+            "import sys\n"
+            "import src.detr_vision.model, src.detr_vision.visualization\n"
+            "print('transformers' in sys.modules, 'matplotlib' in sys.modules)\n"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent.parent,
+        ).stdout.split()
+        self.assertEqual(output, ["False", "False"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+"""
+Tests for the streaming module.
+"""
+
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add the parent directory to the Python path to import our package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.detr_vision.batching import QueueFullError
+from src.detr_vision.streaming import DetectionPipeline, LatestSlot, RateMeter
+
+
+class SyntheticSource:
+    """
+    Frame source producing numbered frames at a fixed rate.
+    """
+
+    def __init__(self, num_frames: int, interval: float = 0.002):
+        self.num_frames = num_frames
+        self.interval = interval
+        self.count = 0
+
+    def read(self):
+        if self.count >= self.num_frames:
+            return False, None
+        time.sleep(self.interval)
+        self.count += 1
+        return True, np.full((4, 4, 3), self.count, dtype=np.uint8)
+
+
+class SlowDetector:
+    """
+    Stand-in detector that takes a while and records which frames it saw.
+    """
+
+    def __init__(self, delay: float = 0.02):
+        self.delay = delay
+        self.seen = []
+
+    def detect(self, image, threshold=0.7):
+        time.sleep(self.delay)
+        self.seen.append(int(image[0, 0, 0]))
+        return {"boxes": np.zeros((0, 4)), "scores": np.zeros(0), "labels": []}
+
+
+class TestLatestSlot(unittest.TestCase):
+    """
+    Test cases for the LatestSlot class.
+    """
+
+    def test_keeps_newest_and_counts_drops(self):
+        slot = LatestSlot()
+        slot.put("a")
+        slot.put("b")
+        seq, item = slot.wait_newer(0, timeout=1)
+        self.assertEqual((seq, item), (2, "b"))
+        self.assertEqual(slot.dropped, 1)
+
+        # Taken values aren't counted as dropped when replaced
+        slot.put("c")
+        self.assertEqual(slot.dropped, 1)
+
+    def test_wait_times_out(self):
+        slot = LatestSlot()
+        slot.put("a")
+        self.assertEqual(slot.wait_newer(1, timeout=0.01), (1, None))
+
+    def test_close_wakes_waiters(self):
+        slot = LatestSlot()
+        result = []
+        waiter = threading.Thread(target=lambda: result.append(slot.wait_newer(0)))
+        waiter.start()
+        slot.close()
+        waiter.join(timeout=1)
+        self.assertEqual(result, [(0, None)])
+        self.assertTrue(slot.closed)
+
+
+class TestRateMeter(unittest.TestCase):
+    """
+    Test cases for the RateMeter class.
+    """
+
+    def test_rate(self):
+        meter = RateMeter(window=10)
+        for i in range(11):
+            meter.tick(now=100 + i * 0.1)
+        self.assertAlmostEqual(meter.rate(now=101), 10.0)
+        # Old events fall out of the window
+        self.assertEqual(meter.rate(now=200), 0.0)
+
+
+class TestDetectionPipeline(unittest.TestCase):
+    """
+    Test cases for the DetectionPipeline class.
+    """
+
+    def test_inference_skips_stale_frames(self):
+        """
+        Test that a slow detector only sees recent frames, in order.
+        """
+        source = SyntheticSource(num_frames=60)
+        detector = SlowDetector()
+
+        with DetectionPipeline(source, detector, threshold=0.5) as pipeline:
+            while pipeline.running:
+                time.sleep(0.01)
+            stats = pipeline.stats()
+            latest = pipeline.latest_detections()
+
+        self.assertEqual(source.count, 60)
+        self.assertLess(len(detector.seen), 60)
+        self.assertEqual(detector.seen, sorted(detector.seen))
+        # The last frame is always processed once the source ends
+        self.assertEqual(detector.seen[-1], 60)
+        self.assertEqual(latest[0], 60)
+        self.assertEqual(stats["dropped_frames"], 60 - len(detector.seen))
+        self.assertGreater(stats["latency"], 0.0)
+
+    def test_latest_frame(self):
+        source = SyntheticSource(num_frames=3)
+        with DetectionPipeline(source, SlowDetector(delay=0)) as pipeline:
+            while pipeline.running:
+                time.sleep(0.01)
+            seq, _, frame = pipeline.latest_frame()
+
+        self.assertEqual(seq, 3)
+        self.assertEqual(frame[0, 0, 0], 3)
+
+    def test_detector_errors_are_raised(self):
+        class FailingDetector:
+            def detect(self, image, threshold=0.7):
+                raise ValueError("boom")
+
+        with DetectionPipeline(
+            SyntheticSource(num_frames=3), FailingDetector()
+        ) as pipeline:
+            while pipeline.running:
+                time.sleep(0.01)
+            with self.assertRaises(RuntimeError):
+                pipeline.latest_detections()
+
+    def test_wait_detections_until_finished(self):
+        source = SyntheticSource(num_frames=20)
+        detector = SlowDetector(delay=0.01)
+        seen = []
+        with DetectionPipeline(source, detector) as pipeline:
+            seq = 0
+            while True:
+                seq, item = pipeline.wait_detections(seq, timeout=1)
+                if item is None:
+                    break
+                seen.append(item[0])
+            self.assertTrue(pipeline.finished)
+
+        self.assertEqual(seen, sorted(seen))
+        self.assertEqual(seen[-1], 20)
+
+    def test_busy_scheduler_drops_frames(self):
+        class BusyScheduler:
+            def __init__(self):
+                self.calls = 0
+
+            def detect(self, image, threshold=0.7):
+                self.calls += 1
+                if self.calls % 2:
+                    raise QueueFullError("busy")
+                return {"boxes": np.zeros((0, 4)), "scores": np.zeros(0), "labels": []}
+
+        scheduler = BusyScheduler()
+        with DetectionPipeline(
+            SyntheticSource(num_frames=10, interval=0.01), scheduler
+        ) as pipeline:
+            while pipeline.running:
+                time.sleep(0.01)
+            stats = pipeline.stats()
+
+        self.assertGreater(pipeline.rejected_frames, 0)
+        self.assertGreaterEqual(stats["dropped_frames"], pipeline.rejected_frames)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,196 @@
+"""
+Tests for the tiling module and tiled detection.
+"""
+
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+# Add the parent directory to the Python path to import our package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.detr_vision.model import DetrObjectDetector
+from src.detr_vision.tiling import box_iou, nms, tile_grid, weighted_box_fusion
+from tests.tiny_detr import TinyDetrTestCase
+
+
+class TestTileGrid(unittest.TestCase):
+    """
+    Test cases for computing tiles.
+    """
+
+    def test_covers_image(self):
+        tiles = tile_grid(700, 1000, 256, 0.25)
+        covered = np.zeros((700, 1000), dtype=bool)
+        for x1, y1, x2, y2 in tiles:
+            self.assertEqual((x2 - x1, y2 - y1), (256, 256))
+            covered[y1:y2, x1:x2] = True
+        self.assertTrue(covered.all())
+
+    def test_overlap(self):
+        tiles = tile_grid(100, 1000, 100, 0.5)
+        np.testing.assert_array_equal(tiles[:3, 0], [0, 50, 100])
+        self.assertEqual(tiles[-1, 2], 1000)
+
+    def test_small_image(self):
+        np.testing.assert_array_equal(tile_grid(50, 80, 100, 0.2), [[0, 0, 80, 50]])
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            tile_grid(100, 100, 0, 0.2)
+        with self.assertRaises(ValueError):
+            tile_grid(100, 100, 50, 1.0)
+
+
+class TestMerging(unittest.TestCase):
+    """
+    Test cases for box IoU, NMS and weighted box fusion.
+    """
+
+    def setUp(self):
+        self.boxes = np.array(
+            [
+                [0, 0, 10, 10],
+                [1, 0, 11, 10],  # Duplicate of the first box
+                [1, 0, 11, 10],  # Same box, other class
+                [50, 50, 60, 60],
+            ],
+            dtype=np.float32,
+        )
+        self.scores = np.array([0.8, 0.9, 0.7, 0.6], dtype=np.float32)
+        self.class_ids = np.array([1, 1, 2, 1])
+
+    def test_box_iou(self):
+        iou = box_iou(self.boxes[:2], self.boxes)
+        self.assertAlmostEqual(iou[0, 0], 1.0)
+        self.assertAlmostEqual(iou[0, 1], 90 / 110)
+        self.assertEqual(iou[0, 3], 0.0)
+
+    def test_nms_is_class_aware(self):
+        keep = nms(self.boxes, self.scores, self.class_ids, iou_threshold=0.5)
+        np.testing.assert_array_equal(keep, [1, 2, 3])
+
+    def test_nms_empty(self):
+        keep = nms(np.zeros((0, 4)), np.zeros(0), np.zeros(0, dtype=int))
+        self.assertEqual(len(keep), 0)
+
+    def test_weighted_box_fusion(self):
+        boxes, scores, class_ids = weighted_box_fusion(
+            self.boxes, self.scores, self.class_ids, iou_threshold=0.5
+        )
+        np.testing.assert_array_equal(class_ids, [1, 2, 1])
+        np.testing.assert_allclose(scores, [0.9, 0.7, 0.6])
+        # Score-weighted average of the two duplicates
+        x1 = (0.8 * 0 + 0.9 * 1) / 1.7
+        np.testing.assert_allclose(boxes[0], [x1, 0, x1 + 10, 10], rtol=1e-6)
+        np.testing.assert_allclose(boxes[2], self.boxes[3])
+
+    def test_merging_in_blocks(self):
+        rng = np.random.default_rng(0)
+        corners = rng.uniform(0, 100, size=(300, 2))
+        boxes = np.concatenate(
+            [corners, corners + rng.uniform(5, 30, size=(300, 2))], axis=1
+        )
+        scores = rng.uniform(size=300)
+        class_ids = rng.integers(0, 3, size=300)
+
+        keep = nms(boxes, scores, class_ids)
+        fused = weighted_box_fusion(boxes, scores, class_ids)
+        # A few rows per block instead of the whole matrix at once
+        with mock.patch("src.detr_vision.tiling._IOU_BLOCK_ELEMENTS", 300 * 7):
+            np.testing.assert_array_equal(nms(boxes, scores, class_ids), keep)
+            for blocked, dense in zip(
+                weighted_box_fusion(boxes, scores, class_ids), fused
+            ):
+                np.testing.assert_array_equal(blocked, dense)
+
+
+class TestDetectTiled(TinyDetrTestCase):
+    """
+    Test cases for tiled detection with a tiny offline model.
+    """
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.image = rng.integers(0, 256, size=(200, 300, 3), dtype=np.uint8)
+
+    def test_single_tile_matches_detect(self):
+        tiled = self.detector.detect_tiled(
+            self.image, threshold=0.0, tile_size=300, iou_threshold=1.0
+        )
+        direct = self.detector.detect(self.image, threshold=0.0)
+        order = np.argsort(-direct.scores, kind="stable")
+        np.testing.assert_allclose(
+            tiled.boxes, direct.boxes[order], rtol=1e-5, atol=1e-4
+        )
+        np.testing.assert_allclose(tiled.scores, direct.scores[order], rtol=1e-6)
+
+    def test_boxes_in_image_coordinates(self):
+        tiles = tile_grid(200, 300, 128, 0.25)
+        expected_boxes, expected_scores, expected_ids = [], [], []
+        for x1, y1, x2, y2 in tiles:
+            raw = self.detector.detect_raw(self.image[y1:y2, x1:x2]).filter(0.0)
+            expected_boxes.append(raw.boxes + [x1, y1, x1, y1])
+            expected_scores.append(raw.scores)
+            expected_ids.append(raw.class_ids)
+        boxes = np.concatenate(expected_boxes)
+        scores = np.concatenate(expected_scores)
+        class_ids = np.concatenate(expected_ids)
+        keep = nms(boxes, scores, class_ids, 0.5)
+
+        detections = self.detector.detect_tiled(
+            self.image, threshold=0.0, tile_size=128, overlap=0.25, full_image=False
+        )
+        self.assertEqual(len(detections), len(keep))
+        np.testing.assert_allclose(detections.boxes, boxes[keep], rtol=1e-4, atol=1e-3)
+        np.testing.assert_array_equal(detections.class_ids, class_ids[keep])
+        self.assertEqual(
+            detections.labels, [self.detector.labels[i] for i in class_ids[keep]]
+        )
+
+    def test_tile_batches_are_bounded(self):
+        with mock.patch.object(
+            self.detector, "_predict", wraps=self.detector._predict
+        ) as predict:
+            self.detector.detect_tiled(
+                self.image, tile_size=64, tile_batch_size=3, full_image=False
+            )
+        batch_sizes = [len(call.args[0]) for call in predict.call_args_list]
+        self.assertEqual(sum(batch_sizes), len(tile_grid(200, 300, 64, 0.2)))
+        self.assertLessEqual(max(batch_sizes), 3)
+
+    def test_wbf_and_pil_input(self):
+        from PIL import Image
+
+        pil_image = Image.fromarray(self.image[:, :, ::-1])
+        detections = self.detector.detect_tiled(
+            pil_image, threshold=0.0, tile_size=128, merge="wbf"
+        )
+        self.assertGreater(len(detections), 0)
+        self.assertTrue(np.all(np.diff(detections.scores) <= 0))
+
+    def test_pil_input_fast_preprocess(self):
+        from PIL import Image
+
+        detector = DetrObjectDetector(
+            model_name=self.model_dir, device="cpu", fast_preprocess=True
+        )
+        pil_image = Image.fromarray(self.image[:, :, ::-1])
+        detections = detector.detect_tiled(pil_image, threshold=0.0, tile_size=128)
+        expected = self.detector.detect_tiled(self.image, threshold=0.0, tile_size=128)
+        np.testing.assert_allclose(
+            detections.scores, expected.scores, rtol=1e-4, atol=1e-5
+        )
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            self.detector.detect_tiled(self.image, merge="mean")
+        with self.assertRaises(ValueError):
+            self.detector.detect_tiled(self.image, tile_batch_size=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
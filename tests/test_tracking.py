@@ -0,0 +1,176 @@
+"""
+Tests for the tracking module.
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add the parent directory to the Python path to import our package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.detr_vision.camera import SyntheticFrameSource
+from src.detr_vision.results import Detections
+from src.detr_vision.tracking import SortTracker, TrackedDetections, TrackingDetector
+
+LABELS = {0: "square", 1: "other"}
+
+
+def make_detections(boxes, class_ids=None, scores=None):
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    if class_ids is None:
+        class_ids = np.zeros(len(boxes), dtype=int)
+    if scores is None:
+        scores = np.full(len(boxes), 0.9)
+    return Detections(boxes, scores, class_ids, LABELS)
+
+
+class SquareDetector:
+    """
+    Stand-in detector that finds the white square of SyntheticFrameSource frames.
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    def detect(self, image, threshold=0.7):
+        self.calls += 1
+        ys, xs = np.nonzero(image[:, :, 0] == 255)
+        if not len(xs):
+            return make_detections(np.zeros((0, 4)))
+        return make_detections([[xs.min(), ys.min(), xs.max() + 1, ys.max() + 1]])
+
+
+class TestSortTracker(unittest.TestCase):
+    """
+    Test cases for the SORT-style tracker.
+    """
+
+    def test_persistent_ids(self):
+        tracker = SortTracker()
+        ids = []
+        for i in range(10):
+            tracker.predict()
+            x = 10 + 5 * i
+            tracks = tracker.update(
+                make_detections([[x, 20, x + 40, 60], [200, 200, 240, 240]])
+            )
+            ids.append(sorted(tracks.track_ids.tolist()))
+        self.assertEqual(ids, [[1, 2]] * 10)
+
+    def test_predicts_constant_velocity(self):
+        tracker = SortTracker()
+        for i in range(10):
+            tracker.predict()
+            x = 10 + 4 * i
+            tracker.update(make_detections([[x, 20, x + 40, 60]]))
+
+        # Three frames without detections
+        for _ in range(3):
+            tracks = tracker.predict()
+        np.testing.assert_allclose(tracks.boxes[0], [58, 20, 98, 60], atol=1.5)
+
+    def test_class_aware_matching(self):
+        tracker = SortTracker()
+        tracker.predict()
+        tracker.update(make_detections([[0, 0, 40, 40]], class_ids=[0]))
+        tracker.predict()
+        tracks = tracker.update(make_detections([[0, 0, 40, 40]], class_ids=[1]))
+        self.assertEqual(sorted(tracks.track_ids.tolist()), [1, 2])
+
+    def test_tracks_expire(self):
+        tracker = SortTracker(max_age=2)
+        tracker.predict()
+        tracker.update(make_detections([[0, 0, 40, 40]]))
+        for _ in range(3):
+            tracker.predict()
+        tracks = tracker.update(make_detections(np.zeros((0, 4))))
+        self.assertEqual(len(tracks), 0)
+        self.assertEqual(len(tracker), 0)
+
+    def test_uncertainty_grows_without_detections(self):
+        tracker = SortTracker()
+        self.assertEqual(tracker.uncertainty(), 0.0)
+        tracker.predict()
+        tracker.update(make_detections([[0, 0, 40, 40]]))
+        after_update = tracker.uncertainty()
+        tracker.predict()
+        tracker.predict()
+        self.assertGreater(tracker.uncertainty(), after_update)
+
+    def test_min_hits(self):
+        tracker = SortTracker(min_hits=2)
+        tracker.predict()
+        self.assertEqual(len(tracker.update(make_detections([[0, 0, 40, 40]]))), 0)
+        tracker.predict()
+        self.assertEqual(len(tracker.update(make_detections([[0, 0, 40, 40]]))), 1)
+
+    def test_tracked_detections(self):
+        tracks = TrackedDetections(np.zeros((1, 4)), [0.5], [1], [7], LABELS)
+        self.assertEqual(tracks["labels"], ["other"])
+        self.assertEqual(tracks["track_ids"].tolist(), [7])
+        self.assertIn("track_ids", tracks)
+        self.assertEqual(tracks.to_records()[0]["track_id"], 7)
+
+
+class TestTrackingDetector(unittest.TestCase):
+    """
+    Test cases for running the detector on only some frames.
+    """
+
+    def run_frames(self, tracking, num_frames=20):
+        source = SyntheticFrameSource(width=320, height=240, num_frames=num_frames)
+        results = []
+        while True:
+            success, frame = source.read()
+            if not success:
+                return results
+            results.append((frame, tracking.process(frame)))
+
+    def test_detect_every(self):
+        detector = SquareDetector()
+        # The square moves 8 pixels per frame, so detections every 3 frames
+        # still overlap enough with the track to match it
+        tracking = TrackingDetector(detector, detect_every=3)
+        results = self.run_frames(tracking, num_frames=21)
+
+        self.assertEqual(detector.calls, 7)
+        stats = tracking.stats()
+        self.assertEqual(stats["frames"], 21)
+        self.assertEqual(stats["inferences"], 7)
+        self.assertAlmostEqual(stats["inference_fraction"], 1 / 3)
+        self.assertEqual(stats["triggers"], {"first": 1, "interval": 6})
+
+        # The square keeps its id, and once the tracker has learned its speed
+        # from a few detections, the propagated box follows it
+        for i, (frame, tracks) in enumerate(results[1:], start=1):
+            self.assertEqual(tracks.track_ids.tolist(), [1])
+            if i < 6:
+                continue
+            expected = SquareDetector().detect(frame).boxes[0]
+            np.testing.assert_allclose(tracks.boxes[0], expected, atol=4.0)
+
+    def test_motion_threshold(self):
+        detector = SquareDetector()
+        tracking = TrackingDetector(detector, detect_every=100, motion_threshold=0.01)
+        self.run_frames(tracking)
+        self.assertGreater(tracking.triggers["motion"], 0)
+
+    def test_uncertainty_threshold(self):
+        detector = SquareDetector()
+        tracking = TrackingDetector(
+            detector, detect_every=100, uncertainty_threshold=0.15
+        )
+        self.run_frames(tracking)
+        self.assertGreater(tracking.triggers["uncertainty"], 0)
+        self.assertLess(detector.calls, 20)
+
+    def test_invalid_detect_every(self):
+        with self.assertRaises(ValueError):
+            TrackingDetector(SquareDetector(), detect_every=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,222 @@
+"""
+Tests for the visualization module.
+"""
+
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add the parent directory to the Python path to import our package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.detr_vision.results import Detections
+from src.detr_vision.visualization import (
+    ColorPalette,
+    LabelRenderer,
+    detection_colors,
+    draw_detections,
+    get_color,
+    get_palette,
+)
+
+LABELS = ["person", "car", "traffic light", "cell phone", "N/A", "a", "giraffe"]
+
+
+def reference_draw_detections(image, detections, confidence_threshold=0.0):
+    """
+    The original per-box renderer with cv2.rectangle and cv2.putText.
+    """
+    result = image.copy()
+    for box, score, label in zip(
+        detections["boxes"], detections["scores"], detections["labels"]
+    ):
+        if score < confidence_threshold:
+            continue
+        x1, y1, x2, y2 = box.astype(int)
+        color = get_color(label)
+        cv2.rectangle(result, (x1, y1), (x2, y2), color, 2)
+        text = f"{label}: {score:.2f}"
+        (text_width, text_height), _ = cv2.getTextSize(
+            text, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 2
+        )
+        cv2.rectangle(
+            result, (x1, y1 - text_height - 5), (x1 + text_width, y1), color, -1
+        )
+        cv2.putText(
+            result,
+            text,
+            (x1, y1 - 5),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.5,
+            (255, 255, 255),
+            2,
+        )
+    return result
+
+
+def random_detections(rng, count, size=(120, 160)):
+    """
+    Random detections, including boxes with reversed corners and boxes
+    partly or entirely outside the image.
+    """
+    height, width = size
+    boxes = rng.uniform(-30, [width + 30, height + 30] * 2, (count, 4))
+    return {
+        "boxes": boxes.astype(np.float32),
+        "scores": rng.uniform(0, 1, count).astype(np.float32),
+        "labels": [LABELS[i] for i in rng.integers(0, len(LABELS), count)],
+    }
+
+
+class TestDrawDetections(unittest.TestCase):
+    """
+    Test cases for drawing detections.
+    """
+
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+        self.image = self.rng.integers(0, 256, size=(120, 160, 3), dtype=np.uint8)
+
+    def test_matches_reference_renderer(self):
+        for trial in range(50):
+            detections = random_detections(self.rng, 12)
+            with self.subTest(trial=trial):
+                np.testing.assert_array_equal(
+                    draw_detections(self.image, detections, confidence_threshold=0.3),
+                    reference_draw_detections(
+                        self.image, detections, confidence_threshold=0.3
+                    ),
+                )
+
+    def test_detections_object(self):
+        detections = Detections(
+            [[10, 30, 80, 90], [40, 50, 150, 110]],
+            [0.91, 0.5],
+            [0, 1],
+            {0: "person", 1: "car"},
+        )
+        np.testing.assert_array_equal(
+            draw_detections(self.image, detections),
+            reference_draw_detections(self.image, detections),
+        )
+
+    def test_copy_and_inplace(self):
+        detections = {
+            "boxes": np.array([[10, 30, 80, 90]], dtype=np.float32),
+            "scores": np.array([0.8], dtype=np.float32),
+            "labels": ["cat"],
+        }
+        original = self.image.copy()
+
+        result = draw_detections(self.image, detections)
+        np.testing.assert_array_equal(self.image, original)
+        self.assertFalse(np.array_equal(result, original))
+
+        image = original.copy()
+        self.assertIs(draw_detections(image, detections, inplace=True), image)
+        np.testing.assert_array_equal(image, result)
+
+    def test_no_detections(self):
+        detections = {
+            "boxes": np.zeros((0, 4), dtype=np.float32),
+            "scores": np.zeros(0, dtype=np.float32),
+            "labels": [],
+        }
+        np.testing.assert_array_equal(
+            draw_detections(self.image, detections), self.image
+        )
+
+
+class TestColors(unittest.TestCase):
+    """
+    Test cases for the class colors.
+    """
+
+    def setUp(self):
+        self.id2label = {0: "N/A", 1: "person", 3: "car", 7: "truck"}
+
+    def test_colors_are_deterministic(self):
+        colors = [get_color(label) for label in LABELS]
+        script = (
+            f"import sys; sys.path.insert(0, {str(Path(__file__).parent.parent)!r}); "
+            "from src.detr_vision.visualization import get_color; "
+            f"print([get_color(label) for label in {LABELS!r}])"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", script], capture_output=True, text=True, check=True
+        ).stdout
+        self.assertEqual(output.strip(), str(colors))
+
+        for color in colors:
+            self.assertEqual(len(color), 3)
+            self.assertTrue(all(50 <= value <= 255 for value in color))
+        self.assertEqual(len(set(colors)), len(colors))
+
+    def test_palette(self):
+        palette = ColorPalette(self.id2label)
+        self.assertEqual(len(palette), 8)
+        np.testing.assert_array_equal(
+            palette.lookup([3, 1, 3]),
+            [get_color("car"), get_color("person"), get_color("car")],
+        )
+
+    def test_palette_is_built_once(self):
+        palette = get_palette(self.id2label)
+        self.assertIs(get_palette(self.id2label), palette)
+        self.assertIs(get_palette(dict(self.id2label)), palette)
+        self.assertIsNot(get_palette({0: "cat"}), palette)
+
+    def test_detection_colors(self):
+        detections = Detections(
+            np.zeros((3, 4)), [0.9, 0.8, 0.7], [7, 1, 7], self.id2label
+        )
+        expected = [get_color("truck"), get_color("person"), get_color("truck")]
+        np.testing.assert_array_equal(detection_colors(detections), expected)
+        np.testing.assert_array_equal(detection_colors(detections.to_dict()), expected)
+        self.assertEqual(detection_colors({"labels": []}).shape, (0, 3))
+
+
+class TestLabelRenderer(unittest.TestCase):
+    """
+    Test cases for the cached label sprites.
+    """
+
+    def test_sprites_are_cached(self):
+        renderer = LabelRenderer(max_sprites=2)
+        image = np.zeros((60, 200, 3), dtype=np.uint8)
+
+        renderer.draw(image, 10, 40, "dog", 0.5, (0, 0, 255))
+        sprites = renderer._sprites[("dog", (0, 0, 255), "0.50")]
+        renderer.draw(image, 10, 40, "dog", 0.501, (0, 0, 255))
+        self.assertIs(renderer._sprites[("dog", (0, 0, 255), "0.50")], sprites)
+
+        renderer.draw(image, 10, 40, "dog", 0.6, (0, 0, 255))
+        renderer.draw(image, 10, 40, "cat", 0.6, (0, 0, 255))
+        self.assertEqual(
+            list(renderer._sprites),
+            [("dog", (0, 0, 255), "0.60"), ("cat", (0, 0, 255), "0.60")],
+        )
+
+    def test_matches_put_text(self):
+        renderer = LabelRenderer()
+        for score in np.linspace(0, 1, 101):
+            image = np.full((40, 200, 3), 50, dtype=np.uint8)
+            expected = reference_draw_detections(
+                image,
+                {
+                    "boxes": np.array([[4, 30, 4, 30]], dtype=np.float32),
+                    "scores": [score],
+                    "labels": ["bicycle"],
+                },
+            )
+            cv2.rectangle(image, (4, 30), (4, 30), get_color("bicycle"), 2)
+            renderer.draw(image, 4, 30, "bicycle", score, get_color("bicycle"))
+            np.testing.assert_array_equal(image, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
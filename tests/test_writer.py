@@ -0,0 +1,167 @@
+"""
+Tests for the writer module.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add the parent directory to the Python path to import our package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.detr_vision.results import Detections
+from src.detr_vision.writer import OutputWriter, next_sequence_number
+
+
+def sample_detections(score=0.9):
+    return Detections([[1, 2, 30, 40]], [score], [3], {3: "car"})
+
+
+class GatedWriter(OutputWriter):
+    """
+    Writer whose workers wait for a gate before writing, to fill the queue.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.gate = threading.Event()
+        super().__init__(*args, **kwargs)
+
+    def _write_frames(self):
+        self.gate.wait()
+        super()._write_frames()
+
+
+class TestOutputWriter(unittest.TestCase):
+    """
+    Test cases for the background output writer.
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output_dir = os.path.join(self.tmp.name, "frames")
+        rng = np.random.default_rng(0)
+        self.frame = rng.integers(0, 256, size=(24, 32, 3), dtype=np.uint8)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_unique_sequence_numbers(self):
+        with OutputWriter(self.output_dir, prefix="detection", num_workers=3) as writer:
+            paths = [writer.write(self.frame) for _ in range(20)]
+
+        self.assertEqual(len(set(paths)), 20)
+        self.assertEqual(os.path.basename(paths[0]), "detection_000001.jpg")
+        self.assertEqual(
+            sorted(os.listdir(self.output_dir)),
+            [os.path.basename(path) for path in paths],
+        )
+        stats = writer.stats()
+        self.assertEqual(stats["frames_written"], 20)
+        self.assertEqual(stats["frames_dropped"], 0)
+        self.assertEqual(stats["write_errors"], 0)
+
+        # A new writer continues after the files already there
+        with OutputWriter(self.output_dir, prefix="detection") as writer:
+            path = writer.write(self.frame)
+        self.assertEqual(os.path.basename(path), "detection_000021.jpg")
+        self.assertEqual(next_sequence_number(self.output_dir, "detection"), 22)
+        self.assertEqual(next_sequence_number(self.output_dir, "other"), 1)
+
+    def test_format_and_quality(self):
+        with OutputWriter(self.output_dir, image_format="png") as writer:
+            path = writer.write(self.frame)
+        self.assertTrue(path.endswith(".png"))
+        np.testing.assert_array_equal(cv2.imread(path), self.frame)
+
+        sizes = []
+        for quality in (10, 95):
+            with OutputWriter(
+                self.output_dir, prefix=f"q{quality}", quality=quality
+            ) as writer:
+                path = writer.write(self.frame)
+            sizes.append(os.path.getsize(path))
+        self.assertLess(sizes[0], sizes[1])
+
+        with self.assertRaises(ValueError):
+            OutputWriter(self.output_dir, image_format="gif")
+        with self.assertRaises(ValueError):
+            OutputWriter(self.output_dir, quality=0)
+
+    def test_drops_frames_when_queue_is_full(self):
+        writer = GatedWriter(self.output_dir, num_workers=1, queue_size=2)
+        paths = [writer.write(self.frame) for _ in range(5)]
+        self.assertEqual(paths[2:], [None, None, None])
+
+        stats = writer.stats()
+        self.assertEqual(stats["frames_queued"], 2)
+        self.assertEqual(stats["frames_dropped"], 3)
+        self.assertEqual(stats["max_queue_depth"], 2)
+
+        writer.gate.set()
+        writer.close()
+        self.assertEqual(writer.stats()["frames_written"], 2)
+        self.assertEqual(
+            sorted(os.listdir(self.output_dir)),
+            ["frame_000001.jpg", "frame_000002.jpg"],
+        )
+
+    def test_batched_log(self):
+        log_path = os.path.join(self.tmp.name, "logs", "detections.jsonl")
+        with OutputWriter(
+            self.output_dir, log_path=log_path, log_batch_size=4
+        ) as writer:
+            for i in range(10):
+                writer.write(
+                    self.frame if i % 2 == 0 else None,
+                    sample_detections(i / 10),
+                    index=i,
+                )
+            writer.write(
+                detections={
+                    "boxes": [[0, 0, 1, 1]],
+                    "scores": [0.5],
+                    "labels": ["cat"],
+                },
+                index=10,
+            )
+
+        with open(log_path) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([record["index"] for record in records], list(range(11)))
+        self.assertEqual(
+            records[0]["path"], os.path.join(self.output_dir, "frame_000001.jpg")
+        )
+        self.assertIsNone(records[1]["path"])
+        self.assertEqual(records[3]["detections"], sample_detections(0.3).to_records())
+        self.assertEqual(records[10]["detections"][0]["label"], "cat")
+
+        stats = writer.stats()
+        self.assertEqual(stats["records_logged"], 11)
+        self.assertEqual(stats["log_flushes"], 3)
+        self.assertEqual(stats["frames_written"], 5)
+
+    def test_write_errors_are_counted(self):
+        # The output directory can't be created where a file is
+        Path(self.output_dir).touch()
+        with OutputWriter(self.output_dir) as writer:
+            self.assertIsNotNone(writer.write(self.frame))
+        stats = writer.stats()
+        self.assertEqual(stats["write_errors"], 1)
+        self.assertEqual(stats["frames_written"], 0)
+        self.assertIn(self.output_dir, writer.last_error)
+
+    def test_log_requires_log_path(self):
+        with OutputWriter(self.output_dir) as writer:
+            with self.assertRaises(RuntimeError):
+                writer.log(sample_detections())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+"""
+Shared test fixture: a tiny random-weight DETR model, built once per test run.
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add the parent directory to the Python path to import our package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.detr_vision.model import DetrObjectDetector
+from src.detr_vision.testing import build_tiny_detr
+
+_MODEL_DIR = None
+
+
+def tiny_detr_dir() -> str:
+    """
+    Get the directory of the tiny model, building it on first use.
+
+    The directory is removed when the test process exits.
+    """
+    global _MODEL_DIR
+    if _MODEL_DIR is None:
+        _MODEL_DIR = tempfile.TemporaryDirectory()
+        build_tiny_detr(_MODEL_DIR.name)
+    return _MODEL_DIR.name
+
+
+class TinyDetrTestCase(unittest.TestCase):
+    """
+    Base class for tests that run the tiny model.
+
+    Provides ``model_dir``, shared by all test classes, and ``detector``, a
+    CPU detector loaded once per class.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.model_dir = tiny_detr_dir()
+        cls.detector = DetrObjectDetector(model_name=cls.model_dir, device="cpu")